@@ -0,0 +1,108 @@
+"""Compare the available JSON codecs on HMC-shaped payloads.
+
+Examples::
+
+    python benchmarks/bench_codec.py
+    python benchmarks/bench_codec.py --lpars 5000 --decisions 200000 --output codec.json
+
+Decoding is measured on a UOM ``LogicalPartition`` feed rendered by the
+simulator (the bytes ``HmcApi`` receives), encoding on a pretty-printed
+dry-run report and on compact audit records.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from hmc_orchestrator import codec
+from hmc_orchestrator.policy_engine import Decision
+from hmc_orchestrator.simulator import HmcSimulator, SimulatorConfig, SimulatorTransport
+
+
+def _uom_feed(n_lpars: int) -> bytes:
+    sim = HmcSimulator(SimulatorConfig(frames=1, lpars_per_frame=n_lpars))
+    with httpx.Client(
+        base_url="https://hmc", transport=SimulatorTransport(sim)
+    ) as client:
+        client.put("/rest/api/web/Logon")
+        return client.get("/rest/api/uom/LogicalPartition").content
+
+
+def _decisions(n: int) -> List[Decision]:
+    return [
+        Decision(
+            frame_uuid=f"frame{i // 500:04d}",
+            lpar_uuid=f"{i:08x}-0000-4000-8000-000000000000",
+            lpar_name=f"lpar{i:06d}",
+            current={"cpu_ent": 2.0},
+            target={"cpu_ent": 3.0},
+            delta={"cpu_ent": 1.0},
+            reasons=["CPU above high threshold"],
+            window="08:00-18:00,Mon-Fri",
+            cooldown_remaining=0,
+        )
+        for i in range(n)
+    ]
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        fn()
+        best = min(best, perf_counter() - started)
+    return best
+
+
+def _cases(
+    impl: codec.Codec, feed: bytes, report: List[Dict[str, Any]], audit: List[Any]
+) -> Dict[str, Tuple[Callable[[], Any], Optional[int]]]:
+    return {
+        "decode_uom_feed": (lambda: impl.loads(feed), len(feed)),
+        "encode_report": (lambda: impl.dumps(report, pretty=True), None),
+        "encode_audit": (lambda: [impl.dumps(r) for r in audit], None),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lpars", type=int, default=2_000)
+    parser.add_argument("--decisions", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write JSON results here")
+    args = parser.parse_args(argv)
+
+    feed = _uom_feed(args.lpars)
+    decisions = _decisions(args.decisions)
+    report = [vars(d) for d in decisions]
+    audit = [{"lpar": d.lpar_name, "cpu": d.target["cpu_ent"]} for d in decisions]
+
+    codecs = []
+    for name in ("stdlib", "orjson"):
+        try:
+            codecs.append(codec.select(name))
+        except ImportError:
+            print(f"skip {name}: not installed", file=sys.stderr)
+
+    results: List[Dict[str, Any]] = []
+    for impl in codecs:
+        for case, (fn, size) in _cases(impl, feed, report, audit).items():
+            seconds = _best(fn, args.repeat)
+            results.append({"codec": impl.name, "case": case, "seconds": seconds})
+            rate = f" {size / seconds / 2**20:8.1f} MiB/s" if size else ""
+            print(f"{impl.name:<7} {case:<16} {seconds * 1000:9.2f} ms{rate}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""Micro-benchmarks for the policy engine using synthetic fleets.
+
+Examples::
+
+    python benchmarks/bench_policy_engine.py --output bench-policy.json
+    python benchmarks/bench_policy_engine.py --lpars 1000,200000 --rules 10,10000
+    python benchmarks/bench_policy_engine.py --compare bench-policy.json
+
+Each stage (``load_policy`` cold and from the compiled-artifact cache,
+``_match_rule``, ``_within_window``, ``evaluate`` and, with ``--workers``,
+``evaluate_sharded``) is timed for throughput and latency percentiles, then
+run once more under :mod:`tracemalloc` to record its peak memory (of the
+parent process only for the sharded stage). ``--compare`` exits
+with status 1 when a stage regressed beyond ``--tolerance`` of the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from hmc_orchestrator.hmc_api import LogicalPartition
+from hmc_orchestrator.policy_engine import (
+    _index_rules,
+    _match_rule,
+    _within_window,
+    evaluate,
+    evaluate_sharded,
+    load_policy,
+)
+
+QUICK_LPARS = (1_000, 10_000)
+QUICK_RULES = (10, 100)
+FULL_LPARS = (1_000, 10_000, 50_000, 200_000)
+FULL_RULES = (10, 100, 1_000, 10_000)
+WINDOWS = (
+    None,
+    "00:00-23:59,Mon-Sun",
+    "09:00-17:00,Mon-Fri",
+    "22:00-06:00,Sat;Sun",
+    "08:00-20:00,Fri-Mon",
+)
+SAMPLE = 2_000
+
+Result = Dict[str, Any]
+
+
+def make_fleet(
+    n_lpars: int, seed: int = 0
+) -> Tuple[List[LogicalPartition], Dict[str, Dict[str, float]]]:
+    rnd = random.Random(seed)
+    lpars: List[LogicalPartition] = []
+    metrics: Dict[str, Dict[str, float]] = {}
+    for i in range(n_lpars):
+        uuid = f"{i:08x}-0000-4000-8000-{rnd.getrandbits(48):012x}"
+        lpars.append(
+            LogicalPartition(
+                uuid=uuid,
+                name=f"lpar{i:06d}",
+                state="running",
+                cpu_entitlement=float(rnd.randint(1, 16)),
+                memory_mb=rnd.choice((4096, 8192, 16384, 65536)),
+                frame_uuid=f"frame{i // 500:04d}",
+            )
+        )
+        metric = {"cpu_util_pct": rnd.uniform(0, 100)}
+        if rnd.random() < 0.05:
+            metric["cooldown"] = 60.0
+        metrics[uuid] = metric
+    return lpars, metrics
+
+
+def make_policy(
+    n_rules: int, lpars: List[LogicalPartition], seed: int = 0
+) -> Dict[str, Any]:
+    """Build ``n_rules`` rules matching a few LPARs each by name or UUID."""
+
+    rnd = random.Random(seed)
+    rules: List[Dict[str, Any]] = []
+    for i in range(n_rules):
+        picks = rnd.sample(lpars, min(5, len(lpars)))
+        if i % 2:
+            match = {"lpar_uuids": [lp.uuid for lp in picks]}
+        else:
+            match = {"lpar_names": [lp.name for lp in picks]}
+        rule: Dict[str, Any] = {
+            "match": match,
+            "targets": {"cpu_util_high_pct": 80, "cpu_util_low_pct": 20},
+        }
+        window = WINDOWS[i % len(WINDOWS)]
+        if window:
+            rule["overrides"] = {"window": window}
+        rules.append(rule)
+    return {
+        "defaults": {"min_cpu": 1.0, "max_cpu": 32.0, "min_cpu_step": 0.5},
+        "rules": rules,
+    }
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _peak_kib(fn: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def _measure(
+    stage: str,
+    n_lpars: int,
+    n_rules: int,
+    fn: Callable[[], Any],
+    *,
+    repeat: int,
+    ops_per_call: int,
+) -> Result:
+    fn()  # warm-up
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        timings.append(perf_counter() - start)
+    total = sum(timings)
+    return {
+        "stage": stage,
+        "lpars": n_lpars,
+        "rules": n_rules,
+        "calls": repeat,
+        "ops_per_sec": ops_per_call * repeat / total if total else 0.0,
+        "p50_ms": _percentile(timings, 50) * 1000,
+        "p95_ms": _percentile(timings, 95) * 1000,
+        "p99_ms": _percentile(timings, 99) * 1000,
+        "peak_kib": _peak_kib(fn),
+    }
+
+
+def run_case(
+    n_lpars: int,
+    n_rules: int,
+    repeat: int,
+    workdir: Path,
+    cache_dir: Path,
+    workers: int = 0,
+) -> List[Result]:
+    lpars, metrics = make_fleet(n_lpars)
+    policy = make_policy(n_rules, lpars)
+    defaults = policy["defaults"]
+    rules = policy["rules"]
+    sample = lpars[:SAMPLE]
+    now = datetime(2024, 1, 3, 12, 0, tzinfo=timezone.utc)
+    instants = [now + timedelta(hours=7 * i) for i in range(24)]
+
+    policy_path = workdir / f"policy-{n_rules}.yaml"
+    if not policy_path.exists():
+        policy_path.write_text(yaml.safe_dump(policy), encoding="utf8")
+
+    index = _index_rules(rules)
+
+    def match_sample() -> None:
+        for lp in sample:
+            _match_rule(rules, lp, defaults, index)
+
+    def windows() -> None:
+        for window in WINDOWS:
+            for instant in instants:
+                _within_window(window, now=instant)
+
+    results = [
+        _measure(
+            "load_policy",
+            n_lpars,
+            n_rules,
+            lambda: load_policy(str(policy_path), use_cache=False),
+            repeat=repeat,
+            ops_per_call=1,
+        ),
+        _measure(
+            "load_policy_cached",
+            n_lpars,
+            n_rules,
+            lambda: load_policy(str(policy_path), cache_dir=cache_dir),
+            repeat=repeat,
+            ops_per_call=1,
+        ),
+        _measure(
+            "_match_rule",
+            n_lpars,
+            n_rules,
+            match_sample,
+            repeat=repeat,
+            ops_per_call=len(sample),
+        ),
+        _measure(
+            "_within_window",
+            n_lpars,
+            n_rules,
+            windows,
+            repeat=repeat,
+            ops_per_call=len(WINDOWS) * len(instants),
+        ),
+        _measure(
+            "evaluate",
+            n_lpars,
+            n_rules,
+            lambda: evaluate(policy, lpars, metrics, now=now),
+            repeat=repeat,
+            ops_per_call=n_lpars,
+        ),
+    ]
+    if workers > 1:
+        results.append(
+            _measure(
+                f"evaluate_sharded/{workers}",
+                n_lpars,
+                n_rules,
+                lambda: evaluate_sharded(
+                    policy, lpars, metrics, now=now, workers=workers, min_lpars=0
+                ),
+                repeat=repeat,
+                ops_per_call=n_lpars,
+            )
+        )
+    return results
+
+
+def compare(
+    results: List[Result], baseline: List[Result], tolerance: float
+) -> List[str]:
+    """Return human readable regressions of ``results`` against ``baseline``."""
+
+    base = {(r["stage"], r["lpars"], r["rules"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        ref = base.get((r["stage"], r["lpars"], r["rules"]))
+        if ref is None:
+            continue
+        case = f"{r['stage']} lpars={r['lpars']} rules={r['rules']}"
+        if r["ops_per_sec"] < ref["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{case}: throughput {r['ops_per_sec']:.0f}/s "
+                f"< baseline {ref['ops_per_sec']:.0f}/s"
+            )
+        if r["p95_ms"] > ref["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{case}: p95 {r['p95_ms']:.2f}ms > baseline {ref['p95_ms']:.2f}ms"
+            )
+        if r["peak_kib"] > ref["peak_kib"] * (1 + tolerance):
+            regressions.append(
+                f"{case}: peak {r['peak_kib']:.0f}KiB "
+                f"> baseline {ref['peak_kib']:.0f}KiB"
+            )
+    return regressions
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lpars", type=_ints, help="comma separated fleet sizes")
+    parser.add_argument("--rules", type=_ints, help="comma separated rule counts")
+    parser.add_argument(
+        "--full", action="store_true", help="run the 1k-200k x 10-10k matrix"
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--max-pairs",
+        type=float,
+        default=5e8,
+        help="skip cases where lpars*rules exceeds this bound",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="also time sharded evaluation"
+    )
+    parser.add_argument("--output", type=Path, help="write JSON results here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args(argv)
+
+    lpar_sizes = args.lpars or (FULL_LPARS if args.full else QUICK_LPARS)
+    rule_sizes = args.rules or (FULL_RULES if args.full else QUICK_RULES)
+
+    results: List[Result] = []
+    # load_policy only accepts files below the current working directory.
+    with tempfile.TemporaryDirectory(dir=Path.cwd()) as tmp:
+        for n_lpars in lpar_sizes:
+            for n_rules in rule_sizes:
+                if n_lpars * n_rules > args.max_pairs:
+                    print(f"skip lpars={n_lpars} rules={n_rules}", file=sys.stderr)
+                    continue
+                cases = run_case(
+                    n_lpars,
+                    n_rules,
+                    args.repeat,
+                    Path(tmp),
+                    Path(tmp) / "cache",
+                    workers=args.workers,
+                )
+                for r in cases:
+                    results.append(r)
+                    print(
+                        f"{r['stage']:<18} lpars={r['lpars']:<7} "
+                        f"rules={r['rules']:<6} {r['ops_per_sec']:>12.0f} ops/s "
+                        f"p50={r['p50_ms']:.2f}ms p95={r['p95_ms']:.2f}ms "
+                        f"p99={r['p99_ms']:.2f}ms peak={r['peak_kib']:.0f}KiB"
+                    )
+
+    if args.output:
+        payload = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": datetime.now(timezone.utc).isoformat(),
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(payload, indent=2), encoding="utf8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf8"))["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
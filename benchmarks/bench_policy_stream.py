@@ -0,0 +1,67 @@
+"""Compare streaming and whole-document parsing of a large policy file.
+
+Examples::
+
+    python benchmarks/bench_policy_stream.py
+    python benchmarks/bench_policy_stream.py --targets 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterator, List, Optional
+
+from hmc_power_orchestrator.policy import Policy, Target, iter_targets
+
+
+def _write(path: Path, n: int) -> None:
+    targets = [
+        {"lpar": f"lpar{i:06d}", "frame": f"P10-{i // 500:03d}", "cpu": 2, "mem": 4096}
+        for i in range(n)
+    ]
+    path.write_text(json.dumps({"policy_version": 1, "targets": targets}, indent=2))
+
+
+def _measure(fn: Callable[[], Iterator[Target]]) -> tuple[float, float, int]:
+    tracemalloc.start()
+    started = perf_counter()
+    targets = fn()
+    next(targets)
+    first = perf_counter() - started
+    for _ in targets:
+        pass
+    total = perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, total, peak
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "policy.json"
+        _write(path, args.targets)
+        cases = {
+            "stream": lambda: iter_targets(path),
+            "whole": lambda: iter(Policy.model_validate_json(path.read_text()).targets),
+        }
+        for name, fn in cases.items():
+            first, total, peak = _measure(fn)
+            print(
+                f"{name:<6} {args.targets} targets  first {first * 1000:8.1f} ms"
+                f"  total {total:6.2f} s  peak {peak / 2**20:7.1f} MiB"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
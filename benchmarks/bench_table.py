@@ -0,0 +1,69 @@
+"""Time the plain-text and rich table renderers on a synthetic inventory.
+
+Examples::
+
+    python benchmarks/bench_table.py
+    python benchmarks/bench_table.py --rows 50000 --skip-rich
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import tracemalloc
+from contextlib import redirect_stdout
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from hmc_power_orchestrator.table import render_plain, render_rich
+
+
+def _rows(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": f"lpar{i:06d}",
+            "uuid": f"{i:08x}-0000-4000-8000-000000000000",
+            "state": "running" if i % 7 else "not activated",
+            "cpu": 0.5 + i % 16 / 4,
+            "mem": 2048 * (1 + i % 8),
+            "frame": f"P10-{i // 500:03d}",
+        }
+        for i in range(n)
+    ]
+
+
+def _measure(fn: Callable[[], Any]) -> tuple[float, int]:
+    tracemalloc.start()
+    started = perf_counter()
+    fn()
+    elapsed = perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--skip-rich", action="store_true")
+    args = parser.parse_args(argv)
+
+    rows = _rows(args.rows)
+    cases = {"plain": lambda: render_plain(rows, out=io.StringIO())}
+    if not args.skip_rich:
+
+        def rich() -> None:
+            with redirect_stdout(io.StringIO()):
+                render_rich(rows)
+
+        cases["rich"] = rich
+    for name, fn in cases.items():
+        seconds, peak = _measure(fn)
+        mib = peak / 2**20
+        print(f"{name:<6} {args.rows} rows {seconds:8.3f} s  peak {mib:7.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
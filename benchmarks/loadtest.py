@@ -0,0 +1,230 @@
+"""Drive the real ``hmc-orchestrator`` CLI against the in-process simulator.
+
+Examples::
+
+    python benchmarks/loadtest.py --frames 20 --lpars-per-frame 200
+    python benchmarks/loadtest.py --scenario dry-run --latency-ms 80 \\
+        --error-rate 0.02 --rate-limit-rate 0.01 --session-ttl 30
+    python benchmarks/loadtest.py --scenario collection --output load.json
+
+``list`` and ``dry-run`` invoke the Typer application exactly as the console
+script does, with only the session transport replaced by the simulator.
+``collection`` pages through ``/api/lpars`` with
+:class:`hmc_power_orchestrator.hmc_client.HMCClient`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import httpx
+import yaml
+from typer.testing import CliRunner
+
+from hmc_orchestrator.cli import app
+from hmc_orchestrator.session import HmcSession
+from hmc_orchestrator.simulator import (
+    AsyncSimulatorTransport,
+    HmcSimulator,
+    SimulatorConfig,
+    SimulatorTransport,
+    lognormal,
+    no_latency,
+    with_stalls,
+)
+from hmc_power_orchestrator.hmc_client import HedgeConfig, HMCClient, RetryConfig
+
+
+class _Recorder:
+    """Collect client-observed latency and status of every request."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self._lock = Lock()
+
+    def record(self, started: float, status: int) -> None:
+        with self._lock:
+            self.latencies.append(perf_counter() - started)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+
+class _RecordingAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport, rec: _Recorder) -> None:
+        self.inner = inner
+        self.rec = rec
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = perf_counter()
+        response = await self.inner.handle_async_request(request)
+        self.rec.record(started, response.status_code)
+        return response
+
+
+class _RecordingTransport(httpx.BaseTransport):
+    def __init__(self, inner: httpx.BaseTransport, rec: _Recorder) -> None:
+        self.inner = inner
+        self.rec = rec
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = perf_counter()
+        response = self.inner.handle_request(request)
+        self.rec.record(started, response.status_code)
+        return response
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def _run_cli(
+    sim: HmcSimulator, rec: _Recorder, argv: List[str], hedge: bool = False
+) -> None:
+    transport = _RecordingAsyncTransport(AsyncSimulatorTransport(sim), rec)
+
+    class SimSession(HmcSession):
+        def __init__(self, cfg: Any) -> None:
+            super().__init__(cfg, transport=transport)
+
+    env = {
+        "HMC_HOST": "hmc.simulator",
+        "HMC_USERNAME": "loadtest",
+        "HMC_PASSWORD": "loadtest",
+        "HMC_RETRIES_BACKOFF_BASE": "0.05",
+        "HMC_HEDGING_ENABLED": "1" if hedge else "0",
+    }
+    patch_session = mock.patch("hmc_orchestrator.commands.HmcSession", SimSession)
+    with patch_session, mock.patch.dict(os.environ, env):
+        result = CliRunner().invoke(app, argv)
+    if result.exit_code != 0:
+        raise SystemExit(f"CLI failed ({result.exit_code}): {result.output[-2000:]}")
+
+
+def _dry_run_policy(sim: HmcSimulator, workdir: Path) -> Path:
+    names = [lp["name"] for lp in sim.lpars]
+    rules = [
+        {
+            "match": {"lpar_names": names[i : i + 50]},
+            "targets": {"cpu_util_high_pct": 80, "cpu_util_low_pct": 20},
+        }
+        for i in range(0, len(names), 50)
+    ]
+    path = workdir / "loadtest-policy.yaml"
+    path.write_text(
+        yaml.safe_dump({"defaults": {"min_cpu": 1.0}, "rules": rules}),
+        encoding="utf8",
+    )
+    return path
+
+
+def _run_collection(sim: HmcSimulator, rec: _Recorder, hedge: bool = False) -> None:
+    client = HMCClient(
+        "https://hmc.simulator",
+        retry=RetryConfig(attempts=5, backoff_factor=0.05),
+        hedge=HedgeConfig() if hedge else None,
+        transport=_RecordingTransport(SimulatorTransport(sim), rec),
+    )
+    try:
+        for _ in client.iter_collection("/api/lpars"):
+            pass
+    finally:
+        client.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario", choices=("list", "dry-run", "collection"), default="list"
+    )
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--lpars-per-frame", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="median")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-ms", type=float, default=2000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--session-ttl", type=float, default=None)
+    parser.add_argument(
+        "--link-mbps", type=float, default=None, help="simulated link bandwidth"
+    )
+    parser.add_argument(
+        "--no-compression", action="store_true", help="simulator never gzips"
+    )
+    parser.add_argument(
+        "--hedge", action="store_true", help="hedge GETs slower than their p95"
+    )
+    parser.add_argument("--iterations", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write JSON summary here")
+    args = parser.parse_args(argv)
+
+    latency = (
+        lognormal(args.latency_ms / 1000, args.latency_sigma)
+        if args.latency_ms
+        else no_latency()
+    )
+    if args.stall_rate:
+        latency = with_stalls(latency, args.stall_rate, args.stall_ms / 1000)
+    sim = HmcSimulator(
+        SimulatorConfig(
+            frames=args.frames,
+            lpars_per_frame=args.lpars_per_frame,
+            page_size=args.page_size,
+            latency=latency,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            session_ttl=args.session_ttl,
+            compression=not args.no_compression,
+            link_bytes_per_second=args.link_mbps * 125_000 if args.link_mbps else None,
+            seed=args.seed,
+        )
+    )
+    rec = _Recorder()
+
+    started = perf_counter()
+    with tempfile.TemporaryDirectory(dir=Path.cwd()) as tmp:
+        policy = _dry_run_policy(sim, Path(tmp))
+        for _ in range(args.iterations):
+            if args.scenario == "list":
+                _run_cli(sim, rec, ["list", "--json"], args.hedge)
+            elif args.scenario == "dry-run":
+                _run_cli(sim, rec, ["policy", "dry-run", str(policy)], args.hedge)
+            else:
+                _run_collection(sim, rec, args.hedge)
+    elapsed = perf_counter() - started
+
+    summary = {
+        "scenario": args.scenario,
+        "lpars": len(sim.lpars),
+        "iterations": args.iterations,
+        "total_seconds": elapsed,
+        "requests": len(rec.latencies),
+        "requests_per_second": len(rec.latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(rec.latencies, 50) * 1000,
+        "p95_ms": _percentile(rec.latencies, 95) * 1000,
+        "p99_ms": _percentile(rec.latencies, 99) * 1000,
+        "statuses": {str(k): v for k, v in sorted(rec.statuses.items())},
+        "simulator": sim.counters,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2), encoding="utf8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,148 +1,254 @@
-"""Typer CLI for HMC orchestrator."""
+"""Typer CLI for HMC orchestrator.
+
+Schedulers start this CLI thousands of times a day, so only Typer is imported
+at module load. Command bodies import :mod:`hmc_orchestrator.commands` (and
+with it httpx, YAML, pydantic and Prometheus) when they run.
+"""
 
 from __future__ import annotations
 
-import asyncio
-import json
 from pathlib import Path
 from typing import Optional
 
 import typer
 
-from .config import Config, load_config
-from .hmc_api import HmcApi
-from .policy_engine import Decision, evaluate, load_policy
-from .session import HmcSession
-
 app = typer.Typer(help="HMC Orchestrator CLI")
 policy_app = typer.Typer(help="Policy commands")
 app.add_typer(policy_app, name="policy")
+snapshot_app = typer.Typer(help="Binary inventory snapshots")
+app.add_typer(snapshot_app, name="snapshot")
 
 # Typer instances for argument defaults
 policy_file_arg = typer.Argument(..., exists=True)
 report_option = typer.Option(None, "--report", help="Report file")
+snapshot_option = typer.Option(
+    None, "--snapshot", help="Also write a binary inventory snapshot here"
+)
+ndjson_option = typer.Option(
+    False,
+    "--ndjson",
+    help="Stream one JSON record per frame and LPAR as each frame completes",
+)
+snapshot_file_arg = typer.Argument(..., exists=True, dir_okay=False)
+snapshot_target_arg = typer.Argument(..., dir_okay=False)
+lpar_option = typer.Option(None, "--lpar", help="Show one LPAR by UUID")
+output_option = typer.Option(None, "--output", "-o", help="Write here, not stdout")
+workers_option = typer.Option(
+    1,
+    "--workers",
+    min=0,
+    help="Evaluation processes for large fleets (0 = one per CPU)",
+)
+metrics_port_option = typer.Option(
+    None, "--metrics-port", help="Serve Prometheus metrics on this local port"
+)
+metrics_addr_option = typer.Option(
+    "127.0.0.1", "--metrics-addr", help="Address for the metrics exporter"
+)
+metrics_textfile_option = typer.Option(
+    None,
+    "--metrics-textfile",
+    help="Write Prometheus metrics to this file when the command finishes",
+)
+profile_option = typer.Option(
+    False, "--profile", help="Print a per-phase timing breakdown to stderr"
+)
+bandwidth_option = typer.Option(
+    False,
+    "--bandwidth",
+    help="Print bytes transferred and decode time per HMC endpoint to stderr",
+)
+deadline_option = typer.Option(
+    None,
+    "--deadline",
+    min=0,
+    help="Stop after this many seconds; unfinished frames are reported incomplete",
+)
+profile_output_option = typer.Option(
+    None,
+    "--profile-output",
+    help="Also write cProfile stats to this file (implies --profile)",
+)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    metrics_port: Optional[int] = metrics_port_option,
+    metrics_addr: str = metrics_addr_option,
+    metrics_textfile: Optional[Path] = metrics_textfile_option,
+    profile: bool = profile_option,
+    profile_output: Optional[Path] = profile_output_option,
+    bandwidth: bool = bandwidth_option,
+    deadline: Optional[float] = deadline_option,
+) -> None:
+    """Configure process-wide options shared by all commands."""
 
+    if deadline is not None:
+        from .resilience import deadline as run_deadline
 
-async def _list(cfg: Config, json_out: bool) -> None:
-    sess = HmcSession(cfg)
-    api = HmcApi(sess)
-    systems = await api.list_managed_systems()
-    result = []
-    for ms in systems:
-        lpars = await api.list_lpars(ms.uuid)
-        result.append(
-            {
-                "uuid": ms.uuid,
-                "name": ms.name,
-                "lpars": [
-                    {
-                        "uuid": lp.uuid,
-                        "name": lp.name,
-                        "state": lp.state,
-                        "cpu_entitlement": lp.cpu_entitlement,
-                        "memory_mb": lp.memory_mb,
-                    }
-                    for lp in lpars
-                ],
-            }
-        )
-    await sess.logout()
-    await sess.close()
-    if json_out:
-        typer.echo(json.dumps(result, indent=2))
-    else:
-        for ms in result:
-            typer.echo(f"Managed System {ms['name']} ({ms['uuid']})")
-            for lp in ms["lpars"]:
-                typer.echo(
-                    f"  LPAR {lp['name']} ({lp['uuid']}) "
-                    f"state={lp['state']} CPU={lp['cpu_entitlement']} "
-                    f"MEM={lp['memory_mb']}"
-                )
+        ctx.with_resource(run_deadline(deadline))
+    if bandwidth:
+        from .metrics import TRAFFIC
+
+        TRAFFIC.reset()
+        ctx.call_on_close(lambda: typer.echo(TRAFFIC.summary(), err=True))
+    if profile or profile_output is not None:
+        from . import profiling
+
+        profiler = profiling.enable(profile_output)
+
+        def _report() -> None:
+            profiling.disable()
+            typer.echo(profiler.summary(), err=True)
+
+        ctx.call_on_close(_report)
+    if metrics_port is not None or metrics_textfile is not None:
+        from .metrics import start_exporter, write_textfile
+
+        if metrics_port is not None:
+            start_exporter(metrics_port, metrics_addr)
+        if metrics_textfile is not None:
+            ctx.call_on_close(lambda: write_textfile(metrics_textfile))
 
 
 @app.command("list")
 def list_cmd(  # type: ignore[override]
     json_out: bool = typer.Option(False, "--json", help="Output JSON"),
+    snapshot: Optional[Path] = snapshot_option,
+    ndjson: bool = ndjson_option,
 ) -> None:
     """List managed systems and LPARs."""
 
-    cfg = load_config()
-    asyncio.run(_list(cfg, json_out))
+    from .commands import run_list
+
+    run_list(json_out, snapshot, ndjson)
 
 
 @policy_app.command("validate")
 def policy_validate(path: Path) -> None:
     """Validate a policy YAML file."""
 
+    from .policy_engine import load_policy
+
     load_policy(str(path))
     typer.echo("Policy is valid")
 
 
-def _write_report(report: Path, decisions: list[Decision]) -> None:
-    if report.suffix == ".json":
-        with report.open("w", encoding="utf8") as fh:
-            json.dump([d.__dict__ for d in decisions], fh, indent=2)
-        return
-    if report.suffix == ".csv":
-        import csv
-
-        with report.open("w", newline="", encoding="utf8") as fh:
-            writer = csv.DictWriter(
-                fh,
-                fieldnames=[
-                    "frame_uuid",
-                    "lpar_uuid",
-                    "lpar_name",
-                    "current",
-                    "target",
-                    "delta",
-                    "reasons",
-                    "window",
-                    "cooldown_remaining",
-                ],
-            )
-            writer.writeheader()
-            for d in decisions:
-                row = d.__dict__.copy()
-                row["reasons"] = ";".join(d.reasons)
-                writer.writerow(row)
-        return
-    raise typer.BadParameter("report must end with .json or .csv")
-
-
-async def _policy_dry_run(policy_file: Path, report: Optional[Path]) -> None:
-    cfg = load_config()
-    sess = HmcSession(cfg)
-    api = HmcApi(sess)
-    systems = await api.list_managed_systems()
-    lpars = []
-    for ms in systems:
-        lpars.extend(await api.list_lpars(ms.uuid))
-    metrics = {lp.uuid: {"cpu_util_pct": 10.0} for lp in lpars}
-    policy = load_policy(str(policy_file))
-    decisions = evaluate(policy, lpars, metrics)
-    await sess.logout()
-    await sess.close()
-
-    if report:
-        _write_report(report, decisions)
-
-    for d in decisions:
-        typer.echo(
-            f"{d.lpar_name}: CPU {d.current['cpu_ent']} -> {d.target['cpu_ent']} "
-            f"({','.join(d.reasons)})"
-        )
+@policy_app.command("compile")
+def policy_compile(path: Path) -> None:
+    """Validate a policy and cache its compiled artifact."""
+
+    from .policy_engine import compile_policy
+
+    typer.echo(str(compile_policy(str(path))))
 
 
 @policy_app.command("dry-run")
 def policy_dry_run(
     policy_file: Path = policy_file_arg,
     report: Optional[Path] = report_option,
+    workers: int = workers_option,
 ) -> None:
     """Dry-run an autoscaling policy."""
 
-    asyncio.run(_policy_dry_run(policy_file, report))
+    from .commands import run_policy_dry_run
+
+    run_policy_dry_run(policy_file, report, workers=workers)
+
+
+@snapshot_app.command("from-json")
+def snapshot_from_json(
+    source: Path = snapshot_file_arg, target: Path = snapshot_target_arg
+) -> None:
+    """Convert ``list --json`` output into a binary snapshot."""
+
+    import json
+
+    from .exceptions import SnapshotError
+    from .snapshot import write_snapshot
+
+    try:
+        write_snapshot(target, json.loads(source.read_text(encoding="utf8")))
+    except SnapshotError as exc:
+        typer.echo(f"error: {exc}", err=True)
+        raise typer.Exit(1) from None
+
+
+@snapshot_app.command("to-json")
+def snapshot_to_json(
+    source: Path = snapshot_file_arg, output: Optional[Path] = output_option
+) -> None:
+    """Convert a binary snapshot back into ``list --json`` output."""
+
+    import json
+
+    from .snapshot import Snapshot
+
+    with Snapshot(source) as snap:
+        text = json.dumps(snap.to_json(), indent=2)
+    if output is None:
+        typer.echo(text)
+    else:
+        output.write_text(text + "\n", encoding="utf8")
+
+
+@snapshot_app.command("show")
+def snapshot_show(
+    source: Path = snapshot_file_arg,
+    lpar: Optional[str] = lpar_option,
+) -> None:
+    """Summarise a snapshot, or print a single LPAR."""
+
+    import json
+    from datetime import datetime, timezone
+
+    from .snapshot import Snapshot
+
+    with Snapshot(source) as snap:
+        if lpar is None:
+            created = datetime.fromtimestamp(snap.created, timezone.utc)
+            typer.echo(
+                f"created={created.isoformat()} frames={snap.frame_count} "
+                f"lpars={len(snap)}"
+            )
+            return
+        row = snap.find(lpar)
+        if row is None:
+            typer.echo(f"LPAR {lpar} not in snapshot", err=True)
+            raise typer.Exit(1)
+        typer.echo(json.dumps(snap.lpar(row), indent=2))
+
+
+@snapshot_app.command("diff")
+def snapshot_diff(
+    old: Path = snapshot_file_arg,
+    new: Path = snapshot_file_arg,
+    output: Optional[Path] = output_option,
+) -> None:
+    """Stream LPAR changes between two snapshots as NDJSON."""
+
+    import json
+    import sys
+    from collections import Counter
+
+    from .snapshot import Snapshot, diff_snapshots
+
+    counts: Counter[str] = Counter()
+    with Snapshot(old) as before, Snapshot(new) as after:
+        fh = sys.stdout if output is None else output.open("w", encoding="utf8")
+        try:
+            for change in diff_snapshots(before, after):
+                counts[change["op"]] += 1
+                fh.write(json.dumps(change, separators=(",", ":")) + "\n")
+        finally:
+            if output is not None:
+                fh.close()
+    typer.echo(
+        f"added={counts['added']} removed={counts['removed']} "
+        f"changed={counts['changed']}",
+        err=True,
+    )
 
 
 __all__ = ["app"]
@@ -0,0 +1,136 @@
+"""JSON codec used for HMC payloads, reports and audit records.
+
+``orjson`` is used when it is installed (``pip install
+hmc-power-orchestrator[fast]``), the standard library otherwise. Set
+``HMC_JSON_CODEC=stdlib`` (or ``orjson``) to force a choice. Both codecs
+decode straight from response bytes and encode to UTF-8 bytes, and the
+stdlib codec serialises dataclasses and datetimes the way orjson does so
+output does not depend on which one is active.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, Union
+
+JsonInput = Union[bytes, bytearray, memoryview, str]
+
+
+class Codec(ABC):
+    """Interface implemented by every codec."""
+
+    name = ""
+
+    @abstractmethod
+    def loads(self, data: JsonInput) -> Any:
+        """Decode one JSON document."""
+
+    @abstractmethod
+    def dumps(self, obj: Any, *, pretty: bool = False) -> bytes:
+        """Encode ``obj`` as UTF-8 JSON."""
+
+
+def _default(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        # Shallow: json recurses into the values itself, unlike asdict().
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibCodec(Codec):
+    name = "stdlib"
+
+    def loads(self, data: JsonInput) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def dumps(self, obj: Any, *, pretty: bool = False) -> bytes:
+        if pretty:
+            text = json.dumps(obj, indent=2, ensure_ascii=False, default=_default)
+        else:
+            text = json.dumps(
+                obj, separators=(",", ":"), ensure_ascii=False, default=_default
+            )
+        return text.encode("utf8")
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._loads = orjson.loads
+        self._dumps: Callable[..., bytes] = orjson.dumps
+        self._compact = orjson.OPT_NON_STR_KEYS
+        self._pretty = self._compact | orjson.OPT_INDENT_2
+
+    def loads(self, data: JsonInput) -> Any:
+        return self._loads(data)
+
+    def dumps(self, obj: Any, *, pretty: bool = False) -> bytes:
+        option = self._pretty if pretty else self._compact
+        return self._dumps(obj, option=option)
+
+
+_CODECS: Dict[str, Callable[[], Codec]] = {
+    "stdlib": StdlibCodec,
+    "orjson": OrjsonCodec,
+}
+
+
+def select(name: str = "auto") -> Codec:
+    """Return the codec called ``name``; ``auto`` prefers orjson."""
+
+    if name == "auto":
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return StdlibCodec()
+    try:
+        return _CODECS[name]()
+    except KeyError:
+        raise ValueError(f"unknown JSON codec {name!r}") from None
+
+
+codec: Codec = select(os.getenv("HMC_JSON_CODEC", "auto").lower())
+
+
+def use(name: str) -> Codec:
+    """Switch the process-wide codec (benchmarks and tests)."""
+
+    global codec
+    codec = select(name)
+    return codec
+
+
+def loads(data: JsonInput) -> Any:
+    return codec.loads(data)
+
+
+def dumps(obj: Any, *, pretty: bool = False) -> bytes:
+    return codec.dumps(obj, pretty=pretty)
+
+
+def dumps_str(obj: Any, *, pretty: bool = False) -> str:
+    return codec.dumps(obj, pretty=pretty).decode("utf8")
+
+
+__all__ = [
+    "Codec",
+    "OrjsonCodec",
+    "StdlibCodec",
+    "codec",
+    "dumps",
+    "dumps_str",
+    "loads",
+    "select",
+    "use",
+]
@@ -0,0 +1,218 @@
+"""Command implementations behind the Typer CLI.
+
+Kept apart from :mod:`hmc_orchestrator.cli` so that the HTTP stack, YAML,
+pydantic and Prometheus are only imported once a command actually runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import typer
+
+from . import codec
+from .config import Config, load_config
+from .federation import CollectionError, Federation, FrameInventory, Inventory
+from .policy_engine import Decision, evaluate_sharded, load_policy
+from .profiling import get_profiler
+from .resilience import current_deadline
+from .session import HmcSession
+from .snapshot import write_snapshot
+
+# Time allowed for logging off once the run deadline has passed.
+LOGOUT_GRACE = 5.0
+
+
+def _report_errors(
+    errors: List[CollectionError], incomplete: List[FrameInventory], frames: int
+) -> None:
+    for err in errors:
+        where = f"{err.hmc}/{err.frame}" if err.frame else err.hmc
+        typer.echo(f"warning: collection failed on {where}: {err.error}", err=True)
+    for frame in incomplete:
+        typer.echo(
+            f"warning: deadline reached, frame {frame.system.name} "
+            f"({frame.system.uuid}) is incomplete",
+            err=True,
+        )
+    if errors and not frames:
+        raise typer.Exit(1)
+
+
+async def _collect(cfg: Config) -> Inventory:
+    profiler = get_profiler()
+    federation = Federation(cfg, session_factory=HmcSession)
+    try:
+        with profiler.phase("inventory"):
+            inventory = await federation.collect()
+    finally:
+        await _close(federation)
+    _report_errors(inventory.errors, inventory.incomplete, len(inventory.frames))
+    return inventory
+
+
+async def _close(federation: Federation) -> None:
+    grace = LOGOUT_GRACE if current_deadline() is not None else None
+    with get_profiler().phase("logout"):
+        await federation.close(logout_timeout=grace)
+
+
+def _ndjson_records(frame: FrameInventory) -> Iterator[Dict[str, Any]]:
+    system = frame.system
+    record: Dict[str, Any] = {
+        "kind": "frame",
+        "uuid": system.uuid,
+        "name": system.name,
+        "hmc": frame.hmc,
+        "lpars": len(frame.lpars),
+    }
+    if not frame.complete:
+        record["incomplete"] = True
+    yield record
+    for lp in frame.lpars:
+        yield {
+            "kind": "lpar",
+            "frame_uuid": system.uuid,
+            "uuid": lp.uuid,
+            "name": lp.name,
+            "state": lp.state,
+            "cpu_entitlement": lp.cpu_entitlement,
+            "memory_mb": lp.memory_mb,
+        }
+
+
+async def _list_ndjson(cfg: Config) -> None:
+    """Write each frame and its LPARs as NDJSON as soon as it is collected."""
+
+    federation = Federation(cfg, session_factory=HmcSession)
+    errors: List[CollectionError] = []
+    incomplete: List[FrameInventory] = []
+    frames = 0
+    try:
+        with get_profiler().phase("inventory"):
+            async for frame in federation.stream(errors):
+                frames += 1
+                if not frame.complete:
+                    incomplete.append(frame)
+                chunk = b"".join(
+                    codec.dumps(record) + b"\n" for record in _ndjson_records(frame)
+                )
+                typer.echo(chunk, nl=False)
+    finally:
+        await _close(federation)
+    _report_errors(errors, incomplete, frames)
+
+
+async def _list(cfg: Config, json_out: bool, snapshot: Optional[Path]) -> None:
+    inventory = await _collect(cfg)
+    result = [frame.to_dict() for frame in inventory.frames]
+    with get_profiler().phase("output"):
+        _print_inventory(result, json_out)
+    if snapshot is not None:
+        if inventory.errors or inventory.incomplete:
+            # A diff against this snapshot would report the missing LPARs
+            # as removed.
+            typer.echo(
+                f"error: inventory is incomplete, not writing snapshot {snapshot}",
+                err=True,
+            )
+            raise typer.Exit(1)
+        with get_profiler().phase("snapshot"):
+            write_snapshot(snapshot, result)
+
+
+def _print_inventory(result: list[dict[str, Any]], json_out: bool) -> None:
+    if json_out:
+        typer.echo(codec.dumps_str(result, pretty=True))
+    else:
+        for ms in result:
+            mark = " [incomplete]" if ms.get("incomplete") else ""
+            typer.echo(
+                f"Managed System {ms['name']} ({ms['uuid']}) via {ms['hmc']}{mark}"
+            )
+            for lp in ms["lpars"]:
+                typer.echo(
+                    f"  LPAR {lp['name']} ({lp['uuid']}) "
+                    f"state={lp['state']} CPU={lp['cpu_entitlement']} "
+                    f"MEM={lp['memory_mb']}"
+                )
+
+
+def run_list(
+    json_out: bool, snapshot: Optional[Path] = None, ndjson: bool = False
+) -> None:
+    if ndjson and (json_out or snapshot is not None):
+        raise typer.BadParameter("--ndjson cannot be combined with --json/--snapshot")
+    cfg = load_config()
+    if ndjson:
+        asyncio.run(_list_ndjson(cfg))
+    else:
+        asyncio.run(_list(cfg, json_out, snapshot))
+
+
+def _write_report(report: Path, decisions: list[Decision]) -> None:
+    if report.suffix == ".json":
+        report.write_bytes(codec.dumps([d.__dict__ for d in decisions], pretty=True))
+        return
+    if report.suffix == ".csv":
+        import csv
+
+        with report.open("w", newline="", encoding="utf8") as fh:
+            writer = csv.DictWriter(
+                fh,
+                fieldnames=[
+                    "frame_uuid",
+                    "lpar_uuid",
+                    "lpar_name",
+                    "current",
+                    "target",
+                    "delta",
+                    "reasons",
+                    "window",
+                    "cooldown_remaining",
+                ],
+            )
+            writer.writeheader()
+            for d in decisions:
+                row = d.__dict__.copy()
+                row["reasons"] = ";".join(d.reasons)
+                writer.writerow(row)
+        return
+    raise typer.BadParameter("report must end with .json or .csv")
+
+
+async def _policy_dry_run(
+    policy_file: Path, report: Optional[Path], workers: int
+) -> None:
+    profiler = get_profiler()
+    inventory = await _collect(load_config())
+    lpars = inventory.lpars
+    with profiler.phase("metrics"):
+        metrics = {lp.uuid: {"cpu_util_pct": 10.0} for lp in lpars}
+    with profiler.phase("policy_load"):
+        policy = load_policy(str(policy_file))
+    with profiler.phase("evaluate"):
+        decisions = evaluate_sharded(
+            policy, lpars, metrics, workers=workers or None
+        )
+
+    if report:
+        with profiler.phase("report"):
+            _write_report(report, decisions)
+
+    for d in decisions:
+        typer.echo(
+            f"{d.lpar_name}: CPU {d.current['cpu_ent']} -> {d.target['cpu_ent']} "
+            f"({','.join(d.reasons)})"
+        )
+
+
+def run_policy_dry_run(
+    policy_file: Path, report: Optional[Path], *, workers: int = 1
+) -> None:
+    asyncio.run(_policy_dry_run(policy_file, report, workers))
+
+
+__all__ = ["run_list", "run_policy_dry_run"]
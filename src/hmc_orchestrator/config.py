@@ -5,10 +5,10 @@ from __future__ import annotations
 import os
 from getpass import getpass
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Union
 
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 try:  # pragma: no cover - fallback when python-dotenv missing
     from dotenv import load_dotenv
@@ -26,14 +26,52 @@ class Retries(BaseModel):
     total: int = Field(5, ge=0)
     backoff_base: float = Field(0.5, ge=0)
     max_backoff: float = Field(8.0, ge=0)
+    # Bound on one logical request including retries and backoff sleeps.
+    deadline: Optional[float] = Field(60.0, gt=0)
+    # Retries allowed per first attempt, on top of a reserve of budget_reserve.
+    budget_ratio: float = Field(0.2, ge=0)
+    budget_reserve: int = Field(10, ge=0)
 
 
 class Concurrency(BaseModel):
     per_frame: int = Field(4, ge=1)
 
 
-class Config(BaseModel):
+class Http(BaseModel):
+    compression: bool = True
+    max_connections: int = Field(20, ge=1)
+    max_keepalive: int = Field(20, ge=0)
+    keepalive_expiry: float = Field(30.0, ge=0)
+    http2: bool = False
+    # Connections opened at login; None means ``concurrency.per_frame``.
+    prewarm: Optional[int] = Field(None, ge=0)
+
+
+class Hedging(BaseModel):
+    """Duplicate GETs still unanswered at a latency percentile."""
+
+    enabled: bool = False
+    percentile: float = Field(95.0, gt=0, lt=100)
+    # Hedge delay until enough latencies were seen, and its lower bound.
+    initial_delay: float = Field(1.0, gt=0)
+    min_delay: float = Field(0.05, ge=0)
+    # Hedges allowed per GET, on top of a reserve of budget_reserve.
+    budget_ratio: float = Field(0.05, ge=0)
+    budget_reserve: int = Field(3, ge=0)
+
+
+class HmcEndpoint(BaseModel):
+    """One HMC of a federated estate; unset fields inherit from ``Config``."""
+
     host: str
+    port: Optional[int] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+    verify: Optional[Union[bool, str]] = None
+
+
+class Config(BaseModel):
+    host: Optional[str] = None
     port: int = 12443
     username: str
     password: str
@@ -41,6 +79,35 @@ class Config(BaseModel):
     timeout: Timeout = Field(default_factory=Timeout)
     retries: Retries = Field(default_factory=Retries)
     concurrency: Concurrency = Field(default_factory=Concurrency)
+    http: Http = Field(default_factory=Http)
+    hedging: Hedging = Field(default_factory=Hedging)
+    hmcs: List[HmcEndpoint] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _require_host(self) -> "Config":
+        if not self.host and not self.hmcs:
+            raise ValueError("either host or hmcs must be configured")
+        return self
+
+    def endpoints(self) -> List["Config"]:
+        """Return one single-HMC ``Config`` per configured HMC.
+
+        Without ``hmcs`` this is just ``[self]``; otherwise each entry
+        inherits credentials, TLS, timeout, retry and concurrency settings
+        from the top level unless it overrides them.
+        """
+
+        if not self.hmcs:
+            return [self]
+        return [
+            self.model_copy(
+                update={
+                    "hmcs": [],
+                    **ep.model_dump(exclude_none=True),
+                }
+            )
+            for ep in self.hmcs
+        ]
 
 
 def _read_yaml(path: Path) -> Dict[str, Any]:
@@ -50,10 +117,15 @@ def _read_yaml(path: Path) -> Dict[str, Any]:
     return {}
 
 
+def _parse_endpoint(value: str) -> Dict[str, Any]:
+    host, _, port = value.strip().partition(":")
+    return {"host": host, "port": int(port)} if port else {"host": host}
+
+
 def load_config(
     cli_args: Optional[Dict[str, Any]] = None,
     *,
-    env: Optional[Dict[str, str]] = None,
+    env: Optional[Mapping[str, str]] = None,
     config_path: Optional[Path] = None,
 ) -> Config:
     """Load configuration respecting precedence CLI > env > YAML."""
@@ -70,7 +142,7 @@ def load_config(
     # Environment overrides
     def set_if(name: str, target: str, cast: Any = str) -> None:
         if name in env:
-            value = env[name]
+            value: Any = env[name]
             if cast is bool:
                 value = value.lower() not in {"0", "false", "no"}
             else:
@@ -91,7 +163,22 @@ def load_config(
     set_if("HMC_RETRIES_TOTAL", "retries.total", int)
     set_if("HMC_RETRIES_BACKOFF_BASE", "retries.backoff_base", float)
     set_if("HMC_RETRIES_MAX_BACKOFF", "retries.max_backoff", float)
+    set_if("HMC_RETRIES_DEADLINE", "retries.deadline", float)
+    set_if("HMC_RETRIES_BUDGET_RATIO", "retries.budget_ratio", float)
+    set_if("HMC_RETRIES_BUDGET_RESERVE", "retries.budget_reserve", int)
     set_if("HMC_CONCURRENCY_PER_FRAME", "concurrency.per_frame", int)
+    set_if("HMC_HTTP_COMPRESSION", "http.compression", bool)
+    set_if("HMC_HTTP_MAX_CONNECTIONS", "http.max_connections", int)
+    set_if("HMC_HTTP_MAX_KEEPALIVE", "http.max_keepalive", int)
+    set_if("HMC_HTTP_KEEPALIVE_EXPIRY", "http.keepalive_expiry", float)
+    set_if("HMC_HTTP_HTTP2", "http.http2", bool)
+    set_if("HMC_HTTP_PREWARM", "http.prewarm", int)
+    set_if("HMC_HEDGING_ENABLED", "hedging.enabled", bool)
+    set_if("HMC_HEDGING_PERCENTILE", "hedging.percentile", float)
+    if env.get("HMC_HOSTS"):
+        data["hmcs"] = [
+            _parse_endpoint(item) for item in env["HMC_HOSTS"].split(",") if item
+        ]
 
     # CLI overrides
     for key, value in cli_args.items():
@@ -101,9 +188,12 @@ def load_config(
             d = d.setdefault(p, {})
         d[parts[-1]] = value
 
-    # Expand environment variables in password
+    # Expand environment variables in passwords
     if "password" in data:
         data["password"] = os.path.expandvars(str(data["password"]))
+    for ep in data.get("hmcs") or []:
+        if isinstance(ep, dict) and ep.get("password"):
+            ep["password"] = os.path.expandvars(str(ep["password"]))
 
     cfg = Config.model_validate(data)
 
@@ -113,4 +203,13 @@ def load_config(
     return cfg
 
 
-__all__ = ["Config", "Timeout", "Retries", "Concurrency", "load_config"]
+__all__ = [
+    "Config",
+    "HmcEndpoint",
+    "Timeout",
+    "Retries",
+    "Concurrency",
+    "Http",
+    "Hedging",
+    "load_config",
+]
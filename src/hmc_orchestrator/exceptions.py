@@ -12,6 +12,10 @@ class HmcTimeout(HmcError):
     """Request timed out."""
 
 
+class DeadlineExceeded(HmcTimeout):
+    """The operation deadline passed before the request could complete."""
+
+
 class HmcRateLimited(HmcError):
     """Too many requests."""
 
@@ -22,3 +26,7 @@ class PcmNotEnabled(HmcError):
 
 class SchemaError(HmcError):
     """Policy schema validation failed."""
+
+
+class SnapshotError(HmcError):
+    """Inventory snapshot file is malformed or unsupported."""
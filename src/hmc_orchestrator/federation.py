@@ -0,0 +1,254 @@
+"""Concurrent inventory collection across several HMCs.
+
+Frames managed by a redundant HMC pair show up on both HMCs. Each frame is
+collected once, from the first HMC in configuration order that lists it;
+should that HMC fail, the next HMC managing the frame is tried. Failures are
+recorded per HMC or frame and never abort collection from healthy HMCs.
+
+Collection stops at the deadline set with ``resilience.deadline`` (the
+CLI's ``--deadline``): frames still outstanding are cancelled and reported
+as incomplete instead of holding up the run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from .config import Config
+from .exceptions import DeadlineExceeded
+from .hmc_api import HmcApi, LogicalPartition, ManagedSystem
+from .metrics import FRAME_COLLECTION
+from .resilience import current_deadline
+from .session import HmcSession
+
+SessionFactory = Callable[[Config], HmcSession]
+# Everything FrameInventory.to_dict() and policy evaluation read.
+INVENTORY_FIELDS = ("uuid", "name", "state", "cpu_entitlement", "memory_mb")
+
+
+def _run_expired() -> bool:
+    """Whether the run-wide deadline (not a per-call one) has passed."""
+
+    deadline = current_deadline()
+    return deadline is not None and deadline.expired
+
+
+@dataclass
+class FrameInventory:
+    hmc: str
+    system: ManagedSystem
+    lpars: List[LogicalPartition]
+    managed_by: List[str] = field(default_factory=list)
+    # False when the deadline passed before the frame's LPARs were read.
+    complete: bool = True
+
+    def to_dict(self) -> Dict[str, object]:
+        data: Dict[str, object] = {
+            "uuid": self.system.uuid,
+            "name": self.system.name,
+            "hmc": self.hmc,
+            "lpars": [
+                {
+                    "uuid": lp.uuid,
+                    "name": lp.name,
+                    "state": lp.state,
+                    "cpu_entitlement": lp.cpu_entitlement,
+                    "memory_mb": lp.memory_mb,
+                }
+                for lp in self.lpars
+            ],
+        }
+        if not self.complete:
+            data["incomplete"] = True
+        return data
+
+
+@dataclass
+class CollectionError:
+    hmc: str
+    error: str
+    frame: Optional[str] = None
+
+
+@dataclass
+class Inventory:
+    frames: List[FrameInventory] = field(default_factory=list)
+    errors: List[CollectionError] = field(default_factory=list)
+
+    @property
+    def lpars(self) -> List[LogicalPartition]:
+        return [lp for frame in self.frames for lp in frame.lpars]
+
+    @property
+    def incomplete(self) -> List[FrameInventory]:
+        return [frame for frame in self.frames if not frame.complete]
+
+
+@dataclass
+class _Member:
+    name: str
+    session: HmcSession
+    api: HmcApi
+
+
+class Federation:
+    """One :class:`HmcSession` per configured HMC, driven concurrently.
+
+    Each session keeps its own concurrency semaphore, so fan-out is bounded
+    per HMC (``concurrency.per_frame``) rather than globally.
+    """
+
+    def __init__(
+        self, cfg: Config, session_factory: SessionFactory = HmcSession
+    ) -> None:
+        self.members: List[_Member] = []
+        for ep in cfg.endpoints():
+            sess = session_factory(ep)
+            self.members.append(_Member(str(ep.host), sess, HmcApi(sess)))
+
+    async def _systems(self, member: _Member) -> List[ManagedSystem]:
+        return await member.api.list_managed_systems()
+
+    async def _frame(
+        self,
+        system: ManagedSystem,
+        candidates: List[_Member],
+        errors: List[CollectionError],
+    ) -> Optional[FrameInventory]:
+        for member in candidates:
+            started = perf_counter()
+            try:
+                lpars = await member.api.list_lpars(system.uuid, INVENTORY_FIELDS)
+            except Exception as exc:  # isolate per HMC/frame failures
+                if isinstance(exc, DeadlineExceeded) and _run_expired():
+                    return self._incomplete(system, candidates)
+                # Includes a per-call retries.deadline timeout: the partner
+                # HMC may still answer in time.
+                errors.append(CollectionError(member.name, repr(exc), system.uuid))
+                continue
+            FRAME_COLLECTION.observe(perf_counter() - started)
+            return FrameInventory(
+                hmc=member.name,
+                system=system,
+                lpars=lpars,
+                managed_by=[m.name for m in candidates],
+            )
+        return None
+
+    @staticmethod
+    def _incomplete(system: ManagedSystem, candidates: List[_Member]) -> FrameInventory:
+        return FrameInventory(
+            hmc=candidates[0].name,
+            system=system,
+            lpars=[],
+            managed_by=[m.name for m in candidates],
+            complete=False,
+        )
+
+    async def discover(
+        self,
+    ) -> Tuple[List[Tuple[ManagedSystem, List[_Member]]], List[CollectionError]]:
+        """List systems on all HMCs and map each frame to its candidate HMCs.
+
+        Bounded by the run deadline: HMCs that have not answered by then are
+        cancelled and reported as errors.
+        """
+
+        tasks = [asyncio.ensure_future(self._systems(m)) for m in self.members]
+        pending: Set[asyncio.Future[List[ManagedSystem]]] = set()
+        if tasks:
+            deadline = current_deadline()
+            timeout = deadline.timeout() if deadline is not None else None
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        errors: List[CollectionError] = []
+        frames: Dict[str, Tuple[ManagedSystem, List[_Member]]] = {}
+        for member, task in zip(self.members, tasks, strict=True):
+            if task in pending:
+                error = DeadlineExceeded("deadline reached before the HMC answered")
+                errors.append(CollectionError(member.name, repr(error)))
+                continue
+            if (exc := task.exception()) is not None:
+                errors.append(CollectionError(member.name, repr(exc)))
+                continue
+            for system in task.result():
+                frames.setdefault(system.uuid, (system, []))[1].append(member)
+        return list(frames.values()), errors
+
+    async def _as_completed(
+        self,
+        frames: List[Tuple[ManagedSystem, List[_Member]]],
+        errors: List[CollectionError],
+    ) -> AsyncIterator[FrameInventory]:
+        tasks = {
+            asyncio.ensure_future(self._frame(system, members, errors)): (
+                system,
+                members,
+            )
+            for system, members in frames
+        }
+        pending = set(tasks)
+        deadline = current_deadline()
+        try:
+            while pending:
+                timeout = deadline.timeout() if deadline is not None else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break  # deadline reached
+                for task in done:
+                    if (frame := task.result()) is not None:
+                        yield frame
+            for task in pending:
+                yield self._incomplete(*tasks[task])
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def stream(
+        self, errors: List[CollectionError]
+    ) -> AsyncIterator[FrameInventory]:
+        """Yield frames in completion order; failures are appended to ``errors``.
+
+        Only the frames being collected are held in memory at any time.
+        """
+
+        frames, discover_errors = await self.discover()
+        errors.extend(discover_errors)
+        async for frame in self._as_completed(frames, errors):
+            yield frame
+
+    async def collect(self) -> Inventory:
+        """Return the merged, de-duplicated inventory of all HMCs."""
+
+        frames, errors = await self.discover()
+        order = {system.uuid: index for index, (system, _) in enumerate(frames)}
+        collected = [frame async for frame in self._as_completed(frames, errors)]
+        collected.sort(key=lambda frame: order[frame.system.uuid])
+        return Inventory(frames=collected, errors=errors)
+
+    async def close(self, logout_timeout: Optional[float] = None) -> None:
+        """Log off and close every session, ignoring per-HMC failures.
+
+        ``logout_timeout`` bounds each logoff, e.g. once a deadline passed.
+        """
+
+        async def _close(member: _Member) -> None:
+            try:
+                await asyncio.wait_for(member.session.logout(), logout_timeout)
+            finally:
+                await member.session.close()
+
+        await asyncio.gather(
+            *(_close(m) for m in self.members), return_exceptions=True
+        )
+
+
+__all__ = ["CollectionError", "Federation", "FrameInventory", "Inventory"]
@@ -1,11 +1,25 @@
-"""Minimal typed wrappers for HMC UOM and PCM endpoints."""
+"""Minimal typed wrappers for HMC UOM and PCM endpoints.
+
+Full ``LogicalPartition`` objects carry dozens of attribute groups. Callers
+that only need a few fields pass ``fields=`` to :meth:`HmcApi.list_lpars`,
+which then asks for the smallest representation providing them: the
+``quick/All`` quick-property feed, else root properties only
+(``group=None``), else the full objects.
+"""
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from . import codec
+
+if TYPE_CHECKING:  # pragma: no cover - avoid importing httpx for the models
+    import httpx
 
-from .session import HmcSession
+    from .session import HmcSession
 
 
 @dataclass
@@ -21,44 +35,147 @@ class LogicalPartition:
     state: str
     cpu_entitlement: float
     memory_mb: int
+    frame_uuid: str = ""
+
+
+# LogicalPartition field -> UOM root property and quick property.
+_ROOT_PROPERTIES = {
+    "uuid": "uuid",
+    "name": "name",
+    "state": "state",
+    "cpu_entitlement": "entitledProcUnits",
+    "memory_mb": "memory",
+}
+_QUICK_PROPERTIES = {
+    "uuid": "PartitionUUID",
+    "name": "PartitionName",
+    "state": "PartitionState",
+    "cpu_entitlement": "CurrentProcessingUnits",
+    "memory_mb": "CurrentMemory",
+}
+LPAR_FIELDS = frozenset(_ROOT_PROPERTIES)
+# Status codes of HMCs that predate quick properties.
+_QUICK_UNSUPPORTED = frozenset({400, 404, 405, 501})
+
+
+def _decode(resp: httpx.Response) -> Any:
+    # Imported here: policy_engine imports this module for the models only,
+    # and `policy validate` must not pull in prometheus_client.
+    from .metrics import TRAFFIC, endpoint_template
+
+    started = perf_counter()
+    data = codec.loads(resp.content)
+    TRAFFIC.decode(endpoint_template(resp.request.url.path), perf_counter() - started)
+    return data
+
+
+def _lpar(item: Dict[str, Any], keys: Dict[str, str], ms_uuid: str) -> LogicalPartition:
+    return LogicalPartition(
+        uuid=item[keys["uuid"]],
+        name=item[keys["name"]],
+        state=item.get(keys["state"], "unknown"),
+        cpu_entitlement=float(item.get(keys["cpu_entitlement"], 0)),
+        memory_mb=int(item.get(keys["memory_mb"], 0)),
+        frame_uuid=ms_uuid,
+    )
 
 
 class HmcApi:
     def __init__(self, session: HmcSession) -> None:
         self.sess = session
+        # None until the first quick-property request tells us.
+        self.quick_supported: Optional[bool] = None
+        # Frames listed concurrently wait for one probe instead of each
+        # sending their own.
+        self._probe_lock = asyncio.Lock()
 
     async def list_managed_systems(self) -> List[ManagedSystem]:
         resp = await self.sess.request("GET", "/rest/api/uom/ManagedSystem")
-        data = resp.json()
+        data = _decode(resp)
         systems: List[ManagedSystem] = []
         for ms in data.get("Items", []):
             systems.append(ManagedSystem(uuid=ms["uuid"], name=ms["name"]))
         return systems
 
-    async def list_lpars(self, ms_uuid: str) -> List[LogicalPartition]:
-        resp = await self.sess.request(
-            "GET", f"/rest/api/uom/LogicalPartition?managedSystemUuid={ms_uuid}"
-        )
-        data = resp.json()
-        lpars: List[LogicalPartition] = []
-        for lp in data.get("Items", []):
-            lpars.append(
-                LogicalPartition(
-                    uuid=lp["uuid"],
-                    name=lp["name"],
-                    state=lp.get("state", "unknown"),
-                    cpu_entitlement=float(lp.get("entitledProcUnits", 0)),
-                    memory_mb=int(lp.get("memory", 0)),
-                )
-            )
-        return lpars
+    async def list_lpars(
+        self, ms_uuid: str, fields: Optional[Iterable[str]] = None
+    ) -> List[LogicalPartition]:
+        """List the LPARs of a managed system.
+
+        With ``fields`` only those :class:`LogicalPartition` fields are
+        guaranteed to be populated; the rest may hold defaults.
+        """
+
+        url = f"/rest/api/uom/LogicalPartition?managedSystemUuid={ms_uuid}"
+        if fields is not None:
+            wanted = set(fields)
+            if not wanted <= LPAR_FIELDS:
+                raise ValueError(f"unknown LPAR fields: {sorted(wanted - LPAR_FIELDS)}")
+            if wanted <= _QUICK_PROPERTIES.keys() and self.quick_supported is not False:
+                quick = await self._quick_lpars(ms_uuid)
+                if quick is not None:
+                    return quick
+            url += "&group=None"
+        resp = await self.sess.request("GET", url)
+        data = _decode(resp)
+        return [_lpar(lp, _ROOT_PROPERTIES, ms_uuid) for lp in data.get("Items", [])]
+
+    async def _quick_lpars(self, ms_uuid: str) -> Optional[List[LogicalPartition]]:
+        url = f"/rest/api/uom/ManagedSystem/{ms_uuid}/LogicalPartition/quick/All"
+        resp = None
+        if self.quick_supported is None:
+            async with self._probe_lock:
+                if self.quick_supported is None:
+                    resp = await self._probe_quick(url)
+        if self.quick_supported is False:
+            return None
+        if resp is None:
+            resp = await self._get_quick(url)
+            if resp is None:
+                return None
+        items = _decode(resp)
+        return [_lpar(item, _QUICK_PROPERTIES, ms_uuid) for item in items]
+
+    async def _probe_quick(self, url: str) -> Optional[httpx.Response]:
+        """Try the quick feed once, recording whether the HMC has it.
+
+        The probe is a single attempt: an HMC without the feed answers 501,
+        which the session would otherwise retry with backoff and charge to
+        the shared retry budget. Other failures are raised and leave the
+        question open for the next frame.
+        """
+
+        import httpx
+
+        try:
+            resp = await self.sess.probe("GET", url)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code not in _QUICK_UNSUPPORTED:
+                raise
+            resp = exc.response
+        self.quick_supported = resp.status_code not in _QUICK_UNSUPPORTED
+        return resp if self.quick_supported else None
+
+    async def _get_quick(self, url: str) -> Optional[httpx.Response]:
+        import httpx
+
+        try:
+            resp = await self.sess.request("GET", url)
+        except httpx.HTTPStatusError as exc:
+            # The session raises for 5xx; a 501 means the feed does not exist.
+            if exc.response.status_code not in _QUICK_UNSUPPORTED:
+                raise
+            resp = exc.response
+        self.quick_supported = resp.status_code not in _QUICK_UNSUPPORTED
+        return resp if self.quick_supported else None
 
     async def pcm_metrics(self, ms_uuid: str, lpar_uuid: str) -> Dict[str, Any]:
         resp = await self.sess.request(
             "GET",
             f"/rest/api/pcm/ManagedSystem/{ms_uuid}/LogicalPartition/{lpar_uuid}/Metrics",
         )
-        return resp.json()
+        metrics: Dict[str, Any] = _decode(resp)
+        return metrics
 
 
-__all__ = ["HmcApi", "ManagedSystem", "LogicalPartition"]
+__all__ = ["LPAR_FIELDS", "HmcApi", "ManagedSystem", "LogicalPartition"]
@@ -0,0 +1,320 @@
+"""Prometheus metrics and exporters for the HMC orchestrator."""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict
+
+from prometheus_client import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    start_http_server,
+    write_to_textfile,
+)
+
+# HMC REST calls routinely take hundreds of milliseconds, PCM queries and
+# DLPAR jobs considerably longer.
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+
+def parse_buckets(value: str | None) -> tuple[float, ...]:
+    """Parse a comma separated list of histogram bucket bounds."""
+
+    if not value:
+        return DEFAULT_LATENCY_BUCKETS
+    try:
+        buckets = sorted({float(v) for v in value.split(",") if v.strip()})
+    except ValueError as exc:
+        raise ValueError(f"invalid latency buckets: {value!r}") from exc
+    return tuple(buckets) or DEFAULT_LATENCY_BUCKETS
+
+
+# Shared by the hmc_orchestrator and hmc_power_orchestrator histograms.
+LATENCY_BUCKETS = parse_buckets(os.getenv("HMC_METRICS_LATENCY_BUCKETS"))
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+CPU_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+# UOM feeds range from a few KiB to tens of MiB for large frames.
+SIZE_BUCKETS = tuple(float(4**n * 1024) for n in range(10))  # 1 KiB .. 256 MiB
+
+REQUEST_LATENCY = Histogram(
+    "hmc_orchestrator_request_seconds",
+    "Latency of a single HMC REST request attempt",
+    labelnames=("method", "endpoint"),
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_RETRIES = Counter(
+    "hmc_orchestrator_request_retries_total",
+    "HMC REST requests retried after a failed attempt",
+    labelnames=("endpoint", "reason"),
+)
+RETRY_BUDGET_EXHAUSTED = Counter(
+    "hmc_orchestrator_retry_budget_exhausted_total",
+    "Failed attempts not retried because the retry budget was spent",
+    labelnames=("endpoint",),
+)
+RETRY_AMPLIFICATION = Gauge(
+    "hmc_orchestrator_retry_amplification",
+    "Attempts sent per logical request by an HMC session",
+    labelnames=("hmc",),
+)
+DEADLINE_EXCEEDED = Counter(
+    "hmc_orchestrator_deadline_exceeded_total",
+    "Requests abandoned because their operation deadline could not be met",
+    labelnames=("endpoint",),
+)
+HEDGES = Counter(
+    "hmc_orchestrator_hedged_requests_total",
+    "Duplicate GETs sent because the first had not answered in time",
+    labelnames=("endpoint",),
+)
+HEDGE_WINS = Counter(
+    "hmc_orchestrator_hedge_wins_total",
+    "Hedged GETs by which copy answered first",
+    labelnames=("endpoint", "winner"),
+)
+SEMAPHORE_WAIT = Histogram(
+    "hmc_orchestrator_semaphore_wait_seconds",
+    "Time spent waiting for a session concurrency slot",
+    buckets=WAIT_BUCKETS,
+)
+LOGINS = Counter("hmc_orchestrator_logins_total", "HMC logon requests performed")
+IN_FLIGHT = Gauge(
+    "hmc_orchestrator_requests_in_flight", "HMC REST requests currently in flight"
+)
+FRAME_COLLECTION = Histogram(
+    "hmc_orchestrator_frame_collection_seconds",
+    "Time to collect the LPAR inventory of one managed system",
+    buckets=LATENCY_BUCKETS,
+)
+EVALUATION = Histogram(
+    "hmc_orchestrator_evaluation_seconds",
+    "Duration of a policy evaluation pass",
+    buckets=CPU_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    "hmc_orchestrator_response_bytes",
+    "HMC response body size as transferred, by content encoding",
+    labelnames=("endpoint", "encoding"),
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_DECODED_BYTES = Histogram(
+    "hmc_orchestrator_response_decoded_bytes",
+    "HMC response body size after content decoding",
+    labelnames=("endpoint",),
+    buckets=SIZE_BUCKETS,
+)
+DECODE_SECONDS = Histogram(
+    "hmc_orchestrator_decode_seconds",
+    "Time to parse an HMC JSON response body",
+    labelnames=("endpoint",),
+    buckets=CPU_BUCKETS,
+)
+POOL_CONNECTIONS = Gauge(
+    "hmc_orchestrator_pool_connections",
+    "Pooled HTTP connections per HMC by state",
+    labelnames=("hmc", "state"),
+)
+POOL_WAIT = Histogram(
+    "hmc_orchestrator_pool_wait_seconds",
+    "Time from issuing a request until a pooled connection was assigned",
+    buckets=WAIT_BUCKETS,
+)
+CONNECTIONS_OPENED = Counter(
+    "hmc_orchestrator_connections_opened_total",
+    "New TCP connections opened to an HMC",
+    labelnames=("hmc",),
+)
+TLS_HANDSHAKES = Counter(
+    "hmc_orchestrator_tls_handshakes_total",
+    "TLS handshakes completed against an HMC",
+    labelnames=("hmc",),
+)
+
+# Concrete request paths embed LPAR names and UUIDs. They are mapped onto
+# route templates before being used as metric labels so the number of time
+# series stays bounded regardless of fleet size.
+ROUTE_TEMPLATES: tuple[tuple[re.Pattern[str], str], ...] = (
+    (re.compile(r"^/api/lpars/[^/]+/resize$"), "/api/lpars/{lpar}/resize"),
+    (re.compile(r"^/api/lpars/[^/]+$"), "/api/lpars/{lpar}"),
+    (re.compile(r"^/api/frames/[^/]+/lpars$"), "/api/frames/{frame}/lpars"),
+)
+# UOM/PCM object names followed by an object ID.
+_OBJECT_ID = re.compile(
+    r"/(ManagedSystem|LogicalPartition|VirtualIOServer|Job)/(?!quick(?:/|$))[^/]+"
+)
+_ID_SEGMENT = re.compile(
+    r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-"
+    r"[0-9a-fA-F]{12}|[0-9a-fA-F]{16,}|\d+)$"
+)
+
+
+def endpoint_template(path: str) -> str:
+    """Return the route template for a concrete request ``path``.
+
+    Query strings are dropped, known routes are matched against
+    :data:`ROUTE_TEMPLATES`, and the ID following a UOM/PCM object name as
+    well as any remaining UUID, hex or numeric segment becomes ``{id}``.
+    """
+
+    path = "/" + path.split("?", 1)[0].strip("/")
+    for pattern, template in ROUTE_TEMPLATES:
+        if pattern.match(path):
+            return template
+    path = _OBJECT_ID.sub(r"/\1/{id}", path)
+    return "/".join(
+        "{id}" if _ID_SEGMENT.match(seg) else seg for seg in path.split("/")
+    )
+
+
+def wire_size(resp: Any) -> int:
+    """Bytes received for an httpx or requests ``resp`` before decoding.
+
+    In-process transports hand over pre-read bodies, for which httpx does
+    not count downloaded bytes; fall back to ``Content-Length`` then.
+    """
+
+    downloaded = getattr(resp, "num_bytes_downloaded", 0)
+    if downloaded:
+        return int(downloaded)
+    raw = getattr(resp, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        read = raw.tell()  # urllib3: bytes read before decompression
+        if read:
+            return int(read)
+    length = resp.headers.get("content-length")
+    return int(length) if length else len(resp.content)
+
+
+@dataclass
+class _Traffic:
+    requests: int = 0
+    wire: int = 0
+    decoded: int = 0
+    decode_seconds: float = 0.0
+
+
+class TrafficTally:
+    """Per-run bytes and decode time by endpoint, for ``--bandwidth``.
+
+    Fed by ``HmcSession`` and by both ``hmc_power_orchestrator`` clients.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.endpoints: Dict[str, _Traffic] = {}
+
+    def _entry(self, endpoint: str) -> _Traffic:
+        entry = self.endpoints.get(endpoint)
+        if entry is None:
+            entry = self.endpoints.setdefault(endpoint, _Traffic())
+        return entry
+
+    def response(self, endpoint: str, resp: Any) -> None:
+        wire, decoded = wire_size(resp), len(resp.content)
+        encoding = resp.headers.get("content-encoding", "identity")
+        RESPONSE_BYTES.labels(endpoint=endpoint, encoding=encoding).observe(wire)
+        RESPONSE_DECODED_BYTES.labels(endpoint=endpoint).observe(decoded)
+        with self._lock:
+            entry = self._entry(endpoint)
+            entry.requests += 1
+            entry.wire += wire
+            entry.decoded += decoded
+
+    def decode(self, endpoint: str, seconds: float) -> None:
+        DECODE_SECONDS.labels(endpoint=endpoint).observe(seconds)
+        with self._lock:
+            self._entry(endpoint).decode_seconds += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self.endpoints.clear()
+
+    def summary(self) -> str:
+        lines = [
+            f"{'endpoint':<48} {'requests':>8} {'wire KiB':>10} "
+            f"{'body KiB':>10} {'ratio':>6} {'decode ms':>10}"
+        ]
+        total = _Traffic()
+        for name, t in sorted(self.endpoints.items(), key=lambda kv: -kv[1].wire):
+            lines.append(_traffic_row(name, t))
+            total.requests += t.requests
+            total.wire += t.wire
+            total.decoded += t.decoded
+            total.decode_seconds += t.decode_seconds
+        lines += ["", _traffic_row("total", total)]
+        return "\n".join(lines)
+
+
+def _traffic_row(name: str, t: _Traffic) -> str:
+    ratio = t.decoded / t.wire if t.wire else 1.0
+    return (
+        f"{name[:48]:<48} {t.requests:>8} {t.wire / 1024:>10.1f} "
+        f"{t.decoded / 1024:>10.1f} {ratio:>6.1f} {t.decode_seconds * 1000:>10.1f}"
+    )
+
+
+TRAFFIC = TrafficTally()
+
+
+def start_exporter(port: int, addr: str = "127.0.0.1") -> None:
+    """Serve the default registry over HTTP on ``addr:port``."""
+
+    start_http_server(port, addr=addr)
+
+
+def write_textfile(path: Path) -> None:
+    """Atomically dump the default registry for a textfile collector."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_to_textfile(str(path), REGISTRY)
+
+
+__all__ = [
+    "CONNECTIONS_OPENED",
+    "DEADLINE_EXCEEDED",
+    "DECODE_SECONDS",
+    "DEFAULT_LATENCY_BUCKETS",
+    "EVALUATION",
+    "FRAME_COLLECTION",
+    "HEDGES",
+    "HEDGE_WINS",
+    "IN_FLIGHT",
+    "LATENCY_BUCKETS",
+    "LOGINS",
+    "POOL_CONNECTIONS",
+    "POOL_WAIT",
+    "REQUEST_LATENCY",
+    "REQUEST_RETRIES",
+    "RESPONSE_BYTES",
+    "ROUTE_TEMPLATES",
+    "RETRY_AMPLIFICATION",
+    "RETRY_BUDGET_EXHAUSTED",
+    "RESPONSE_DECODED_BYTES",
+    "SEMAPHORE_WAIT",
+    "TLS_HANDSHAKES",
+    "TRAFFIC",
+    "TrafficTally",
+    "endpoint_template",
+    "parse_buckets",
+    "start_exporter",
+    "wire_size",
+    "write_textfile",
+]
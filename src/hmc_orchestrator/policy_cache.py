@@ -0,0 +1,143 @@
+"""JSON Schema validation and a content-addressed cache of compiled policies.
+
+A compiled artifact is the validated policy serialised as compact JSON,
+stored under the SHA-256 of the policy source. Its header records the
+artifact format, the digest of ``policy_schema.json`` it was validated
+against and an HMAC over header and payload keyed by a per-cache secret.
+Artifacts with a different format or schema digest, or a MAC mismatch, are
+ignored and the policy is recompiled from source.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .exceptions import SchemaError
+
+FORMAT_VERSION = 1
+SCHEMA_PATH = Path(__file__).with_name("policy_schema.json")
+_MAGIC = b"HMCPOL"
+
+
+@lru_cache(maxsize=1)
+def schema_digest() -> str:
+    return hashlib.sha256(SCHEMA_PATH.read_bytes()).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _validator() -> Any:
+    from jsonschema import Draft202012Validator
+
+    schema = json.loads(SCHEMA_PATH.read_text(encoding="utf8"))
+    Draft202012Validator.check_schema(schema)
+    return Draft202012Validator(schema)
+
+
+def validate(policy: Any) -> None:
+    """Raise :class:`SchemaError` if ``policy`` violates the policy schema."""
+
+    errors = sorted(_validator().iter_errors(policy), key=lambda e: list(e.path))
+    if errors:
+        err = errors[0]
+        where = "/".join(str(p) for p in err.path) or "<root>"
+        raise SchemaError(f"{where}: {err.message}")
+
+
+def source_digest(source: bytes) -> str:
+    return hashlib.sha256(source).hexdigest()
+
+
+def default_cache_dir() -> Optional[Path]:
+    """Return the cache directory, or ``None`` when caching is disabled."""
+
+    if os.getenv("HMC_POLICY_CACHE", "1").lower() in {"0", "false", "no", "off"}:
+        return None
+    if env_dir := os.getenv("HMC_POLICY_CACHE_DIR"):
+        return Path(env_dir)
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "hmc_orchestrator" / "policies"
+
+
+class PolicyCache:
+    """Content-addressed store of compiled policy artifacts."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _key(self) -> bytes:
+        key_path = self.directory / ".key"
+        try:
+            return key_path.read_bytes()
+        except FileNotFoundError:
+            pass
+        self.directory.mkdir(parents=True, exist_ok=True)
+        key = secrets.token_bytes(32)
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(key)
+        return key
+
+    def path_for(self, digest: str) -> Path:
+        return self.directory / f"{digest}.pol"
+
+    def _header(self, digest: str) -> bytes:
+        return b"%s %d %s %s" % (
+            _MAGIC,
+            FORMAT_VERSION,
+            schema_digest().encode(),
+            digest.encode(),
+        )
+
+    def load(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the cached policy for ``digest`` if present and intact."""
+
+        try:
+            raw = self.path_for(digest).read_bytes()
+            key = (self.directory / ".key").read_bytes()
+        except OSError:
+            return None
+        header, _, rest = raw.partition(b"\n")
+        mac, _, payload = rest.partition(b"\n")
+        if header != self._header(digest):
+            return None
+        expected = hmac.new(key, header + b"\n" + payload, hashlib.sha256)
+        if not hmac.compare_digest(expected.hexdigest().encode(), mac):
+            return None
+        policy = json.loads(payload)
+        return policy if isinstance(policy, dict) else None
+
+    def store(self, digest: str, policy: Dict[str, Any]) -> Path:
+        """Write the artifact for ``policy``; return its path.
+
+        Raises :class:`ValueError` if ``policy`` has no JSON form (e.g. YAML
+        dates or sets as mapping keys).
+        """
+
+        header = self._header(digest)
+        try:
+            payload = json.dumps(policy, separators=(",", ":")).encode()
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"policy cannot be cached: {exc}") from exc
+        mac = hmac.new(self._key(), header + b"\n" + payload, hashlib.sha256)
+        target = self.path_for(digest)
+        tmp = target.with_suffix(f".{secrets.token_hex(4)}.tmp")
+        tmp.write_bytes(b"\n".join((header, mac.hexdigest().encode(), payload)))
+        os.replace(tmp, target)
+        return target
+
+
+__all__ = [
+    "FORMAT_VERSION",
+    "PolicyCache",
+    "default_cache_dir",
+    "schema_digest",
+    "source_digest",
+    "validate",
+]
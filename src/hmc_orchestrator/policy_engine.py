@@ -2,15 +2,29 @@
 
 from __future__ import annotations
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, time, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple, TypedDict, cast
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    cast,
+)
 
 import yaml
 
 from .exceptions import SchemaError
 from .hmc_api import LogicalPartition
+from .policy_cache import PolicyCache, default_cache_dir, source_digest
+from .policy_cache import validate as validate_schema
 
 
 class CpuPolicyCfg(TypedDict, total=False):
@@ -35,31 +49,69 @@ class Decision:
     cooldown_remaining: int
 
 
-def load_policy(path: str) -> Dict[str, Any]:
-    """Load policy and perform minimal structural validation.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-    Only paths within the current working directory tree are accepted to
-    avoid directory traversal to unintended locations.
-    """
 
+def _resolve_policy_path(path: str) -> Path:
     base_dir = Path.cwd().resolve()
     policy_path = Path(path).expanduser().resolve()
     try:
         policy_path.relative_to(base_dir)
     except ValueError as exc:  # pragma: no cover - defensive
         raise ValueError("invalid policy path") from exc
+    return policy_path
 
-    with policy_path.open("r", encoding="utf8") as fh:
-        policy = yaml.safe_load(fh)
+
+def _compile(source: bytes) -> Dict[str, Any]:
+    policy = yaml.load(source, Loader=_YamlLoader)  # nosec B506 - safe loader
     # Minimal validation: ensure required fields exist
     if not isinstance(policy, dict) or "rules" not in policy:
         raise SchemaError("rules required")
     for rule in policy.get("rules", []):
         if "match" not in rule or "targets" not in rule:
             raise SchemaError("each rule requires match and targets")
+    validate_schema(policy)
     return policy
 
 
+def load_policy(
+    path: str, *, cache_dir: Optional[Path] = None, use_cache: bool = True
+) -> Dict[str, Any]:
+    """Load and validate a policy, reusing a compiled artifact when possible.
+
+    Only paths within the current working directory tree are accepted to
+    avoid directory traversal to unintended locations. Compiled artifacts
+    are looked up by the SHA-256 of the file content in ``cache_dir``
+    (default: :func:`~hmc_orchestrator.policy_cache.default_cache_dir`).
+    """
+
+    source = _resolve_policy_path(path).read_bytes()
+    cache_dir = cache_dir or default_cache_dir()
+    if cache_dir is None or not use_cache:
+        return _compile(source)
+    cache = PolicyCache(cache_dir)
+    digest = source_digest(source)
+    cached = cache.load(digest)
+    if cached is not None:
+        return cached
+    policy = _compile(source)
+    try:
+        cache.store(digest, policy)
+    except (OSError, ValueError):
+        pass  # a read-only cache or a policy without a JSON form is not fatal
+    return policy
+
+
+def compile_policy(path: str, *, cache_dir: Optional[Path] = None) -> Path:
+    """Validate ``path`` and write its compiled artifact; return its location."""
+
+    source = _resolve_policy_path(path).read_bytes()
+    cache_dir = cache_dir or default_cache_dir()
+    if cache_dir is None:
+        raise ValueError("policy cache is disabled")
+    return PolicyCache(cache_dir).store(source_digest(source), _compile(source))
+
+
 def _expand_days(days: str) -> Iterable[str]:
     names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     if "-" in days:
@@ -99,9 +151,36 @@ def _within_window(window: Optional[str], now: Optional[datetime] = None) -> boo
     return _time_in_range(start, end, now.time())
 
 
+RuleIndex = Tuple[Dict[str, int], Dict[str, int]]
+
+
+def _index_rules(rules: List[Dict[str, Any]]) -> RuleIndex:
+    """Map LPAR names and UUIDs to the position of the first matching rule."""
+
+    names: Dict[str, int] = {}
+    uuids: Dict[str, int] = {}
+    for pos, rule in enumerate(rules):
+        match = rule["match"]
+        for name in match.get("lpar_names", []):
+            names.setdefault(name, pos)
+        for uuid in match.get("lpar_uuids", []):
+            uuids.setdefault(uuid, pos)
+    return names, uuids
+
+
 def _match_rule(
-    rules: List[Dict[str, Any]], lp: LogicalPartition, defaults: CpuPolicyCfg
+    rules: List[Dict[str, Any]],
+    lp: LogicalPartition,
+    defaults: CpuPolicyCfg,
+    index: Optional[RuleIndex] = None,
 ) -> Optional[CpuPolicyCfg]:
+    if index is not None:
+        # Same first-match semantics as the linear scan, in O(1).
+        end = len(rules)
+        pos = min(index[0].get(lp.name, end), index[1].get(lp.uuid, end))
+        if pos == end:
+            return None
+        rules = rules[pos : pos + 1]
     rule_cfg: CpuPolicyCfg = defaults.copy()
     for rule in rules:
         match = rule["match"]
@@ -190,7 +269,7 @@ def _compute_decision(
             reasons.append(reason)
     delta_cpu = target_cpu - lp.cpu_entitlement
     return Decision(
-        frame_uuid="",
+        frame_uuid=lp.frame_uuid,
         lpar_uuid=lp.uuid,
         lpar_name=lp.name,
         current={"cpu_ent": lp.cpu_entitlement, "mem_mb": lp.memory_mb},
@@ -202,21 +281,131 @@ def _compute_decision(
     )
 
 
-def evaluate(
+def _evaluate_each(
     policy: Dict[str, Any],
-    lpars: List[LogicalPartition],
+    index: RuleIndex,
+    lpars: Iterable[LogicalPartition],
     metrics: Dict[str, Dict[str, float]],
-    now: Optional[datetime] = None,
-) -> List[Decision]:
+    now: Optional[datetime],
+) -> Iterator[Optional[Decision]]:
+    """Yield one decision per LPAR, or ``None`` where no rule matches."""
+
     defaults = cast(CpuPolicyCfg, policy.get("defaults", {}))
-    decisions: List[Decision] = []
+    rules = policy["rules"]
     for lp in lpars:
-        cfg = _match_rule(policy["rules"], lp, defaults)
+        cfg = _match_rule(rules, lp, defaults, index)
         if not cfg:
+            yield None
             continue
-        metric = metrics.get(lp.uuid, {})
-        decisions.append(_compute_decision(lp, cfg, metric, now))
-    return decisions
+        yield _compute_decision(lp, cfg, metrics.get(lp.uuid, {}), now)
+
+
+def evaluate(
+    policy: Dict[str, Any],
+    lpars: List[LogicalPartition],
+    metrics: Dict[str, Dict[str, float]],
+    now: Optional[datetime] = None,
+) -> List[Decision]:
+    from .metrics import EVALUATION
+
+    with EVALUATION.time():
+        index = _index_rules(policy["rules"])
+        return [
+            d
+            for d in _evaluate_each(policy, index, lpars, metrics, now)
+            if d is not None
+        ]
+
+
+# Sharded evaluation ---------------------------------------------------------
+
+SHARD_MIN_LPARS = 100_000
+_worker: Optional[Tuple[Dict[str, Any], RuleIndex, Optional[datetime]]] = None
+
+
+def _init_shard_worker(policy: Dict[str, Any], now: Optional[datetime]) -> None:
+    """Process-pool initializer: compile the policy once per worker."""
+
+    global _worker
+    _worker = (policy, _index_rules(policy["rules"]), now)
+
+
+def _evaluate_shard(
+    lpars: List[LogicalPartition], metrics: Dict[str, Dict[str, float]]
+) -> List[Optional[Decision]]:
+    assert _worker is not None, "worker not initialised"  # nosec B101
+    policy, index, now = _worker
+    return list(_evaluate_each(policy, index, lpars, metrics, now))
 
 
-__all__ = ["Decision", "load_policy", "evaluate"]
+def _partition(lpars: List[LogicalPartition], shards: int) -> List[List[int]]:
+    """Split LPAR positions into ``shards`` balanced groups, keeping frames
+    together unless a frame alone exceeds a fair share."""
+
+    by_frame: Dict[str, List[int]] = {}
+    for pos, lp in enumerate(lpars):
+        by_frame.setdefault(lp.frame_uuid, []).append(pos)
+    share = -(-len(lpars) // shards)
+    groups: List[List[int]] = []
+    for positions in by_frame.values():
+        groups.extend(
+            positions[i : i + share] for i in range(0, len(positions), share)
+        )
+    groups.sort(key=len, reverse=True)
+    buckets: List[List[int]] = [[] for _ in range(shards)]
+    for group in groups:
+        min(buckets, key=len).extend(group)
+    return [sorted(b) for b in buckets if b]
+
+
+def evaluate_sharded(
+    policy: Dict[str, Any],
+    lpars: List[LogicalPartition],
+    metrics: Dict[str, Dict[str, float]],
+    now: Optional[datetime] = None,
+    *,
+    workers: Optional[int] = None,
+    min_lpars: int = SHARD_MIN_LPARS,
+) -> List[Decision]:
+    """Evaluate across a process pool, partitioning LPARs by frame.
+
+    Falls back to :func:`evaluate` for fewer than ``min_lpars`` LPARs or a
+    single worker. Decisions are returned in input order, exactly as the
+    serial path would produce them.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(lpars) < min_lpars:
+        return evaluate(policy, lpars, metrics, now)
+
+    from .metrics import EVALUATION
+
+    # Pin "now" so every worker checks windows against the same instant.
+    now = now or datetime.now(timezone.utc)
+    shards = _partition(lpars, workers)
+    results: List[Optional[Decision]] = [None] * len(lpars)
+    with EVALUATION.time(), ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_shard_worker,
+        initargs=(policy, now),
+    ) as pool:
+        futures = []
+        for positions in shards:
+            shard = [lpars[p] for p in positions]
+            shard_metrics = {
+                lp.uuid: metrics[lp.uuid] for lp in shard if lp.uuid in metrics
+            }
+            futures.append(pool.submit(_evaluate_shard, shard, shard_metrics))
+        for positions, future in zip(shards, futures, strict=True):
+            for pos, decision in zip(positions, future.result(), strict=True):
+                results[pos] = decision
+    return [d for d in results if d is not None]
+
+
+__all__ = [
+    "Decision",
+    "compile_policy",
+    "evaluate",
+    "evaluate_sharded",
+    "load_policy",
+]
@@ -0,0 +1,146 @@
+"""Per-phase and per-endpoint timing for ``--profile`` runs."""
+
+from __future__ import annotations
+
+import cProfile
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter, process_time
+from typing import ContextManager, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Timing:
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+
+    def add(self, wall: float, cpu: float) -> None:
+        self.calls += 1
+        self.wall += wall
+        self.cpu += cpu
+
+
+class Profiler:
+    """Accumulate wall and CPU time per named phase and HMC endpoint.
+
+    Phases may nest (``login`` runs inside ``inventory``); each phase reports
+    inclusive time. CPU time is process-wide, so concurrent requests overlap
+    in the per-endpoint CPU column.
+    """
+
+    enabled = True
+
+    def __init__(self, output: Optional[Path] = None) -> None:
+        self.output = output
+        self.phases: Dict[str, Timing] = {}
+        self.endpoints: Dict[str, Timing] = {}
+        self._cprofile = cProfile.Profile() if output else None
+        self._started = perf_counter()
+        self._started_cpu = process_time()
+
+    def start(self) -> None:
+        self._started = perf_counter()
+        self._started_cpu = process_time()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._cprofile is not None and self.output is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(str(self.output))
+
+    @contextmanager
+    def _measure(self, bucket: Dict[str, Timing], name: str) -> Iterator[None]:
+        wall, cpu = perf_counter(), process_time()
+        try:
+            yield
+        finally:
+            timing = bucket.get(name)
+            if timing is None:
+                timing = bucket[name] = Timing()
+            timing.add(perf_counter() - wall, process_time() - cpu)
+
+    def phase(self, name: str) -> ContextManager[None]:
+        return self._measure(self.phases, name)
+
+    def endpoint(self, name: str) -> ContextManager[None]:
+        return self._measure(self.endpoints, name)
+
+    def summary(self) -> str:
+        total_wall = perf_counter() - self._started
+        total_cpu = process_time() - self._started_cpu
+        lines = [_header("phase")]
+        lines += self._rows(self.phases, total_wall)
+        if self.endpoints:
+            lines += ["", _header("endpoint")]
+            lines += self._rows(self.endpoints, total_wall)
+        lines.append("")
+        lines.append(
+            f"{'total':<48} {'':>7} {total_wall * 1000:>10.1f} "
+            f"{total_cpu * 1000:>10.1f}"
+        )
+        if self.output is not None:
+            lines.append(f"cProfile stats written to {self.output}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _rows(bucket: Dict[str, Timing], total_wall: float) -> List[str]:
+        rows = []
+        for name, t in sorted(bucket.items(), key=lambda kv: -kv[1].wall):
+            pct = 100 * t.wall / total_wall if total_wall else 0.0
+            rows.append(
+                f"{name[:48]:<48} {t.calls:>7} {t.wall * 1000:>10.1f} "
+                f"{t.cpu * 1000:>10.1f} {pct:>6.1f}"
+            )
+        return rows
+
+
+def _header(label: str) -> str:
+    return f"{label:<48} {'calls':>7} {'wall ms':>10} {'cpu ms':>10} {'%':>6}"
+
+
+class _NullProfiler:
+    """Stand-in used when profiling is off; every hook is a no-op."""
+
+    enabled = False
+    _null: ContextManager[None] = nullcontext()
+
+    def phase(self, name: str) -> ContextManager[None]:
+        return self._null
+
+    def endpoint(self, name: str) -> ContextManager[None]:
+        return self._null
+
+
+_NULL = _NullProfiler()
+_active: "Profiler | _NullProfiler" = _NULL
+
+
+def get_profiler() -> "Profiler | _NullProfiler":
+    """Return the active profiler (a no-op one unless profiling is on)."""
+
+    return _active
+
+
+def enable(output: Optional[Path] = None) -> Profiler:
+    """Install and start a fresh :class:`Profiler` for this process."""
+
+    global _active
+    profiler = Profiler(output)
+    profiler.start()
+    _active = profiler
+    return profiler
+
+
+def disable() -> None:
+    """Stop the active profiler and restore the no-op one."""
+
+    global _active
+    if isinstance(_active, Profiler):
+        _active.stop()
+    _active = _NULL
+
+
+__all__ = ["Profiler", "Timing", "disable", "enable", "get_profiler"]
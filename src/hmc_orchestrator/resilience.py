@@ -0,0 +1,208 @@
+"""Operation deadlines and retry budgets shared by the HMC clients.
+
+A :class:`Deadline` bounds a logical operation - one client call including
+all of its retries and backoff sleeps. Per-attempt timeouts are clamped to
+the time left, and a retry whose backoff would end after the deadline is not
+attempted: the call fails fast instead of running for several times its
+timeout.
+
+A :class:`RetryBudget` caps retries at a fraction of first attempts, with a
+small reserve so isolated failures are always retried. When an HMC is
+struggling every retry is extra load on it; with a budget the clients stop
+retrying once failures are no longer isolated instead of multiplying the
+offered load by the retry count.
+
+Both can be set for a block of code with :func:`deadline` and
+:func:`retry_budget`. They are carried in context variables, so they apply
+to every client call made inside the block, including asyncio tasks started
+from it.
+
+:class:`LatencyTracker` keeps recent latencies per endpoint; the clients use
+a high percentile of it as the delay after which an idempotent GET is
+hedged with a duplicate request.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import monotonic
+from typing import Deque, Dict, Iterator, Optional
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which an operation must finish."""
+
+    __slots__ = ("expires",)
+
+    def __init__(self, expires: float = math.inf) -> None:
+        self.expires = expires
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "Deadline":
+        """Deadline ``seconds`` from now; ``None`` never expires."""
+
+        return cls(math.inf if seconds is None else monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return monotonic() >= self.expires
+
+    def allows(self, delay: float) -> bool:
+        """Whether waiting ``delay`` seconds still leaves time for an attempt."""
+
+        return monotonic() + delay < self.expires
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """``default`` clamped to the time left; ``None`` if both are unbounded."""
+
+        remaining = self.remaining()
+        if default is not None:
+            remaining = min(default, remaining)
+        return None if math.isinf(remaining) else remaining
+
+    def earliest(self, other: Optional["Deadline"]) -> "Deadline":
+        if other is None or other.expires >= self.expires:
+            return self
+        return other
+
+
+class RetryBudget:
+    """Token bucket allowing ``ratio`` retries per request plus ``reserve``.
+
+    Every first attempt deposits ``ratio`` tokens, every retry withdraws one.
+    The bucket holds at most ``reserve`` tokens and starts full. Thread-safe.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: int = 10) -> None:
+        self.ratio = ratio
+        self.reserve = reserve
+        self._tokens = float(reserve)
+        self._lock = Lock()
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+
+    def request(self) -> None:
+        """Record a first attempt."""
+
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(float(self.reserve), self._tokens + self.ratio)
+
+    def try_retry(self) -> bool:
+        """Withdraw a token for a retry; ``False`` when the budget is spent."""
+
+        with self._lock:
+            if self._tokens < 1.0:
+                self.denied += 1
+                return False
+            self._tokens -= 1.0
+            self.retries += 1
+            return True
+
+    @property
+    def amplification(self) -> float:
+        """Attempts sent per logical request (1.0 means no retries)."""
+
+        if not self.requests:
+            return 1.0
+        return (self.requests + self.retries) / self.requests
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies per key (endpoint). Thread-safe."""
+
+    def __init__(self, window: int = 256, min_samples: int = 20) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        """``pct``-th percentile for ``key``; ``None`` until enough samples."""
+
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+    def hedge_delay(
+        self, key: str, pct: float, default: float, minimum: float = 0.0
+    ) -> float:
+        """Delay before hedging a request to ``key``."""
+
+        observed = self.percentile(key, pct)
+        return max(minimum, default if observed is None else observed)
+
+
+_deadline: ContextVar[Optional[Deadline]] = ContextVar("hmc_deadline", default=None)
+_budget: ContextVar[Optional[RetryBudget]] = ContextVar("hmc_budget", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+def operation_deadline(seconds: Optional[float]) -> Deadline:
+    """Deadline for one client call: ``seconds`` from now or the ambient one."""
+
+    return Deadline.after(seconds).earliest(_deadline.get())
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[Deadline]:
+    """Bound every client call in the block to finish within ``seconds``.
+
+    Nested blocks can only shorten the deadline, never extend it.
+    """
+
+    bound = operation_deadline(seconds)
+    token = _deadline.set(bound)
+    try:
+        yield bound
+    finally:
+        _deadline.reset(token)
+
+
+def current_budget(default: RetryBudget) -> RetryBudget:
+    return _budget.get() or default
+
+
+@contextmanager
+def retry_budget(budget: RetryBudget) -> Iterator[RetryBudget]:
+    """Charge the retries of every client call in the block to ``budget``."""
+
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+__all__ = [
+    "Deadline",
+    "LatencyTracker",
+    "RetryBudget",
+    "current_budget",
+    "current_deadline",
+    "deadline",
+    "operation_deadline",
+    "retry_budget",
+]
@@ -1,49 +1,215 @@
-"""Asynchronous HMC session management with retries."""
+"""Asynchronous HMC session management with retries.
+
+Each session owns one connection pool sized by ``Config.http``. TLS
+handshakes with an HMC are expensive, so the pool keeps as many idle
+connections as it may open, keeps them alive between inventory phases and
+is pre-warmed at login with one connection per concurrency slot (a single
+multiplexed connection with HTTP/2).
+"""
 
 from __future__ import annotations
 
 import asyncio
 from random import SystemRandom
-from typing import Any
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict
 
 import httpx
 
 from .config import Config
-from .exceptions import HmcAuthError, HmcRateLimited
+from .exceptions import DeadlineExceeded, HmcAuthError, HmcError, HmcRateLimited
+from .metrics import (
+    CONNECTIONS_OPENED,
+    DEADLINE_EXCEEDED,
+    HEDGE_WINS,
+    HEDGES,
+    IN_FLIGHT,
+    LOGINS,
+    POOL_CONNECTIONS,
+    POOL_WAIT,
+    REQUEST_LATENCY,
+    REQUEST_RETRIES,
+    RETRY_AMPLIFICATION,
+    RETRY_BUDGET_EXHAUSTED,
+    SEMAPHORE_WAIT,
+    TLS_HANDSHAKES,
+    TRAFFIC,
+    endpoint_template,
+)
+from .profiling import get_profiler
+from .resilience import (
+    Deadline,
+    LatencyTracker,
+    RetryBudget,
+    current_budget,
+    operation_deadline,
+)
 
 _secure_rand = SystemRandom()
 
+Trace = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def _pool_connections(client: httpx.AsyncClient) -> list[Any] | None:
+    """Connections of ``client``'s pool, or ``None`` if they cannot be read.
+
+    httpx has no public pool API. This reads ``AsyncClient._transport._pool``
+    (an httpcore ``AsyncConnectionPool``) as laid out in httpx 0.28 and
+    httpcore 1.0; other layouts or custom transports yield ``None``.
+    """
+
+    try:
+        return list(client._transport._pool.connections)  # type: ignore[attr-defined]
+    except AttributeError:
+        return None
+
 
 class HmcSession:
-    """Manage an authenticated session against the HMC REST API."""
+    """Manage an authenticated session against the HMC REST API.
+
+    Retries of all requests on the session draw from one
+    :class:`~hmc_orchestrator.resilience.RetryBudget` unless a budget is set
+    for the calling context with ``resilience.retry_budget``.
+
+    With ``hedging.enabled`` a GET still unanswered after the configured
+    latency percentile of its endpoint is sent a second time; the first
+    reply wins and the other request is cancelled. Hedges are capped by
+    their own budget so they add at most a few percent of load.
+    """
 
     def __init__(
-        self, cfg: Config, transport: httpx.AsyncBaseTransport | None = None
+        self,
+        cfg: Config,
+        transport: httpx.AsyncBaseTransport | None = None,
+        budget: RetryBudget | None = None,
     ) -> None:
         self.cfg = cfg
-        limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
-        timeout = httpx.Timeout(cfg.timeout.read, connect=cfg.timeout.connect)
-        self.client = httpx.AsyncClient(
-            base_url=f"https://{cfg.host}:{cfg.port}",
-            verify=cfg.verify,
-            timeout=timeout,
-            limits=limits,
-            transport=transport,
+        self.budget = budget or RetryBudget(
+            cfg.retries.budget_ratio, cfg.retries.budget_reserve
+        )
+        hedging = cfg.hedging
+        self.hedge_budget = RetryBudget(hedging.budget_ratio, hedging.budget_reserve)
+        self.latencies = LatencyTracker()
+        http = cfg.http
+        limits = httpx.Limits(
+            max_connections=http.max_connections,
+            max_keepalive_connections=min(http.max_keepalive, http.max_connections),
+            keepalive_expiry=http.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            cfg.timeout.read, connect=cfg.timeout.connect, pool=cfg.timeout.read
         )
+        # httpx advertises every encoding it can decode (gzip, deflate, and
+        # br/zstd when those packages are installed).
+        headers = {} if http.compression else {"Accept-Encoding": "identity"}
+        try:
+            self.client = httpx.AsyncClient(
+                headers=headers,
+                base_url=f"https://{cfg.host}:{cfg.port}",
+                verify=cfg.verify,
+                timeout=timeout,
+                limits=limits,
+                http2=http.http2,
+                transport=transport,
+            )
+        except ImportError as exc:
+            raise HmcError(
+                "http.http2 requires the 'h2' package: "
+                "pip install 'hmc-power-orchestrator[http2]'"
+            ) from exc
         self._sem = asyncio.Semaphore(cfg.concurrency.per_frame)
         self._logged_in = False
+        # Injected transports (simulator, tests) have no pool to warm, and
+        # warm-up HEADs would show up in their request and status counts.
+        self._warmed = transport is not None
+        self._host = str(cfg.host)
 
     async def close(self) -> None:
         await self.client.aclose()
 
+    def _prewarm_count(self) -> int:
+        http = self.cfg.http
+        if self._warmed or http.http2:
+            return 0
+        wanted = http.prewarm
+        if wanted is None:
+            wanted = self.cfg.concurrency.per_frame
+        return max(0, min(wanted, http.max_keepalive, http.max_connections) - 1)
+
+    async def _warm_connection(self, **kwargs: Any) -> None:
+        try:
+            await self.client.head("/", extensions={"trace": self._trace()}, **kwargs)
+        except httpx.HTTPError:
+            pass  # a failed warm-up only costs the handshake we tried to save
+
     async def login(self) -> None:
-        resp = await self.client.post(
-            "/rest/api/web/Logon",
-            json={"userid": self.cfg.username, "password": self.cfg.password},
-        )
-        resp.raise_for_status()
+        """Log on, bounded like any other call by the operation deadline."""
+
+        op = operation_deadline(self.cfg.retries.deadline)
+        if op.expired:
+            raise self._deadline_exceeded("/rest/api/web/Logon")
+        timeout = self._attempt_timeout(op)
+        kwargs: Dict[str, Any] = {} if timeout is None else {"timeout": timeout}
+        LOGINS.inc()
+        warm = [self._warm_connection(**kwargs) for _ in range(self._prewarm_count())]
+        self._warmed = True
+        with get_profiler().phase("login"):
+            logon = asyncio.ensure_future(
+                self.client.post(
+                    "/rest/api/web/Logon",
+                    json={"userid": self.cfg.username, "password": self.cfg.password},
+                    extensions={"trace": self._trace()},
+                    **kwargs,
+                )
+            )
+            await asyncio.gather(logon, *warm)
+        self._export_pool_stats()
+        logon.result().raise_for_status()
         self._logged_in = True
 
+    def _trace(self) -> Trace:
+        """httpcore trace hook recording pool wait and new connections."""
+
+        started = perf_counter()
+        assigned = False
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            nonlocal assigned
+            if not assigned and (
+                event == "connection.connect_tcp.started"
+                or event.endswith(".send_request_headers.started")
+            ):
+                assigned = True
+                POOL_WAIT.observe(perf_counter() - started)
+            if event == "connection.connect_tcp.complete":
+                CONNECTIONS_OPENED.labels(hmc=self._host).inc()
+            elif event == "connection.start_tls.complete":
+                TLS_HANDSHAKES.labels(hmc=self._host).inc()
+
+        return trace
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Connections in the pool, split into idle and active.
+
+        Empty when a custom transport without a connection pool is used.
+        """
+
+        connections = _pool_connections(self.client)
+        if connections is None:
+            return {}
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+        }
+
+    def _export_pool_stats(self) -> None:
+        stats = self.pool_stats()
+        for state in ("idle", "active"):
+            if state in stats:
+                POOL_CONNECTIONS.labels(hmc=self._host, state=state).set(stats[state])
+
     async def logout(self) -> None:
         if not self._logged_in:
             return
@@ -55,7 +221,15 @@ class HmcSession:
     ) -> httpx.Response:
         if not self._logged_in:
             await self.login()
-        resp = await self.client.request(method, url, **kwargs)
+        endpoint = endpoint_template(url)
+        with IN_FLIGHT.track_inprogress(), REQUEST_LATENCY.labels(
+            method=method, endpoint=endpoint
+        ).time(), get_profiler().endpoint(f"{method} {endpoint}"):
+            resp = await self.client.request(
+                method, url, extensions={"trace": self._trace()}, **kwargs
+            )
+        TRAFFIC.response(endpoint, resp)
+        self._export_pool_stats()
         if resp.status_code == 401:
             self._logged_in = False
             raise HmcAuthError("session expired")
@@ -65,22 +239,134 @@ class HmcSession:
             resp.raise_for_status()
         return resp
 
-    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
-        """Wrapper performing retries with exponential backoff and jitter."""
-
-        for attempt in range(1, self.cfg.retries.total + 1):
-            try:
-                async with self._sem:
-                    return await self._request_once(method, url, **kwargs)
-            except (HmcAuthError, HmcRateLimited, httpx.HTTPError):
-                if attempt == self.cfg.retries.total:
-                    raise
-                delay = min(
-                    self.cfg.retries.max_backoff,
-                    self.cfg.retries.backoff_base * (2 ** (attempt - 1)),
+    def _attempt_timeout(self, op: Deadline) -> httpx.Timeout | None:
+        read = op.timeout(self.cfg.timeout.read)
+        if read is None or read >= self.cfg.timeout.read:
+            return None  # the client default already fits
+        return httpx.Timeout(read, connect=min(read, self.cfg.timeout.connect))
+
+    def _deadline_exceeded(self, url: str) -> DeadlineExceeded:
+        DEADLINE_EXCEEDED.labels(endpoint=endpoint_template(url)).inc()
+        return DeadlineExceeded(f"deadline exceeded for {url}")
+
+    async def _attempt(
+        self, op: Deadline, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response:
+        queued = perf_counter()
+        try:
+            await asyncio.wait_for(self._sem.acquire(), op.timeout())
+        except asyncio.TimeoutError:
+            raise self._deadline_exceeded(url) from None
+        try:
+            SEMAPHORE_WAIT.observe(perf_counter() - queued)
+            timeout = self._attempt_timeout(op)
+            if timeout is not None:
+                kwargs.setdefault("timeout", timeout)
+            started = perf_counter()
+            resp = await self._request_once(method, url, **kwargs)
+            self.latencies.observe(endpoint_template(url), perf_counter() - started)
+            return resp
+        finally:
+            self._sem.release()
+
+    async def _hedged(
+        self, op: Deadline, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response:
+        """Run an attempt, duplicating it if it is slow; first success wins."""
+
+        hedging = self.cfg.hedging
+        endpoint = endpoint_template(url)
+        self.hedge_budget.request()
+        delay = self.latencies.hedge_delay(
+            endpoint, hedging.percentile, hedging.initial_delay, hedging.min_delay
+        )
+        primary = asyncio.ensure_future(self._attempt(op, method, url, **kwargs))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=op.timeout(delay))
+            if done or op.expired or not self.hedge_budget.try_retry():
+                return await primary
+            HEDGES.labels(endpoint=endpoint).inc()
+            tasks.append(
+                asyncio.ensure_future(self._attempt(op, method, url, **kwargs))
+            )
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
-                delay += _secure_rand.uniform(0, self.cfg.retries.backoff_base)
-                await asyncio.sleep(delay)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "primary" if task is primary else "hedge"
+                        HEDGE_WINS.labels(endpoint=endpoint, winner=winner).inc()
+                        return task.result()
+            return primary.result()  # both failed: surface the original error
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            await asyncio.gather(*losers, return_exceptions=True)
+
+    async def probe(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a single attempt: no retries, no hedge, no retry budget charge.
+
+        For capability checks whose failure is an answer in itself. Errors
+        are raised as by :meth:`request` (5xx as ``httpx.HTTPStatusError``).
+        """
+
+        op = operation_deadline(self.cfg.retries.deadline)
+        if op.expired:
+            raise self._deadline_exceeded(url)
+        try:
+            return await self._attempt(op, method, url, **kwargs)
+        except (HmcAuthError, HmcRateLimited, httpx.HTTPError) as exc:
+            if op.expired:
+                raise self._deadline_exceeded(url) from exc
+            raise
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Wrapper performing retries with exponential backoff and jitter.
+
+        The whole call, retries and backoff included, is bounded by
+        ``retries.deadline`` (or a shorter ``resilience.deadline`` block) and
+        retries are charged to the retry budget. Once either is spent the
+        call fails fast: :class:`DeadlineExceeded`, or the last error.
+        """
+
+        op = operation_deadline(self.cfg.retries.deadline)
+        budget = current_budget(self.budget)
+        budget.request()
+        try:
+            for attempt in range(1, self.cfg.retries.total + 1):
+                if op.expired:
+                    raise self._deadline_exceeded(url)
+                try:
+                    if method == "GET" and self.cfg.hedging.enabled:
+                        return await self._hedged(op, method, url, **kwargs)
+                    return await self._attempt(op, method, url, **kwargs)
+                except (HmcAuthError, HmcRateLimited, httpx.HTTPError) as exc:
+                    if op.expired:
+                        raise self._deadline_exceeded(url) from exc
+                    if attempt == self.cfg.retries.total:
+                        raise
+                    delay = min(
+                        self.cfg.retries.max_backoff,
+                        self.cfg.retries.backoff_base * (2 ** (attempt - 1)),
+                    )
+                    delay += _secure_rand.uniform(0, self.cfg.retries.backoff_base)
+                    if not op.allows(delay):
+                        raise self._deadline_exceeded(url) from exc
+                    if not budget.try_retry():
+                        RETRY_BUDGET_EXHAUSTED.labels(
+                            endpoint=endpoint_template(url)
+                        ).inc()
+                        raise
+                    REQUEST_RETRIES.labels(
+                        endpoint=endpoint_template(url), reason=type(exc).__name__
+                    ).inc()
+                    await asyncio.sleep(delay)
+        finally:
+            RETRY_AMPLIFICATION.labels(hmc=self._host).set(budget.amplification)
 
         raise RuntimeError("unreachable")
 
@@ -0,0 +1,362 @@
+"""In-process HMC REST API simulator for tests and load experiments.
+
+The simulator plugs into both HTTP stacks through httpx transports:
+:class:`AsyncSimulatorTransport` for :class:`~hmc_orchestrator.session.HmcSession`
+and :class:`SimulatorTransport` for
+:class:`hmc_power_orchestrator.hmc_client.HMCClient`. It serves
+
+* ``/rest/api/web/Logon`` and ``Logoff`` with cookie based sessions that can
+  expire after a number of seconds or requests,
+* UOM ``ManagedSystem`` and ``LogicalPartition`` collections, including
+  ``group=None`` root-only objects and the per-frame ``quick/All`` feed,
+* PCM ``.../LogicalPartition/{uuid}/Metrics``,
+* the paginated ``/api/lpars`` collection and ``/api/lpars/{lpar}/resize``
+  jobs (polled through ``/api/jobs/{id}``).
+
+Latency is drawn from an injectable distribution and a configurable share of
+requests fails with 429 or 5xx. Responses are gzip-compressed when the client
+accepts it, and ``link_bytes_per_second`` adds transfer time proportional to
+the bytes on the wire to emulate a slow management network.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from uuid import UUID
+
+import httpx
+
+LatencyFn = Callable[[random.Random], float]
+
+_SESSION_COOKIE = "JSESSIONID"
+_ATTRIBUTE_GROUPS = (
+    "ProcessorConfiguration",
+    "MemoryConfiguration",
+    "IOConfiguration",
+    "NetworkConfiguration",
+    "StorageConfiguration",
+    "Capabilities",
+)
+
+
+def no_latency() -> LatencyFn:
+    return lambda rnd: 0.0
+
+
+def constant(seconds: float) -> LatencyFn:
+    return lambda rnd: seconds
+
+
+def lognormal(median: float, sigma: float = 0.5) -> LatencyFn:
+    """Long-tailed latency with the given median, in seconds."""
+
+    mu = math.log(median) if median > 0 else 0.0
+    return lambda rnd: rnd.lognormvariate(mu, sigma) if median > 0 else 0.0
+
+
+def with_stalls(base: LatencyFn, probability: float, stall: float) -> LatencyFn:
+    """Add an occasional ``stall`` (seconds) on top of ``base``."""
+
+    return lambda rnd: base(rnd) + (stall if rnd.random() < probability else 0.0)
+
+
+@dataclass
+class SimulatorConfig:
+    frames: int = 2
+    lpars_per_frame: int = 10
+    page_size: int = 100
+    latency: LatencyFn = field(default_factory=no_latency)
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    session_ttl: Optional[float] = None
+    session_max_requests: Optional[int] = None
+    job_seconds: float = 0.0
+    quick_properties: bool = True
+    # Status an HMC without quick properties answers quick/All with.
+    quick_unsupported_status: int = 404
+    compression: bool = True
+    link_bytes_per_second: Optional[float] = None
+    seed: int = 0
+
+
+@dataclass
+class _Session:
+    created: float
+    requests: int = 0
+
+
+class HmcSimulator:
+    """Stateful fake HMC shared by any number of transports."""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None) -> None:
+        self.config = config or SimulatorConfig()
+        self._rnd = random.Random(self.config.seed)
+        self._lock = Lock()
+        self._sessions: Dict[str, _Session] = {}
+        self._jobs: Dict[str, Tuple[float, str]] = {}
+        self.frames: List[Dict[str, Any]] = []
+        self.lpars: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {}
+        self._build_fleet()
+
+    # ------------------------------------------------------------------
+    def _uuid(self) -> str:
+        return str(UUID(int=self._rnd.getrandbits(128), version=4))
+
+    def _build_fleet(self) -> None:
+        cfg = self.config
+        for f in range(cfg.frames):
+            frame = {"uuid": self._uuid(), "name": f"Frame{f:03d}"}
+            self.frames.append(frame)
+            for i in range(cfg.lpars_per_frame):
+                lpar: Dict[str, Any] = {
+                    "uuid": self._uuid(),
+                    "name": f"{frame['name']}-lpar{i:04d}",
+                    "frame": frame["uuid"],
+                    "state": self._rnd.choice(("running", "running", "not activated")),
+                    "cpu": self._rnd.randint(1, 8),
+                    "mem": self._rnd.choice((4096, 8192, 16384)),
+                }
+                self.lpars.append(lpar)
+                self._by_key[lpar["uuid"]] = lpar
+                self._by_key[lpar["name"]] = lpar
+
+    def _uom_lpar(self, lp: Dict[str, Any], groups: bool = True) -> Dict[str, Any]:
+        # Full UOM objects carry dozens of attribute groups the orchestrator
+        # never reads; pad them so payload sizes resemble a real HMC.
+        item: Dict[str, Any] = {
+            "uuid": lp["uuid"],
+            "name": lp["name"],
+            "state": lp["state"],
+            "entitledProcUnits": float(lp["cpu"]),
+            "memory": lp["mem"],
+        }
+        if groups:
+            for group in _ATTRIBUTE_GROUPS:
+                item[group] = {
+                    f"{group}Attribute{n:02d}": f"value-{n:04d}" for n in range(48)
+                }
+        return item
+
+    @staticmethod
+    def _quick_lpar(lp: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "PartitionUUID": lp["uuid"],
+            "PartitionName": lp["name"],
+            "PartitionState": lp["state"],
+            "CurrentProcessingUnits": float(lp["cpu"]),
+            "CurrentMemory": lp["mem"],
+        }
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    # ------------------------------------------------------------------
+    def handle(self, request: httpx.Request) -> Tuple[float, httpx.Response]:
+        """Return the simulated delay and response for ``request``."""
+
+        with self._lock:
+            delay = max(0.0, self.config.latency(self._rnd))
+            self._count("requests")
+            response = self._dispatch(request)
+        response, wire = self._encode(request, response)
+        with self._lock:
+            self._count("bytes_sent", wire)
+        if self.config.link_bytes_per_second:
+            delay += wire / self.config.link_bytes_per_second
+        return delay, response
+
+    def _encode(
+        self, request: httpx.Request, response: httpx.Response
+    ) -> Tuple[httpx.Response, int]:
+        """Gzip ``response`` if accepted; return it with its size on the wire."""
+
+        accepted = request.headers.get("accept-encoding", "")
+        codings = {e.split(";")[0].strip() for e in accepted.split(",")}
+        body = response.content
+        if not self.config.compression or len(body) < 1024 or "gzip" not in codings:
+            return response, len(body)
+        compressed = gzip.compress(body, compresslevel=6, mtime=0)
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        headers["Content-Encoding"] = "gzip"
+        encoded = httpx.Response(
+            response.status_code, content=compressed, headers=headers
+        )
+        return encoded, len(compressed)
+
+    def _fail(self) -> Optional[httpx.Response]:
+        roll = self._rnd.random()
+        if roll < self.config.rate_limit_rate:
+            self._count("rate_limited")
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self._count("errors")
+            return httpx.Response(503)
+        return None
+
+    def _authorized(self, request: httpx.Request) -> bool:
+        token = request.headers.get("cookie", "").partition(f"{_SESSION_COOKIE}=")[2]
+        token = token.split(";", 1)[0]
+        sess = self._sessions.get(token)
+        if sess is None:
+            return False
+        ttl = self.config.session_ttl
+        limit = self.config.session_max_requests
+        sess.requests += 1
+        expired = (ttl is not None and time.monotonic() - sess.created > ttl) or (
+            limit is not None and sess.requests > limit
+        )
+        if expired:
+            del self._sessions[token]
+            self._count("sessions_expired")
+            return False
+        return True
+
+    def _dispatch(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        method = request.method
+        if path == "/rest/api/web/Logon" and method in {"POST", "PUT"}:
+            token = self._uuid()
+            self._sessions[token] = _Session(created=time.monotonic())
+            self._count("logons")
+            return httpx.Response(
+                200, headers={"Set-Cookie": f"{_SESSION_COOKIE}={token}; Path=/"}
+            )
+        if path == "/rest/api/web/Logoff":
+            self._count("logoffs")
+            return httpx.Response(204)
+
+        failure = self._fail()
+        if failure is not None:
+            return failure
+
+        if path.startswith("/rest/api/"):
+            if not self._authorized(request):
+                return httpx.Response(401)
+            return self._rest_api(request)
+        if path.startswith("/api/"):
+            return self._lpar_api(request)
+        return httpx.Response(404)
+
+    def _rest_api(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")[3:]
+        if parts == ["ManagedSystem"]:
+            return _json({"Items": self.frames})
+        if parts == ["LogicalPartition"]:
+            query = parse_qs(request.url.query.decode())
+            frame = query.get("managedSystemUuid", [None])[0]
+            groups = query.get("group", [""])[0] != "None"
+            items = [
+                self._uom_lpar(lp, groups)
+                for lp in self.lpars
+                if frame is None or lp["frame"] == frame
+            ]
+            return _json({"Items": items})
+        if (
+            len(parts) == 5
+            and parts[0] == "ManagedSystem"
+            and parts[2:] == ["LogicalPartition", "quick", "All"]
+        ):
+            if not self.config.quick_properties:
+                return httpx.Response(self.config.quick_unsupported_status)
+            return _json(
+                [self._quick_lpar(lp) for lp in self.lpars if lp["frame"] == parts[1]]
+            )
+        if len(parts) == 5 and parts[0] == "ManagedSystem" and parts[4] == "Metrics":
+            if parts[3] not in self._by_key:
+                return httpx.Response(404)
+            return _json(
+                {
+                    "cpu_util_pct": round(self._rnd.uniform(0, 100), 1),
+                    "mem_util_pct": round(self._rnd.uniform(0, 100), 1),
+                }
+            )
+        return httpx.Response(404)
+
+    def _lpar_api(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")
+        if parts == ["api", "lpars"] and request.method == "GET":
+            query = parse_qs(request.url.query.decode())
+            page = int(query.get("page", ["1"])[0])
+            size = self.config.page_size
+            chunk = self.lpars[(page - 1) * size : page * size]
+            body: Dict[str, Any] = {"items": [dict(lp) for lp in chunk]}
+            if page * size < len(self.lpars):
+                body["next"] = f"/api/lpars?page={page + 1}"
+            return _json(body)
+        if len(parts) == 4 and parts[3] == "resize" and request.method == "POST":
+            lpar = self._by_key.get(parts[2])
+            if lpar is None:
+                return httpx.Response(404)
+            payload = json.loads(request.content or b"{}")
+            lpar["cpu"] = payload.get("cpu", lpar["cpu"])
+            lpar["mem"] = payload.get("mem", lpar["mem"])
+            job = self._uuid()
+            self._jobs[job] = (time.monotonic() + self.config.job_seconds, lpar["uuid"])
+            self._count("resizes")
+            return _json({"job": job, "status": "RUNNING"}, status=202)
+        if len(parts) == 3 and parts[1] == "jobs":
+            if parts[2] not in self._jobs:
+                return httpx.Response(404)
+            done_at, _ = self._jobs[parts[2]]
+            status = "COMPLETED" if time.monotonic() >= done_at else "RUNNING"
+            return _json({"job": parts[2], "status": status})
+        return httpx.Response(404)
+
+
+def _json(body: Any, status: int = 200) -> httpx.Response:
+    return httpx.Response(
+        status,
+        content=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+
+
+class SimulatorTransport(httpx.BaseTransport):
+    """Synchronous transport backed by an :class:`HmcSimulator`."""
+
+    def __init__(self, simulator: HmcSimulator) -> None:
+        self.simulator = simulator
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        delay, response = self.simulator.handle(request)
+        if delay:
+            time.sleep(delay)
+        return response
+
+
+class AsyncSimulatorTransport(httpx.AsyncBaseTransport):
+    """Asynchronous transport backed by an :class:`HmcSimulator`."""
+
+    def __init__(self, simulator: HmcSimulator) -> None:
+        self.simulator = simulator
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        delay, response = self.simulator.handle(request)
+        if delay:
+            await asyncio.sleep(delay)
+        return response
+
+
+__all__ = [
+    "AsyncSimulatorTransport",
+    "HmcSimulator",
+    "SimulatorConfig",
+    "SimulatorTransport",
+    "constant",
+    "lognormal",
+    "no_latency",
+    "with_stalls",
+]
@@ -0,0 +1,415 @@
+"""Compact, memory-mapped binary inventory snapshots.
+
+A snapshot stores the JSON inventory shape produced by ``list --json`` as
+columns. All text (UUIDs, names, states, HMC hosts) lives once in a string
+table; every other column is a fixed-width little-endian array, so a reader
+maps the file with :mod:`mmap` and touches only the columns and rows it asks
+for. LPAR rows are sorted by UUID, which makes lookups a binary search and
+lets two snapshots be diffed in a single merge pass.
+
+Layout (all offsets are absolute and 8-byte aligned)::
+
+    header     magic, version, frame/LPAR/string counts, creation time
+    sections   one u64 offset per section in ``_SECTIONS`` order
+    str_offsets  u32[strings + 1]   byte offsets into str_data
+    str_data     UTF-8 bytes
+    frame_*      u32 string ids, one per frame
+    lpar_*       u32 string ids / u32 frame index / f64 / i64 / u64, one per
+                 LPAR; the u64 ``digest`` hashes all fields but the UUID
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .exceptions import SnapshotError
+
+FORMAT_VERSION = 2
+_MAGIC = b"HMCSNAP\x00"
+_HEADER = struct.Struct("<8sHHIIId")
+_U32_MAX = 2**32 - 1
+_RECORD_NUMBERS = struct.Struct("<dq")
+DIFF_FIELDS = ("name", "state", "cpu_entitlement", "memory_mb", "frame_uuid")
+
+# Array typecodes used by the sections; all are valid memoryview formats.
+_Code = Literal["B", "I", "Q", "d", "q"]
+
+# (section, array typecode, rows) - rows is "frames", "lpars" or "strings".
+_SECTIONS: Tuple[Tuple[str, _Code, str], ...] = (
+    ("str_offsets", "I", "strings"),
+    ("str_data", "B", "bytes"),
+    ("frame_uuid", "I", "frames"),
+    ("frame_name", "I", "frames"),
+    ("frame_hmc", "I", "frames"),
+    ("uuid", "I", "lpars"),
+    ("name", "I", "lpars"),
+    ("state", "I", "lpars"),
+    ("frame", "I", "lpars"),
+    ("cpu_entitlement", "d", "lpars"),
+    ("memory_mb", "q", "lpars"),
+    ("digest", "Q", "lpars"),
+)
+_SECTION_TABLE = struct.Struct(f"<{len(_SECTIONS)}Q")
+_TYPECODES = {name: code for name, code, _ in _SECTIONS}
+STRING_COLUMNS = frozenset(
+    {"uuid", "name", "state", "frame_uuid", "frame_name", "frame_hmc"}
+)
+
+Column = Union["memoryview[Any]", "array[Any]"]
+
+
+def record_digest(
+    name: str, state: str, frame_uuid: str, cpu_entitlement: float, memory_mb: int
+) -> int:
+    """64-bit BLAKE2b hash of every LPAR field except its UUID."""
+
+    h = hashlib.blake2b(digest_size=8)
+    h.update("\0".join((name, state, frame_uuid)).encode("utf8"))
+    h.update(_RECORD_NUMBERS.pack(cpu_entitlement, memory_mb))
+    return int.from_bytes(h.digest(), "little")
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.offsets = array("I", [0])
+        self.data = bytearray()
+
+    def add(self, value: str) -> int:
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = self.ids[value] = len(self.ids)
+            self.data += value.encode("utf8")
+            if len(self.data) > _U32_MAX:
+                raise SnapshotError("string table exceeds 4 GiB")
+            self.offsets.append(len(self.data))
+        return idx
+
+
+def _to_le(column: "array[Any]") -> bytes:
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def write_snapshot(
+    path: Path, frames: Iterable[Dict[str, Any]], *, created: Optional[float] = None
+) -> Path:
+    """Write ``frames`` (the ``list --json`` shape) to ``path`` atomically.
+
+    Frames marked ``"incomplete"`` are rejected with :class:`SnapshotError`:
+    a snapshot is diffed as a full inventory, so their missing LPARs would
+    read as removed.
+    """
+
+    strings = _StringTable()
+    columns: Dict[str, "array[Any]"] = {
+        name: array(code) for name, code, _ in _SECTIONS[2:]
+    }
+    rows = []
+    frame_uuids: List[str] = []
+    for index, frame in enumerate(frames):
+        if frame.get("incomplete"):
+            raise SnapshotError(
+                f"frame {frame['name']} ({frame['uuid']}) is incomplete"
+            )
+        frame_uuids.append(frame["uuid"])
+        columns["frame_uuid"].append(strings.add(frame["uuid"]))
+        columns["frame_name"].append(strings.add(frame["name"]))
+        columns["frame_hmc"].append(strings.add(frame.get("hmc") or ""))
+        for lp in frame["lpars"]:
+            rows.append(
+                (
+                    lp["uuid"],
+                    lp["name"],
+                    lp["state"],
+                    index,
+                    float(lp["cpu_entitlement"]),
+                    int(lp["memory_mb"]),
+                )
+            )
+    rows.sort(key=lambda row: row[0])
+    for uuid, name, state, index, cpu, mem in rows:
+        columns["digest"].append(
+            record_digest(name, state, frame_uuids[index], cpu, mem)
+        )
+        columns["uuid"].append(strings.add(uuid))
+        columns["name"].append(strings.add(name))
+        columns["state"].append(strings.add(state))
+        columns["frame"].append(index)
+        columns["cpu_entitlement"].append(cpu)
+        columns["memory_mb"].append(mem)
+
+    blobs = [_to_le(strings.offsets), bytes(strings.data)]
+    blobs += [_to_le(columns[name]) for name, _, _ in _SECTIONS[2:]]
+    offsets = []
+    position = _HEADER.size + _SECTION_TABLE.size
+    for blob in blobs:
+        offsets.append(position)
+        position += len(blob) + _pad(len(blob))
+
+    header = _HEADER.pack(
+        _MAGIC,
+        FORMAT_VERSION,
+        0,
+        len(columns["frame_uuid"]),
+        len(rows),
+        len(strings.ids),
+        time.time() if created is None else created,
+    )
+    tmp = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    with tmp.open("wb") as fh:
+        fh.write(header)
+        fh.write(_SECTION_TABLE.pack(*offsets))
+        for blob in blobs:
+            fh.write(blob)
+            fh.write(b"\0" * _pad(len(blob)))
+    os.replace(tmp, path)
+    return path
+
+
+class Snapshot:
+    """Read-only view of a snapshot file backed by :mod:`mmap`.
+
+    Columns are decoded lazily: opening a snapshot only parses the header,
+    and ``snap.column("memory_mb")`` or ``snap.find(uuid)`` read nothing
+    beyond the pages they touch. Views returned by :meth:`column` are only
+    valid until :meth:`close`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as fh:
+            try:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # empty file
+                raise SnapshotError(f"{path}: not a snapshot") from exc
+        self._buf = memoryview(self._mm)
+        self._views: List["memoryview[Any]"] = []
+        self._columns: Dict[str, Column] = {}
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_header(self) -> None:
+        size = len(self._mm)
+        if size < _HEADER.size + _SECTION_TABLE.size:
+            raise SnapshotError(f"{self.path}: not a snapshot")
+        magic, version, _, frames, lpars, strings, created = _HEADER.unpack_from(
+            self._mm
+        )
+        if magic != _MAGIC:
+            raise SnapshotError(f"{self.path}: not a snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"{self.path}: unsupported snapshot version {version}")
+        self.frame_count: int = frames
+        self.created: float = created
+        self._count: int = lpars
+        offsets = _SECTION_TABLE.unpack_from(self._mm, _HEADER.size)
+        self._offsets = dict(zip((s[0] for s in _SECTIONS), offsets, strict=True))
+        rows = {"frames": frames, "lpars": lpars, "strings": strings + 1}
+        self._lengths: Dict[str, int] = {}
+        for name, code, kind in _SECTIONS:
+            if kind == "bytes":
+                continue
+            self._lengths[name] = rows[kind]
+            end = self._offsets[name] + rows[kind] * array(code).itemsize
+            if self._offsets[name] % 8 or end > size:
+                raise SnapshotError(f"{self.path}: truncated section {name}")
+        self._data = self._offsets["str_data"]
+
+    # ------------------------------------------------------------------
+    def column(self, name: str) -> Sequence[Any]:
+        """Return the raw fixed-width column ``name``.
+
+        String columns (``uuid``, ``name``, ``state`` and the ``frame_*``
+        columns) hold string-table ids; resolve them with :meth:`string`.
+        """
+
+        col = self._columns.get(name)
+        if col is None:
+            if name not in self._lengths:
+                raise KeyError(name)
+            code = _TYPECODES[name]
+            start = self._offsets[name]
+            raw = self._buf[start : start + self._lengths[name] * array(code).itemsize]
+            if sys.byteorder == "little":
+                self._views.append(raw)
+                col = raw.cast(code)
+                self._views.append(col)
+            else:
+                col = array(code, raw.tobytes())
+                col.byteswap()
+                raw.release()
+            self._columns[name] = col
+        return col
+
+    def _raw(self, idx: int) -> bytes:
+        offsets = self.column("str_offsets")
+        return self._mm[self._data + offsets[idx] : self._data + offsets[idx + 1]]
+
+    def string(self, idx: int) -> str:
+        return self._raw(idx).decode("utf8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def uuid(self, row: int) -> str:
+        return self.string(self.column("uuid")[row])
+
+    def lpar(self, row: int) -> Dict[str, Any]:
+        """Decode LPAR ``row`` (rows are ordered by UUID)."""
+
+        if not 0 <= row < self._count:
+            raise IndexError(row)
+        record: Dict[str, Any] = {
+            name: self.string(self.column(name)[row])
+            for name in ("uuid", "name", "state")
+        }
+        record["cpu_entitlement"] = self.column("cpu_entitlement")[row]
+        record["memory_mb"] = self.column("memory_mb")[row]
+        record["frame_uuid"] = self.string(
+            self.column("frame_uuid")[self.column("frame")[row]]
+        )
+        return record
+
+    def find(self, uuid: str) -> Optional[int]:
+        """Return the row of ``uuid`` by binary search, or ``None``."""
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.uuid(mid) < uuid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._count and self.uuid(lo) == uuid else None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(self._count):
+            yield self.lpar(row)
+
+    def frames(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "uuid": self.string(self.column("frame_uuid")[i]),
+                "name": self.string(self.column("frame_name")[i]),
+                "hmc": self.string(self.column("frame_hmc")[i]),
+            }
+            for i in range(self.frame_count)
+        ]
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        """Return the ``list --json`` shape; LPARs are ordered by UUID."""
+
+        frames = self.frames()
+        for frame in frames:
+            frame["lpars"] = []
+        frame_of = self.column("frame")
+        for row, record in enumerate(self):
+            del record["frame_uuid"]
+            frames[frame_of[row]]["lpars"].append(record)
+        return frames
+
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        self._columns.clear()
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._buf.release()
+        self._mm.close()
+
+    def __enter__(self) -> Snapshot:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Iterator[Dict[str, Any]]:
+    """Yield changes from ``old`` to ``new`` in UUID order.
+
+    Both snapshots are walked once, side by side, comparing raw UUID bytes
+    (UTF-8 preserves code point order) and stored record digests; only LPARs
+    that were added, removed or changed are decoded. Memory use does not
+    depend on fleet size. Each change is one of::
+
+        {"op": "added", "uuid": ..., "lpar": {...}}
+        {"op": "removed", "uuid": ..., "lpar": {...}}
+        {"op": "changed", "uuid": ..., "name": ..., "changes": {field: [old, new]}}
+    """
+
+    old_uuids, new_uuids = old.column("uuid"), new.column("uuid")
+    old_digests, new_digests = old.column("digest"), new.column("digest")
+    n_old, n_new = len(old), len(new)
+    i = j = 0
+    a = old._raw(old_uuids[0]) if n_old else None
+    b = new._raw(new_uuids[0]) if n_new else None
+    while a is not None or b is not None:
+        if b is None or (a is not None and a < b):
+            record = old.lpar(i)
+            yield {"op": "removed", "uuid": record.pop("uuid"), "lpar": record}
+            i += 1
+            a = old._raw(old_uuids[i]) if i < n_old else None
+            continue
+        if a is None or b < a:
+            record = new.lpar(j)
+            yield {"op": "added", "uuid": record.pop("uuid"), "lpar": record}
+            j += 1
+            b = new._raw(new_uuids[j]) if j < n_new else None
+            continue
+        if old_digests[i] != new_digests[j]:
+            before, after = old.lpar(i), new.lpar(j)
+            yield {
+                "op": "changed",
+                "uuid": after["uuid"],
+                "name": after["name"],
+                "changes": {
+                    field: [before[field], after[field]]
+                    for field in DIFF_FIELDS
+                    if before[field] != after[field]
+                },
+            }
+        i += 1
+        j += 1
+        a = old._raw(old_uuids[i]) if i < n_old else None
+        b = new._raw(new_uuids[j]) if j < n_new else None
+
+
+__all__ = [
+    "FORMAT_VERSION",
+    "DIFF_FIELDS",
+    "STRING_COLUMNS",
+    "Snapshot",
+    "diff_snapshots",
+    "record_digest",
+    "write_snapshot",
+]
@@ -4,6 +4,9 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Iterable
 
+from hmc_orchestrator.resilience import RetryBudget
+
+from .breaker import BreakerRegistry
 from .config import Settings
 from .http import HTTPClient
 
@@ -24,15 +27,23 @@ class HMCClient:
             verify=verify,
             timeout=settings.timeout,
             retries=3,
+            pool_size=settings.pool_size,
+            deadline=settings.deadline,
+            budget=RetryBudget(settings.retry_budget),
+            breakers=BreakerRegistry(
+                settings.breaker_threshold, settings.breaker_cooldown
+            ),
         )
 
     def list_lpars(self) -> Iterable[dict[str, Any]]:
         resp = self._client.get("/api/lpars")
         return resp.json()  # type: ignore[no-any-return]
 
-    def resize_lpar(self, lpar: str, cpu: int, mem: int) -> None:
+    def resize_lpar(
+        self, lpar: str, cpu: int, mem: int, frame: str | None = None
+    ) -> None:
         payload = {"cpu": cpu, "mem": mem}
-        self._client.post(f"/api/lpars/{lpar}/resize", json=payload)
+        self._client.post(f"/api/lpars/{lpar}/resize", frame=frame, json=payload)
 
     def close(self) -> None:
         self._client.close()
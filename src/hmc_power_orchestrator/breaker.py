@@ -0,0 +1,153 @@
+"""Circuit breakers keyed by frame and endpoint.
+
+One breaker per ``(frame, endpoint template)`` keeps a frame in maintenance
+or behind a busy VIOS from blocking requests to every healthy frame. Each
+breaker has its own lock, so concurrent requests to different frames never
+contend, and the registry lock is only taken to create or evict a breaker.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from enum import Enum
+from threading import Lock
+from time import monotonic
+
+from .exceptions import TransientError
+from .observability import METRIC_BREAKER_OPENED
+
+# Breakers for requests that do not name a frame.
+ANY_FRAME = "-"
+
+
+class CircuitBreakerState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Thread-safe state tracker implementing a basic circuit breaker."""
+
+    def __init__(self, threshold: int, cooldown: float, endpoint: str = "") -> None:
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._endpoint = endpoint
+        self._failures = 0
+        self._state: CircuitBreakerState = CircuitBreakerState.CLOSED
+        self._opened_at = 0.0
+        self._lock = Lock()
+
+    # ------------------------------------------------------------------
+    def before_request(self, method: str, url: str) -> None:
+        """Check breaker state and potentially raise ``TransientError``.
+
+        The lock covers the entire method to avoid races between reading and
+        modifying internal state.
+        """
+
+        with self._lock:
+            if self._state == CircuitBreakerState.OPEN:
+                if monotonic() - self._opened_at < self._cooldown:
+                    raise TransientError(method, url, snippet="circuit open")
+                # cooldown passed – allow a single probe request
+                self._state = CircuitBreakerState.HALF_OPEN
+            elif self._state == CircuitBreakerState.HALF_OPEN:
+                # another probe already in progress
+                raise TransientError(method, url, snippet="circuit open")
+
+    def record_success(self) -> None:
+        if self._state == CircuitBreakerState.CLOSED and not self._failures:
+            return  # common case: nothing to update, skip the lock
+        with self._lock:
+            self._failures = 0
+            self._state = CircuitBreakerState.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == CircuitBreakerState.HALF_OPEN:
+                self._open()
+                self._failures = self._threshold
+                return
+            self._failures += 1
+            if self._failures >= self._threshold:
+                self._open()
+
+    def _open(self) -> None:
+        if self._state != CircuitBreakerState.OPEN:
+            METRIC_BREAKER_OPENED.labels(endpoint=self._endpoint).inc()
+        self._state = CircuitBreakerState.OPEN
+        self._opened_at = monotonic()
+
+    @property
+    def state(self) -> CircuitBreakerState:
+        return self._state
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+
+class BreakerRegistry:
+    """Bounded map of ``(frame, endpoint)`` to :class:`CircuitBreaker`.
+
+    When ``max_breakers`` is reached the least recently created closed
+    breaker is evicted; open breakers are only evicted if every breaker is
+    open.
+    """
+
+    def __init__(
+        self, threshold: int = 5, cooldown: float = 30.0, max_breakers: int = 1024
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_breakers = max_breakers
+        self._breakers: OrderedDict[tuple[str, str], CircuitBreaker] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, frame: str | None, endpoint: str) -> CircuitBreaker:
+        key = (frame or ANY_FRAME, endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is not None:
+            return breaker
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                if len(self._breakers) >= self.max_breakers:
+                    self._evict()
+                breaker = CircuitBreaker(self.threshold, self.cooldown, endpoint)
+                self._breakers[key] = breaker
+            return breaker
+
+    def _evict(self) -> None:
+        for key, breaker in self._breakers.items():
+            if breaker.state == CircuitBreakerState.CLOSED:
+                del self._breakers[key]
+                return
+        self._breakers.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._breakers)
+
+    def for_frame(self, frame: str | None) -> list[CircuitBreaker]:
+        """Every breaker currently held for ``frame``, in creation order."""
+
+        key = frame or ANY_FRAME
+        return [b for (f, _), b in list(self._breakers.items()) if f == key]
+
+    def open_keys(self) -> list[tuple[str, str]]:
+        """``(frame, endpoint)`` of every breaker not currently closed."""
+
+        return [
+            key
+            for key, breaker in list(self._breakers.items())
+            if breaker.state != CircuitBreakerState.CLOSED
+        ]
+
+
+__all__ = [
+    "ANY_FRAME",
+    "BreakerRegistry",
+    "CircuitBreaker",
+    "CircuitBreakerState",
+]
@@ -0,0 +1,73 @@
+"""Checkpoints that let an interrupted ``apply`` run resume.
+
+Each completed target is appended to the run's checkpoint file as one
+``lpar<TAB>cpu<TAB>mem`` line, written through to the OS before the next
+target is applied, so a crash or Ctrl-C loses at most the resize in
+flight. A rerun with the same run ID reads the file back with a single
+``read``/``splitlines`` into a set; this takes milliseconds even for
+hundreds of thousands of targets. Targets whose desired ``cpu``/``mem``
+has changed since they were recorded are applied again.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from threading import Lock
+from typing import TextIO
+
+from .policy import Target
+
+
+def _key(target: Target) -> str:
+    return f"{target.lpar}\t{target.cpu}\t{target.mem}"
+
+
+class Checkpoint:
+    """Append-only record of targets already applied in a run.
+
+    Membership reflects what earlier attempts of the run completed; records
+    written by this process are not added to it. :meth:`record` is
+    thread-safe.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._done = self._load(path)
+        self._fh: TextIO | None = None
+        self._lock = Lock()
+
+    @staticmethod
+    def _load(path: Path) -> set[str]:
+        try:
+            data = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return set()
+        complete, newline, torn = data.rpartition("\n")
+        if torn:
+            # A line cut short by a crash; drop it so appends start cleanly.
+            with path.open("r+", encoding="utf-8") as fh:
+                fh.truncate(len((complete + newline).encode("utf-8")))
+        return set(complete.splitlines())
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def __contains__(self, target: Target) -> bool:
+        return _key(target) in self._done
+
+    def record(self, target: Target) -> None:
+        line = _key(target) + "\n"
+        with self._lock:
+            if self._fh is None:
+                # Line buffered: every record reaches the OS as it is written.
+                self._fh = self.path.open("a", encoding="utf-8", buffering=1)
+            self._fh.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+__all__ = ["Checkpoint"]
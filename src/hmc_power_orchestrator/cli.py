@@ -1,22 +1,29 @@
-"""Command-line interface using Typer with safety rails."""
+"""Command-line interface using Typer with safety rails.
+
+Heavy dependencies (httpx, rich, pydantic, structlog, prometheus_client) are
+imported inside the commands that need them to keep start-up fast.
+"""
 
 from __future__ import annotations
 
 import json
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 from uuid import uuid4
 
 import typer
-from rich.console import Console
-from rich.table import Table
 
-from .config import load
-from .hmc_client import HMCClient
-from .observability import METRIC_APPLY, AuditLogger, get_logger
-from .policy import Policy, Target
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .checkpoint import Checkpoint
+    from .config import Settings
+    from .hmc_client import HMCClient
+    from .observability import AuditLogger
+    from .policy import Target
+    from .reconcile import Reconciler
+    from .scheduler import Scheduler
 
 app = typer.Typer(help="IBM HMC LPAR CPU/memory orchestrator")
-console = Console()
 
 # Typer option instances defined at module scope to satisfy lint rules.
 run_id_option = typer.Option(None, help="Run identifier")
@@ -24,27 +31,128 @@ output_option = typer.Option(Path("run"))
 apply_option = typer.Option(False, "--apply", help="Apply changes")
 confirm_option = typer.Option(False, help="Confirm apply")
 audit_log_option = typer.Option(None)
+schedule_option = typer.Option(
+    False,
+    "--schedule",
+    help="Order resizes by priority, scale-ups first, fairly across frames",
+)
+workers_option = typer.Option(4, help="Concurrent resizes with --schedule")
+frame_concurrency_option = typer.Option(
+    1, help="Concurrent resizes per frame with --schedule"
+)
+window_option = typer.Option(
+    10_000, help="Targets read ahead and ordered by --schedule"
+)
+reconcile_option = typer.Option(
+    False,
+    "--reconcile",
+    help="Compare targets with current inventory and skip no-op resizes",
+)
+bandwidth_option = typer.Option(
+    False,
+    "--bandwidth",
+    help="Print bytes transferred and decode time per HMC endpoint to stderr",
+)
+
+
+def _client(cfg: Settings, run_id: str) -> HMCClient:
+    from .breaker import BreakerRegistry
+    from .hmc_client import HedgeConfig, HMCClient, RetryConfig
 
+    return HMCClient(
+        cfg.base_url,
+        retry=RetryConfig(deadline=cfg.deadline, budget_ratio=cfg.retry_budget),
+        run_id=run_id,
+        pool_size=cfg.pool_size,
+        keepalive_expiry=cfg.keepalive_expiry,
+        http2=cfg.http2,
+        hedge=HedgeConfig(percentile=cfg.hedge_percentile) if cfg.hedge else None,
+        breakers=BreakerRegistry(cfg.breaker_threshold, cfg.breaker_cooldown),
+    )
 
-def _print_table(rows: list[dict[str, str]]) -> None:
-    table = Table(show_header=True)
-    if rows:
-        for key in rows[0]:
-            table.add_column(key)
-        for row in rows:
-            table.add_row(*[str(row[k]) for k in row])
-    console.print(table)
+
+def _print_table(rows: Iterable[dict[str, Any]]) -> int:
+    from .table import print_table
+
+    return print_table(rows)
 
 
 @app.command()
 def inventory(run_id: str = run_id_option) -> None:
     """List LPAR inventory."""
+    from .config import load
+
     rid = run_id or uuid4().hex
     cfg = load()
-    client = HMCClient(cfg.base_url, run_id=rid)
-    data = list(client.iter_collection("/api/lpars"))
-    _print_table(data)
-    client.close()
+    client = _client(cfg, rid)
+    try:
+        # Streamed: the plain renderer never holds the whole inventory.
+        _print_table(client.iter_collection("/api/lpars"))
+    finally:
+        client.close()
+
+
+def _record(path: Path, targets: Iterable[Target]) -> Iterator[Target]:
+    """Pass ``targets`` through, writing them to ``path`` as a JSON array.
+
+    The file is written incrementally and only moved into place once every
+    target has been read; a policy that fails part-way leaves no preview.
+    """
+    partial = path.with_name(path.name + ".part")
+    count = 0
+    try:
+        with partial.open("w", encoding="utf-8") as fh:
+            fh.write("[")
+            for target in targets:
+                body = json.dumps(target.model_dump(), indent=2)
+                fh.write(",\n  " if count else "\n  ")
+                fh.write(body.replace("\n", "\n  "))
+                count += 1
+                yield target
+            fh.write("\n]" if count else "]")
+        partial.replace(path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+
+def _reconciler(client: HMCClient) -> Reconciler:
+    from .reconcile import Reconciler
+
+    return Reconciler(client.iter_collection("/api/lpars"))
+
+
+def _preview(
+    path: Path, targets: Iterable[Target], reconciler: Reconciler | None = None
+) -> int:
+    targets = _record(path, targets)
+    if reconciler is None:
+        return _print_table(t.model_dump() for t in targets)
+    return _print_table(
+        {**t.model_dump(), "action": reconciler.action(t)} for t in targets
+    )
+
+
+def _dry_run(
+    path: Path, policy_file: Path, run_id: str, reconcile: bool
+) -> tuple[int, int]:
+    """Preview ``policy_file``; return the target and unchanged counts."""
+    from .config import load
+    from .policy import PolicyError, iter_targets
+    from .reconcile import SKIP
+
+    reconciler = None
+    if reconcile:
+        client = _client(load(), run_id)
+        try:
+            reconciler = _reconciler(client)
+        finally:
+            client.close()
+    try:
+        count = _preview(path, iter_targets(policy_file), reconciler)
+    except PolicyError as exc:
+        typer.echo(f"invalid policy: {exc}", err=True)
+        raise typer.Exit(1) from None
+    return count, reconciler.counts[SKIP] if reconciler else 0
 
 
 @app.command()
@@ -52,16 +160,18 @@ def plan(
     policy_file: Path,
     run_id: str = run_id_option,
     output: Path = output_option,
+    reconcile: bool = reconcile_option,
 ) -> None:
     """Preview actions for a policy."""
+    from .observability import get_logger
+
     rid = run_id or uuid4().hex
     logger = get_logger(rid)
-    policy = Policy.model_validate_json(policy_file.read_text())
     output.mkdir(parents=True, exist_ok=True)
-    preview = [t.model_dump() for t in policy.targets]
-    (output / f"plan-{rid}.json").write_text(json.dumps(preview, indent=2))
-    _print_table([{**t} for t in preview])
-    logger.info("plan_generated", targets=len(preview))
+    count, unchanged = _dry_run(
+        output / f"plan-{rid}.json", policy_file, rid, reconcile
+    )
+    logger.info("plan_generated", targets=count, unchanged=unchanged)
 
 
 def _apply_target(
@@ -70,9 +180,12 @@ def _apply_target(
     audit: AuditLogger | None,
     logger,
 ) -> tuple[bool, str]:
+    from .observability import METRIC_APPLY
+
     try:
         resp = client.post(
             f"/api/lpars/{target.lpar}/resize",
+            frame=target.frame,
             json={"cpu": target.cpu, "mem": target.mem},
         )
         if resp.status_code >= 400:
@@ -89,32 +202,84 @@ def _apply_target(
     return True, ""
 
 
+@dataclass
+class _Results:
+    successes: int = 0
+    skipped: int = 0
+    resumed: int = 0
+    failures: list[tuple[str, str]] = field(default_factory=list)
+
+
 def _execute_targets(
     client: HMCClient,
-    policy: Policy,
+    targets: Iterable[Target],
     audit: AuditLogger | None,
     logger,
-) -> tuple[int, list[tuple[str, str]]]:
-    successes = 0
-    failures: list[tuple[str, str]] = []
-    for target in policy.targets:
+    results: _Results,
+    reconciler: Reconciler | None = None,
+    checkpoint: Checkpoint | None = None,
+    scheduler: Scheduler | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Apply each target as it is read and yield its row for the table."""
+    from threading import Lock
+
+    from .observability import METRIC_APPLY
+    from .reconcile import SKIP
+
+    lock = Lock()
+
+    # Scheduled runs call run() on worker threads while screen() keeps
+    # running on this one; both update the tally and checkpoint under lock.
+    def screen(target: Target) -> dict[str, Any] | None:
+        if checkpoint is not None and target in checkpoint:
+            with lock:
+                results.resumed += 1
+            return {**target.model_dump(), "result": "resumed"}
+        if reconciler is not None and reconciler.action(target) == SKIP:
+            METRIC_APPLY.labels(outcome="skipped").inc()
+            with lock:
+                results.skipped += 1
+                if checkpoint is not None:
+                    checkpoint.record(target)
+            return {**target.model_dump(), "result": "unchanged"}
+        return None
+
+    def run(target: Target) -> dict[str, Any]:
         ok, reason = _apply_target(client, target, audit, logger)
-        if ok:
-            successes += 1
-        else:
-            failures.append((target.lpar, reason))
-    return successes, failures
+        with lock:
+            if ok:
+                results.successes += 1
+                if checkpoint is not None:
+                    checkpoint.record(target)
+            else:
+                results.failures.append((target.lpar, reason))
+        return {**target.model_dump(), "result": "applied" if ok else "failed"}
+
+    if scheduler is not None:
+        yield from scheduler.execute(targets, run, screen)
+        return
+    for target in targets:
+        yield screen(target) or run(target)
 
 
-def _report_results(successes: int, failures: list[tuple[str, str]], logger) -> None:
+def _report_results(results: _Results, logger) -> None:
+    successes, failures = results.successes, results.failures
+    summary = f"{successes} succeeded, {len(failures)} failed"
+    if results.skipped:
+        summary += f", {results.skipped} unchanged"
+    if results.resumed:
+        summary += f", {results.resumed} resumed"
+    counts = {"unchanged": results.skipped, "resumed": results.resumed}
     if failures:
         for lpar, reason in failures:
             typer.echo(f"{lpar}: {reason}", err=True)
-        typer.echo(f"{successes} succeeded, {len(failures)} failed", err=True)
-        logger.error("apply_complete", successes=successes, failures=len(failures))
+        typer.echo(summary, err=True)
+        logger.error(
+            "apply_complete", successes=successes, failures=len(failures), **counts
+        )
         raise typer.Exit(1)
-    typer.echo(f"{successes} succeeded, 0 failed")
-    logger.info("policy_applied", targets=successes)
+    typer.echo(summary)
+    logger.info("policy_applied", targets=successes, **counts)
 
 
 @app.command()
@@ -125,34 +290,82 @@ def apply(
     apply_changes: bool = apply_option,
     confirm: bool = confirm_option,
     audit_log: Path | None = audit_log_option,
+    reconcile: bool = reconcile_option,
+    schedule: bool = schedule_option,
+    workers: int = workers_option,
+    frame_concurrency: int = frame_concurrency_option,
+    window: int = window_option,
 ) -> None:
-    """Apply a policy with confirmation."""
+    """Apply a policy with confirmation.
+
+    Targets are applied while the policy is still being read; the preview
+    table gains a ``result`` column instead of being printed beforehand.
+    With ``--reconcile`` targets already in the desired state are skipped.
+    Completed targets are checkpointed under the run ID; rerunning with the
+    same ``--run-id`` resumes after an interruption. ``--schedule`` applies
+    targets concurrently, most urgent first (see :mod:`.scheduler`).
+    """
+    from .checkpoint import Checkpoint
+    from .config import load
+    from .observability import AuditLogger, get_logger
+    from .policy import PolicyError, iter_targets
+    from .scheduler import Scheduler
+
     rid = run_id or uuid4().hex
     logger = get_logger(rid)
-    policy = Policy.model_validate_json(policy_file.read_text())
+    if apply_changes and not confirm:
+        typer.echo("Use --confirm to proceed", err=True)
+        raise typer.Exit(1)
     output.mkdir(parents=True, exist_ok=True)
-    preview = [t.model_dump() for t in policy.targets]
-    (output / f"apply-{rid}.json").write_text(json.dumps(preview, indent=2))
-    _print_table([{**t} for t in preview])
+    preview = output / f"apply-{rid}.json"
     if not apply_changes:
-        logger.info("dry_run", targets=len(preview))
+        count, unchanged = _dry_run(preview, policy_file, rid, reconcile)
+        logger.info("dry_run", targets=count, unchanged=unchanged)
         return
-    if not confirm:
-        typer.echo("Use --confirm to proceed", err=True)
-        raise typer.Exit(1)
     cfg = load()
-    client = HMCClient(cfg.base_url, run_id=rid)
+    client = _client(cfg, rid)
     audit = AuditLogger(audit_log) if audit_log else None
+    checkpoint = Checkpoint(output / f"apply-{rid}.checkpoint")
+    if len(checkpoint):
+        typer.echo(f"resuming run {rid}: {len(checkpoint)} targets done", err=True)
+    results = _Results()
+    targets = _record(preview, iter_targets(policy_file))
     try:
-        successes, failures = _execute_targets(client, policy, audit, logger)
+        # Scheduling also needs current state to tell scale-ups apart.
+        state = _reconciler(client) if reconcile or schedule else None
+        scheduler = None
+        if schedule:
+            scheduler = Scheduler(
+                workers=workers,
+                frame_concurrency=frame_concurrency,
+                window=window,
+                direction=state.direction if state else None,
+            )
+        reconciler = state if reconcile else None
+        rows = _execute_targets(
+            client, targets, audit, logger, results, reconciler, checkpoint, scheduler
+        )
+        _print_table(rows)
+    except PolicyError as exc:
+        # Targets read before the error have been applied; report them too.
+        results.failures.append(("<policy>", str(exc)))
     finally:
+        checkpoint.close()
         client.close()
-    _report_results(successes, failures, logger)
+    _report_results(results, logger)
 
 
 @app.callback()
-def main(_run_id: str = run_id_option) -> None:
-    pass
+def main(
+    ctx: typer.Context,
+    _run_id: str = run_id_option,
+    bandwidth: bool = bandwidth_option,
+) -> None:
+    if bandwidth:
+        from hmc_orchestrator.metrics import TRAFFIC
+
+        TRAFFIC.reset()
+        ctx.call_on_close(lambda: typer.echo(TRAFFIC.summary(), err=True))
 
 
 if __name__ == "__main__":  # pragma: no cover
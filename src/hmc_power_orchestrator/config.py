@@ -19,6 +19,18 @@ class Settings:
     password: str
     verify: bool | Path = True
     timeout: int = 30
+    pool_size: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    # Per-call bound including retries, and retries allowed per request.
+    deadline: float = 60.0
+    retry_budget: float = 0.2
+    # Duplicate GETs slower than this latency percentile.
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+    # Failures before a frame/endpoint circuit opens, and its cooldown.
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 30.0
 
     @property
     def base_url(self) -> str:
@@ -81,10 +93,42 @@ def load() -> Settings:
     password = _resolve_password(cfg)
     verify = _resolve_verify(cfg)
     timeout = int(os.getenv("HMC_TIMEOUT", str(cfg.get("timeout", 30))))
+    pool_size = int(os.getenv("HMC_POOL_SIZE", str(cfg.get("pool_size", 10))))
+    keepalive = float(
+        os.getenv("HMC_KEEPALIVE_EXPIRY", str(cfg.get("keepalive_expiry", 30.0)))
+    )
+    http2 = parse_bool(
+        os.getenv("HMC_HTTP2"), default=parse_bool(str(cfg.get("http2", False)))
+    )
+    deadline = float(os.getenv("HMC_DEADLINE", str(cfg.get("deadline", 60.0))))
+    retry_budget = float(
+        os.getenv("HMC_RETRY_BUDGET", str(cfg.get("retry_budget", 0.2)))
+    )
+    hedge = parse_bool(
+        os.getenv("HMC_HEDGE"), default=parse_bool(str(cfg.get("hedge", False)))
+    )
+    hedge_percentile = float(
+        os.getenv("HMC_HEDGE_PERCENTILE", str(cfg.get("hedge_percentile", 95.0)))
+    )
+    breaker_threshold = int(
+        os.getenv("HMC_BREAKER_THRESHOLD", str(cfg.get("breaker_threshold", 5)))
+    )
+    breaker_cooldown = float(
+        os.getenv("HMC_BREAKER_COOLDOWN", str(cfg.get("breaker_cooldown", 30.0)))
+    )
     return Settings(
         host=host,
         username=user,
         password=password,
         verify=verify,
         timeout=timeout,
+        pool_size=pool_size,
+        keepalive_expiry=keepalive,
+        http2=http2,
+        deadline=deadline,
+        retry_budget=retry_budget,
+        hedge=hedge,
+        hedge_percentile=hedge_percentile,
+        breaker_threshold=breaker_threshold,
+        breaker_cooldown=breaker_cooldown,
     )
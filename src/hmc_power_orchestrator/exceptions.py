@@ -38,6 +38,10 @@ class PermanentError(HttpError):
     """Permanent failure; retrying is unlikely to help."""
 
 
+class DeadlineExceeded(HttpError):
+    """The operation deadline passed before the request could complete."""
+
+
 class NetworkError(RuntimeError):
     """Network-level error while communicating with the HMC."""
 
@@ -3,19 +3,42 @@ from __future__ import annotations
 
 import secrets
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from typing import Any, Iterable, Iterator
 from uuid import uuid4
 
 import httpx
 
+from hmc_orchestrator import codec
+from hmc_orchestrator.metrics import TRAFFIC
+from hmc_orchestrator.resilience import (
+    Deadline,
+    LatencyTracker,
+    RetryBudget,
+    current_budget,
+    operation_deadline,
+)
+
+from .breaker import BreakerRegistry
 from .exceptions import (
     AuthError,
+    DeadlineExceeded,
     NetworkError,
     PermanentError,
     TransientError,
 )
-from .observability import METRIC_LATENCY, METRIC_REQUESTS, get_logger
+from .observability import (
+    METRIC_DEADLINE_EXCEEDED,
+    METRIC_HEDGE_WINS,
+    METRIC_HEDGES,
+    METRIC_LATENCY,
+    METRIC_REQUESTS,
+    METRIC_RETRY_AMPLIFICATION,
+    METRIC_RETRY_BUDGET_EXHAUSTED,
+    endpoint_label,
+    get_logger,
+)
 
 
 @dataclass
@@ -23,6 +46,26 @@ class RetryConfig:
     attempts: int = 3
     backoff_factor: float = 0.5
     max_backoff: float = 30.0
+    # Bound on one call including retries; ``None`` disables it.
+    deadline: float | None = 60.0
+    budget_ratio: float = 0.2
+    budget_reserve: int = 10
+
+
+@dataclass
+class HedgeConfig:
+    """Send a second GET once the first exceeds this latency percentile."""
+
+    percentile: float = 95.0
+    initial_delay: float = 1.0
+    min_delay: float = 0.05
+    budget_ratio: float = 0.05
+    budget_reserve: int = 3
+
+
+def _discard(future: Future[httpx.Response]) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
 
 
 class HMCClient:
@@ -36,13 +79,39 @@ class HMCClient:
         verify: bool | str = True,
         retry: RetryConfig | None = None,
         run_id: str | None = None,
+        transport: httpx.BaseTransport | None = None,
+        pool_size: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        hedge: HedgeConfig | None = None,
+        breakers: BreakerRegistry | None = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.retry = retry or RetryConfig()
-        self.client = httpx.Client(base_url=self.base_url, verify=verify)
+        self.budget = RetryBudget(self.retry.budget_ratio, self.retry.budget_reserve)
+        # Keep every connection we may open alive: TLS handshakes with the
+        # HMC cost far more than an idle socket.
+        limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            verify=verify,
+            transport=transport,
+            limits=limits,
+            http2=http2,
+        )
         self.run_id = run_id or uuid4().hex
         self.log = get_logger(self.run_id)
+        self.hedge = hedge
+        if hedge is not None:
+            self.hedge_budget = RetryBudget(hedge.budget_ratio, hedge.budget_reserve)
+        self.latencies = LatencyTracker()
+        self._hedge_pool: ThreadPoolExecutor | None = None
+        self.breakers = breakers
 
     # ------------------------------------------------------------------
     @staticmethod
@@ -52,7 +121,7 @@ class HMCClient:
     def _backoff(self, attempt: int, retry_after: str | None) -> float:
         if retry_after:
             try:
-                return float(retry_after)
+                return min(max(float(retry_after), 0.0), self.retry.max_backoff)
             except ValueError:
                 pass
         delay = min(self.retry.backoff_factor * (2**attempt), self.retry.max_backoff)
@@ -60,62 +129,184 @@ class HMCClient:
         return float(delay + jitter)
 
     def _handle_response(
-        self, method: str, path: str, response: httpx.Response, attempt: int
+        self, method: str, path: str, response: httpx.Response
     ) -> httpx.Response | None:
+        """Return ``response``, ``None`` if it may be retried, or raise."""
         url = f"{self.base_url}/{path.lstrip('/')}"
+        endpoint = endpoint_label(path)
         status = response.status_code
         if status == 401:
             raise AuthError(method, url, status, response.text[:200])
         if status == 429:
             METRIC_REQUESTS.labels(
-                method=method, endpoint=path, outcome="rate_limit"
+                method=method, endpoint=endpoint, outcome="rate_limit"
             ).inc()
-            self._sleep(self._backoff(attempt, response.headers.get("Retry-After")))
             return None
         if 500 <= status < 600:
-            METRIC_REQUESTS.labels(method=method, endpoint=path, outcome="error").inc()
-            self._sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+            METRIC_REQUESTS.labels(
+                method=method, endpoint=endpoint, outcome="error"
+            ).inc()
             return None
         if status >= 400:
             raise PermanentError(method, url, status, response.text[:200])
-        METRIC_REQUESTS.labels(method=method, endpoint=path, outcome="success").inc()
+        METRIC_REQUESTS.labels(
+            method=method, endpoint=endpoint, outcome="success"
+        ).inc()
+        TRAFFIC.response(endpoint, response)
+        return response
+
+    def _timed_get(self, url: str, endpoint: str, **kwargs: Any) -> httpx.Response:
+        started = time.perf_counter()
+        response = self.client.request("GET", url, **kwargs)
+        if response.status_code < 500:
+            self.latencies.observe(endpoint, time.perf_counter() - started)
         return response
 
-    def _request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+    def _send(
+        self, method: str, url: str, endpoint: str, **kwargs: Any
+    ) -> httpx.Response:
+        if self.hedge is None or method != "GET":
+            return self.client.request(method, url, **kwargs)
+        return self._hedged(self.hedge, url, endpoint, **kwargs)
+
+    def _hedged(
+        self, hedge: HedgeConfig, url: str, endpoint: str, **kwargs: Any
+    ) -> httpx.Response:
+        """Duplicate a slow GET; the first successful reply wins.
+
+        The sync client cannot abort a request running in another thread, so
+        the losing request is left to finish and its response discarded.
+        """
+
+        self.hedge_budget.request()
+        delay = self.latencies.hedge_delay(
+            endpoint, hedge.percentile, hedge.initial_delay, hedge.min_delay
+        )
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(thread_name_prefix="hmc-hedge")
+        primary = self._hedge_pool.submit(self._timed_get, url, endpoint, **kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.hedge_budget.try_retry():
+            return primary.result()
+        METRIC_HEDGES.labels(endpoint=endpoint).inc()
+        hedged = self._hedge_pool.submit(self._timed_get, url, endpoint, **kwargs)
+        pending = {primary, hedged}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    winner = "primary" if future is primary else "hedge"
+                    METRIC_HEDGE_WINS.labels(endpoint=endpoint, winner=winner).inc()
+                    for loser in pending:
+                        loser.add_done_callback(_discard)
+                    return future.result()
+        return primary.result()  # both failed: surface the original error
+
+    def _request(
+        self, method: str, path: str, frame: str | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        """Perform a call, guarded by the frame/endpoint circuit breaker."""
+
+        if self.breakers is None:
+            return self._call(method, path, **kwargs)
+        breaker = self.breakers.get(frame, endpoint_label(path))
+        breaker.before_request(method, f"{self.base_url}/{path.lstrip('/')}")
+        try:
+            response = self._call(method, path, **kwargs)
+        except (TransientError, NetworkError, DeadlineExceeded):
+            breaker.record_failure()
+            raise
+        except Exception:
+            breaker.record_success()  # the frame answered; the call was wrong
+            raise
+        breaker.record_success()
+        return response
+
+    def _call(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
         url = f"{self.base_url}/{path.lstrip('/')}"
+        endpoint = endpoint_label(path)
         headers = kwargs.pop("headers", {})
         headers.setdefault("X-Correlation-ID", self.run_id)
         if method.upper() not in {"GET", "HEAD"}:
             headers.setdefault("Idempotency-Key", uuid4().hex)
-        for attempt in range(self.retry.attempts):
-            start = time.time()
-            try:
-                response = self.client.request(
-                    method,
-                    url,
-                    timeout=self.timeout,
-                    headers=headers,
-                    **kwargs,
+        op = operation_deadline(self.retry.deadline)
+        budget = current_budget(self.budget)
+        budget.request()
+        try:
+            for attempt in range(self.retry.attempts):
+                if op.expired:
+                    raise self._deadline_exceeded(method, url, endpoint)
+                start = time.time()
+                try:
+                    response = self._send(
+                        method,
+                        url,
+                        endpoint,
+                        timeout=op.timeout(self.timeout),
+                        headers=headers,
+                        **kwargs,
+                    )
+                except httpx.RequestError as exc:
+                    if attempt + 1 >= self.retry.attempts:
+                        raise NetworkError(exc) from exc
+                    self._retry(op, budget, method, url, endpoint, attempt, None, exc)
+                    continue
+                METRIC_LATENCY.labels(method=method, endpoint=endpoint).observe(
+                    time.time() - start
                 )
-            except httpx.RequestError as exc:
-                if attempt + 1 >= self.retry.attempts:
-                    raise NetworkError(exc) from exc
-                self._sleep(self._backoff(attempt, None))
-                continue
-            METRIC_LATENCY.labels(method=method, endpoint=path).observe(
-                time.time() - start
+                result = self._handle_response(method, path, response)
+                if result is not None:
+                    return result
+                if attempt + 1 < self.retry.attempts:
+                    retry_after = response.headers.get("Retry-After")
+                    self._retry(
+                        op, budget, method, url, endpoint, attempt, retry_after, None
+                    )
+        finally:
+            METRIC_RETRY_AMPLIFICATION.labels(client="hmc_client").set(
+                budget.amplification
             )
-            result = self._handle_response(method, path, response, attempt)
-            if result is not None:
-                return result
         raise TransientError(method, url, snippet="max retries reached")
 
+    def _deadline_exceeded(
+        self, method: str, url: str, endpoint: str
+    ) -> DeadlineExceeded:
+        METRIC_DEADLINE_EXCEEDED.labels(endpoint=endpoint).inc()
+        return DeadlineExceeded(method, url, snippet="deadline exceeded")
+
+    def _retry(
+        self,
+        op: Deadline,
+        budget: RetryBudget,
+        method: str,
+        url: str,
+        endpoint: str,
+        attempt: int,
+        retry_after: str | None,
+        exc: httpx.RequestError | None,
+    ) -> None:
+        """Sleep before the next attempt, or raise if it cannot be afforded."""
+
+        delay = self._backoff(attempt, retry_after)
+        if not op.allows(delay):
+            raise self._deadline_exceeded(method, url, endpoint) from exc
+        if not budget.try_retry():
+            METRIC_RETRY_BUDGET_EXHAUSTED.labels(endpoint=endpoint).inc()
+            if exc is not None:
+                raise NetworkError(exc) from exc
+            raise TransientError(method, url, snippet="retry budget exhausted")
+        self._sleep(delay)
+
     # ------------------------------------------------------------------
-    def get(self, path: str, **kwargs: Any) -> httpx.Response:
-        return self._request("GET", path, **kwargs)
+    def get(
+        self, path: str, *, frame: str | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        return self._request("GET", path, frame, **kwargs)
 
-    def post(self, path: str, **kwargs: Any) -> httpx.Response:
-        return self._request("POST", path, **kwargs)
+    def post(
+        self, path: str, *, frame: str | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        return self._request("POST", path, frame, **kwargs)
 
     # ------------------------------------------------------------------
     def iter_collection(self, path: str) -> Iterator[dict[str, Any]]:
@@ -123,11 +314,16 @@ class HMCClient:
         next_path: str | None = path
         while next_path:
             resp = self.get(next_path)
-            data = resp.json()
+            started = time.perf_counter()
+            data = codec.loads(resp.content)
+            TRAFFIC.decode(endpoint_label(next_path), time.perf_counter() - started)
             items: Iterable[dict[str, Any]] = data.get("items", [])
             for item in items:
                 yield item
             next_path = data.get("next")
 
     def close(self) -> None:
+        if self._hedge_pool is not None:
+            # Losing attempts are discarded by _discard; do not wait for them.
+            self._hedge_pool.shutdown(wait=False, cancel_futures=True)
         self.client.close()
@@ -2,88 +2,50 @@
 
 from __future__ import annotations
 
-from enum import Enum
-from threading import Lock
-from time import monotonic
+import secrets
+import time
 from typing import Any
 from urllib.parse import urljoin
 
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
+from hmc_orchestrator.metrics import TRAFFIC
+from hmc_orchestrator.resilience import (
+    Deadline,
+    RetryBudget,
+    current_budget,
+    operation_deadline,
+)
+
+from .breaker import ANY_FRAME, BreakerRegistry, CircuitBreaker, CircuitBreakerState
 from .exceptions import (
     AuthError,
+    DeadlineExceeded,
     NetworkError,
     PermanentError,
     RateLimitError,
     TransientError,
 )
+from .observability import (
+    METRIC_DEADLINE_EXCEEDED,
+    METRIC_RETRY_AMPLIFICATION,
+    METRIC_RETRY_BUDGET_EXHAUSTED,
+    endpoint_label,
+)
 
-
-class CircuitBreakerState(Enum):
-    CLOSED = "closed"
-    OPEN = "open"
-    HALF_OPEN = "half-open"
-
-
-class _CircuitBreaker:
-    """Thread-safe state tracker implementing a basic circuit breaker."""
-
-    def __init__(self, threshold: int, cooldown: float) -> None:
-        self._threshold = threshold
-        self._cooldown = cooldown
-        self._failures = 0
-        self._state: CircuitBreakerState = CircuitBreakerState.CLOSED
-        self._opened_at = 0.0
-        self._lock = Lock()
-
-    # ------------------------------------------------------------------
-    def before_request(self, method: str, url: str) -> None:
-        """Check breaker state and potentially raise ``TransientError``.
-
-        The lock covers the entire method to avoid races between reading and
-        modifying internal state.
-        """
-
-        with self._lock:
-            if self._state == CircuitBreakerState.OPEN:
-                if monotonic() - self._opened_at < self._cooldown:
-                    raise TransientError(method, url, snippet="circuit open")
-                # cooldown passed – allow a single probe request
-                self._state = CircuitBreakerState.HALF_OPEN
-            elif self._state == CircuitBreakerState.HALF_OPEN:
-                # another probe already in progress
-                raise TransientError(method, url, snippet="circuit open")
-
-    def record_success(self) -> None:
-        with self._lock:
-            self._failures = 0
-            self._state = CircuitBreakerState.CLOSED
-
-    def record_failure(self) -> None:
-        with self._lock:
-            if self._state == CircuitBreakerState.HALF_OPEN:
-                self._state = CircuitBreakerState.OPEN
-                self._opened_at = monotonic()
-                self._failures = self._threshold
-                return
-            self._failures += 1
-            if self._failures >= self._threshold:
-                self._state = CircuitBreakerState.OPEN
-                self._opened_at = monotonic()
-
-    @property
-    def state(self) -> CircuitBreakerState:
-        return self._state
-
-    @property
-    def failures(self) -> int:
-        return self._failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
 
 
 class HTTPClient:
-    """Thin wrapper around :class:`requests.Session` with sane retries."""
+    """Thin wrapper around :class:`requests.Session` with sane retries.
+
+    Connection errors and :data:`RETRY_STATUSES` are retried up to
+    ``retries`` times within ``deadline`` seconds per call, charged to a
+    :class:`~hmc_orchestrator.resilience.RetryBudget`. Circuit breakers are
+    kept per frame (the ``frame`` argument of :meth:`get`/:meth:`post`) and
+    endpoint template and see one outcome per call, not per attempt.
+    """
 
     def __init__(
         self,
@@ -95,20 +57,24 @@ class HTTPClient:
         auth: tuple[str, str] | None = None,
         cb_threshold: int = 5,
         cb_cooldown: float = 30.0,
+        pool_size: int = 10,
+        deadline: float | None = 60.0,
+        budget: RetryBudget | None = None,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        breakers: BreakerRegistry | None = None,
     ) -> None:
         self.base_url = base_url
         self.retries = retries
         self.timeout = timeout
+        self.deadline = deadline
+        self.budget = budget or RetryBudget()
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
         self._session = requests.Session()
+        # Retries are done in _send so they can honour deadline and budget.
         adapter = HTTPAdapter(
-            max_retries=Retry(
-                total=self.retries,
-                connect=self.retries,
-                read=self.retries,
-                backoff_factor=0.5,
-                status_forcelist=(429, 500, 502, 503, 504),
-                allowed_methods=frozenset({"GET", "POST", "PUT", "PATCH", "DELETE"}),
-            )
+            pool_connections=1, pool_maxsize=pool_size, max_retries=0
         )
         self._session.mount("http://", adapter)
         self._session.mount("https://", adapter)
@@ -116,49 +82,136 @@ class HTTPClient:
         if auth is not None:
             self._session.auth = auth
 
-        self._cb = _CircuitBreaker(cb_threshold, cb_cooldown)
+        self.breakers = breakers or BreakerRegistry(cb_threshold, cb_cooldown)
 
     @property
     def cb_state(self) -> CircuitBreakerState:  # pragma: no cover - for tests
-        return self._cb.state
+        """Least healthy state of the breakers for requests without a frame."""
+
+        states = {b.state for b in self.breakers.for_frame(ANY_FRAME)}
+        for state in (CircuitBreakerState.OPEN, CircuitBreakerState.HALF_OPEN):
+            if state in states:
+                return state
+        return CircuitBreakerState.CLOSED
 
     @property
     def cb_failures(self) -> int:  # pragma: no cover - for tests/introspection
-        return self._cb.failures
+        """Highest failure count of the breakers for requests without a frame."""
+
+        return max((b.failures for b in self.breakers.for_frame(ANY_FRAME)), default=0)
+
+    def breaker(self, path: str, frame: str | None = None) -> CircuitBreaker:
+        """The breaker guarding requests to ``path`` on ``frame``."""
+
+        return self.breakers.get(frame, endpoint_label(path))
+
+    @staticmethod
+    def _sleep(seconds: float) -> None:
+        time.sleep(seconds)
 
-    def _request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), self.max_backoff)
+            except ValueError:
+                pass
+        jitter = secrets.randbelow(1_000) / 1_000 * self.backoff_factor
+        return min(self.backoff_factor * 2.0**attempt + jitter, self.max_backoff)
+
+    def _send(
+        self,
+        op: Deadline,
+        budget: RetryBudget,
+        method: str,
+        url: str,
+        endpoint: str,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Perform attempts until a final response, an error or a spent budget."""
+
+        for attempt in range(self.retries + 1):
+            if op.expired:
+                METRIC_DEADLINE_EXCEEDED.labels(endpoint=endpoint).inc()
+                raise DeadlineExceeded(method, url, snippet="deadline exceeded")
+            error: requests.RequestException | None = None
+            try:
+                response = self._session.request(
+                    method, url, timeout=op.timeout(self.timeout), **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == self.retries:
+                    raise
+                error = exc
+                delay = self._backoff(attempt, None)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                if attempt == self.retries:
+                    return response
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+            if not op.allows(delay):
+                METRIC_DEADLINE_EXCEEDED.labels(endpoint=endpoint).inc()
+                raise DeadlineExceeded(
+                    method, url, snippet="deadline exceeded"
+                ) from error
+            if not budget.try_retry():
+                METRIC_RETRY_BUDGET_EXHAUSTED.labels(endpoint=endpoint).inc()
+                if error is not None:
+                    raise error
+                return response
+            self._sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def _request(
+        self, method: str, path: str, frame: str | None = None, **kwargs: Any
+    ) -> requests.Response:
         url = urljoin(self.base_url.rstrip("/") + "/", path.lstrip("/"))
-        self._cb.before_request(method, url)
+        endpoint = endpoint_label(path)
+        breaker = self.breakers.get(frame, endpoint)
+        breaker.before_request(method, url)
+        op = operation_deadline(self.deadline)
+        budget = current_budget(self.budget)
+        budget.request()
         try:
-            response = self._session.request(
-                method, url, timeout=self.timeout, **kwargs
-            )
+            response = self._send(op, budget, method, url, endpoint, **kwargs)
         except requests.RequestException as exc:
-            self._cb.record_failure()
+            breaker.record_failure()
             raise NetworkError(exc) from exc
+        except DeadlineExceeded:
+            breaker.record_failure()
+            raise
+        finally:
+            METRIC_RETRY_AMPLIFICATION.labels(client="http").set(
+                budget.amplification
+            )
 
         snippet = response.text[:200].strip().replace("\n", " ")
         if response.status_code == 401:
-            self._cb.record_success()
+            breaker.record_success()
             raise AuthError(method, url, response.status_code, snippet)
         if response.status_code == 429:
-            self._cb.record_failure()
+            breaker.record_failure()
             raise RateLimitError(method, url, response.status_code, snippet)
         if 500 <= response.status_code:
-            self._cb.record_failure()
+            breaker.record_failure()
             raise TransientError(method, url, response.status_code, snippet)
         if response.status_code >= 400:
-            self._cb.record_success()
+            breaker.record_success()
             raise PermanentError(method, url, response.status_code, snippet)
 
-        self._cb.record_success()
+        breaker.record_success()
+        TRAFFIC.response(endpoint, response)
         return response
 
-    def get(self, path: str, **kwargs: Any) -> requests.Response:
-        return self._request("GET", path, **kwargs)
+    def get(
+        self, path: str, *, frame: str | None = None, **kwargs: Any
+    ) -> requests.Response:
+        return self._request("GET", path, frame, **kwargs)
 
-    def post(self, path: str, **kwargs: Any) -> requests.Response:
-        return self._request("POST", path, **kwargs)
+    def post(
+        self, path: str, *, frame: str | None = None, **kwargs: Any
+    ) -> requests.Response:
+        return self._request("POST", path, frame, **kwargs)
 
     def close(self) -> None:
         self._session.close()
@@ -1,12 +1,53 @@
 """Structured logging, Prometheus metrics and audit log helpers."""
 from __future__ import annotations
 
-import json
+import os
 from pathlib import Path
+from threading import Lock
 from typing import Any
 
 import structlog
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
+
+from hmc_orchestrator import codec
+from hmc_orchestrator.metrics import LATENCY_BUCKETS, endpoint_template
+
+ENDPOINT_OVERFLOW = "other"
+
+
+class EndpointLabels:
+    """Map request paths to a bounded set of ``endpoint`` label values.
+
+    Once ``limit`` distinct templates have been seen, further unseen
+    templates are reported as :data:`ENDPOINT_OVERFLOW`.
+    """
+
+    def __init__(self, limit: int = 64) -> None:
+        self.limit = limit
+        self._seen: dict[str, str] = {}
+        self._templates: set[str] = set()
+        self._lock = Lock()
+
+    def __call__(self, path: str) -> str:
+        label = self._seen.get(path)
+        if label is not None:
+            return label
+        template = endpoint_template(path)
+        with self._lock:
+            if template not in self._templates:
+                if len(self._templates) >= self.limit:
+                    template = ENDPOINT_OVERFLOW
+                else:
+                    self._templates.add(template)
+            # Cache the raw path as well, but never grow without bound.
+            if len(self._seen) < self.limit * 64:
+                self._seen[path] = template
+        return template
+
+
+endpoint_label = EndpointLabels(
+    int(os.getenv("HMC_METRICS_MAX_ENDPOINTS", "64"))
+)
 
 METRIC_REQUESTS = Counter(
     "hmc_client_requests_total",
@@ -17,6 +58,37 @@ METRIC_LATENCY = Histogram(
     "hmc_client_request_seconds",
     "Request latency",
     labelnames=("method", "endpoint"),
+    buckets=LATENCY_BUCKETS,
+)
+METRIC_RETRY_BUDGET_EXHAUSTED = Counter(
+    "hmc_client_retry_budget_exhausted_total",
+    "Failed attempts not retried because the retry budget was spent",
+    labelnames=("endpoint",),
+)
+METRIC_RETRY_AMPLIFICATION = Gauge(
+    "hmc_client_retry_amplification",
+    "Attempts sent per logical request",
+    labelnames=("client",),
+)
+METRIC_DEADLINE_EXCEEDED = Counter(
+    "hmc_client_deadline_exceeded_total",
+    "Requests abandoned because their operation deadline could not be met",
+    labelnames=("endpoint",),
+)
+METRIC_HEDGES = Counter(
+    "hmc_client_hedged_requests_total",
+    "Duplicate GETs sent because the first had not answered in time",
+    labelnames=("endpoint",),
+)
+METRIC_HEDGE_WINS = Counter(
+    "hmc_client_hedge_wins_total",
+    "Hedged GETs by which copy answered first",
+    labelnames=("endpoint", "winner"),
+)
+METRIC_BREAKER_OPENED = Counter(
+    "hmc_client_circuit_opened_total",
+    "Circuit breakers (one per frame and endpoint) that opened",
+    labelnames=("endpoint",),
 )
 
 # Track outcomes for the apply command.  Consumers may scrape these metrics
@@ -50,5 +122,5 @@ class AuditLogger:
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
     def write(self, record: dict[str, Any]) -> None:
-        with self.path.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(record) + "\n")
+        with self.path.open("ab") as fh:
+            fh.write(codec.dumps(record) + b"\n")
@@ -1,26 +1,190 @@
-"""Policy schema and validation models."""
+"""Policy schema and validation models.
+
+:func:`iter_targets` reads a policy file incrementally and validates one
+:class:`Target` at a time, so ``plan`` and ``apply`` start working on the
+first target straight away and hold only a read buffer in memory however
+large the generated policy is.
+"""
 from __future__ import annotations
 
-from typing import List, Optional
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator, List, Literal, Optional, TextIO
+
+from pydantic import BaseModel, ValidationError
+
+# Characters read per refill of the streaming parser's buffer.
+CHUNK_SIZE = 64 * 1024
+POLICY_VERSION: Literal[1] = 1
+
 
-from pydantic import BaseModel, Field
+class PolicyError(ValueError):
+    """The policy document is malformed or fails validation."""
 
 
 class Target(BaseModel):
     lpar: str
+    # Managed system hosting the LPAR; scopes circuit breakers during apply.
+    frame: Optional[str] = None
     cpu: int
     mem: int
     min_cpu: Optional[int] = None
     max_cpu: Optional[int] = None
+    # Scheduled apply runs higher priorities first.
+    priority: int = 0
 
 
 class Policy(BaseModel):
-    policy_version: int = Field(1, const=True)
+    policy_version: Literal[1] = POLICY_VERSION
     targets: List[Target]
 
     def to_json_schema(self) -> str:
-        return self.schema_json(indent=2)
+        return json.dumps(self.model_json_schema(), indent=2)
 
 
 def load_policy(text: str) -> Policy:
     return Policy.model_validate_json(text)
+
+
+class _Reader:
+    """Incremental JSON tokenizer over a text stream.
+
+    Only the top-level object and the ``targets`` array are tokenized by
+    hand; every other value is decoded with :meth:`json.JSONDecoder.raw_decode`
+    once the buffer holds it completely.
+    """
+
+    _NON_WS = re.compile(r"[^ \t\n\r]")
+
+    def __init__(self, fp: TextIO, chunk_size: int) -> None:
+        self._fp = fp
+        self._chunk = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decode = json.JSONDecoder().raw_decode
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        data = self._fp.read(self._chunk)
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of input)."""
+
+        while True:
+            match = self._NON_WS.search(self._buf, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return self._buf[self._pos]
+            self._pos = len(self._buf)
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            found = repr(char) if char else "end of input"
+            raise PolicyError(f"expected one of {chars!r}, found {found}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decode(self._buf, self._pos)
+            except json.JSONDecodeError as exc:
+                if self._fill():
+                    continue
+                raise PolicyError(f"invalid JSON: {exc.msg}") from None
+            # A number may continue in the next chunk.
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+
+def _check_version(version: Any) -> None:
+    if version != POLICY_VERSION:
+        raise PolicyError(f"unsupported policy_version {version!r}")
+
+
+def stream_targets(fp: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Target]:
+    """Validate and yield the targets of the policy read from ``fp``.
+
+    A ``policy_version`` preceding ``targets`` (as generated policies put
+    it) is checked before the first target is yielded; a trailing one only
+    once the array has been consumed. Other top-level keys are ignored, as
+    by :class:`Policy`.
+    """
+
+    reader = _Reader(fp, chunk_size)
+    seen_targets = False
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.expect("}")
+        raise PolicyError("policy has no targets")
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise PolicyError("expected an object key")
+        reader.expect(":")
+        if key == "targets":
+            if seen_targets:
+                raise PolicyError("duplicate targets")
+            seen_targets = True
+            yield from _stream_array(reader)
+        elif key == "policy_version":
+            _check_version(reader.value())
+        else:
+            reader.value()
+        if reader.expect(",}") == "}":
+            break
+    if reader.peek():
+        raise PolicyError("unexpected data after the policy object")
+    if not seen_targets:
+        raise PolicyError("policy has no targets")
+
+
+def _stream_array(reader: _Reader) -> Iterator[Target]:
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.expect("]")
+        return
+    index = 0
+    while True:
+        try:
+            target = Target.model_validate(reader.value())
+        except ValidationError as exc:
+            raise PolicyError(f"targets[{index}]: {exc}") from None
+        yield target
+        index += 1
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_targets(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Target]:
+    """Stream the targets of the policy file at ``path``."""
+
+    with path.open(encoding="utf-8") as fp:
+        yield from stream_targets(fp, chunk_size)
+
+
+__all__ = [
+    "CHUNK_SIZE",
+    "POLICY_VERSION",
+    "Policy",
+    "PolicyError",
+    "Target",
+    "iter_targets",
+    "load_policy",
+    "stream_targets",
+]
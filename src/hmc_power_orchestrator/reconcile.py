@@ -0,0 +1,73 @@
+"""Desired-state diff between policy targets and the current inventory.
+
+Every resize is a DLPAR operation on the HMC, even when the LPAR already
+has the requested entitlement. :class:`Reconciler` indexes one bulk read of
+``/api/lpars`` and classifies each target so that ``plan`` can show what
+would change and ``apply`` only submits real changes.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Mapping
+
+from .policy import Target
+
+RESIZE = "resize"
+SKIP = "skip"
+# Not in the inventory: submitted anyway and left to the HMC to resolve.
+UNKNOWN = "unknown"
+SCALE_UP = "up"
+SCALE_DOWN = "down"
+
+
+class Reconciler:
+    """Classify targets against a snapshot of current LPAR state.
+
+    LPARs are indexed by both ``name`` and ``uuid``, as either may be used
+    as a target's ``lpar``. Only ``cpu`` and ``mem`` are compared; the
+    inventory does not report the ``min_cpu``/``max_cpu`` bounds.
+    """
+
+    def __init__(self, inventory: Iterable[Mapping[str, Any]]) -> None:
+        self._state: dict[str, tuple[Any, Any]] = {}
+        for item in inventory:
+            current = (item.get("cpu"), item.get("mem"))
+            for key in (item.get("name"), item.get("uuid")):
+                if key:
+                    self._state[key] = current
+        self.counts = {RESIZE: 0, SKIP: 0, UNKNOWN: 0}
+
+    def action(self, target: Target) -> str:
+        current = self._state.get(target.lpar)
+        if current is None:
+            action = UNKNOWN
+        elif current == (target.cpu, target.mem):
+            action = SKIP
+        else:
+            action = RESIZE
+        self.counts[action] += 1
+        return action
+
+    def direction(self, target: Target) -> str:
+        """``SCALE_UP`` if ``target`` grows cpu or memory, else ``SCALE_DOWN``.
+
+        ``UNKNOWN`` when the LPAR or its current values are not known.
+        """
+
+        current = self._state.get(target.lpar)
+        if current is None or None in current:
+            return UNKNOWN
+        cpu, mem = current
+        if target.cpu > cpu or target.mem > mem:
+            return SCALE_UP
+        return SCALE_DOWN
+
+
+__all__ = [
+    "RESIZE",
+    "SCALE_DOWN",
+    "SCALE_UP",
+    "SKIP",
+    "UNKNOWN",
+    "Reconciler",
+]
@@ -0,0 +1,146 @@
+"""Priority-aware, frame-fair scheduling of resize operations.
+
+Applying targets in policy order lets a critical scale-up wait behind
+hundreds of cosmetic scale-downs. :class:`Scheduler` reads a bounded
+lookahead window of targets and dispatches them to a thread pool in order
+of:
+
+1. explicit :attr:`Target.priority` (higher first),
+2. scale-ups before targets of unknown direction before scale-downs,
+3. the frame served least recently, so one busy frame cannot starve others,
+4. policy order.
+
+At most ``frame_concurrency`` resizes run on one frame at a time, because
+DLPAR operations on the same managed system serialize on the HMC anyway.
+Targets without a ``frame`` may be on any system, so they share one queue
+that is limited only by ``workers``.
+"""
+
+from __future__ import annotations
+
+import heapq
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import count
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+from .breaker import ANY_FRAME
+from .policy import Target
+from .reconcile import SCALE_DOWN, SCALE_UP
+
+R = TypeVar("R")
+
+_DIRECTION_RANK = {SCALE_UP: 0, SCALE_DOWN: 2}
+_UNKNOWN_RANK = 1
+
+
+class Scheduler:
+    """Run targets through ``run`` in priority order on a thread pool.
+
+    ``direction`` maps a target to ``SCALE_UP`` / ``SCALE_DOWN`` (anything
+    else counts as unknown); without it only the explicit priority and
+    frame fairness order the work. Priorities are honoured within the
+    ``window`` of targets read ahead, which bounds memory on huge policies.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 4,
+        frame_concurrency: int = 1,
+        window: int = 10_000,
+        direction: Optional[Callable[[Target], str]] = None,
+    ) -> None:
+        if workers < 1 or frame_concurrency < 1 or window < 1:
+            raise ValueError("workers, frame_concurrency and window must be >= 1")
+        self.workers = workers
+        self.frame_concurrency = frame_concurrency
+        self.window = window
+        self.direction = direction
+
+    def rank(self, target: Target) -> tuple[int, int]:
+        """Sort key of ``target``; lower runs first."""
+
+        if self.direction is None:
+            return (-target.priority, _UNKNOWN_RANK)
+        return (
+            -target.priority,
+            _DIRECTION_RANK.get(self.direction(target), _UNKNOWN_RANK),
+        )
+
+    def execute(
+        self,
+        targets: Iterable[Target],
+        run: Callable[[Target], R],
+        screen: Optional[Callable[[Target], Optional[R]]] = None,
+    ) -> Iterator[R]:
+        """Yield the results of ``run`` as resizes complete.
+
+        ``run`` is called on worker threads. ``screen`` is called on the
+        calling thread as targets are read; a non-``None`` result is yielded
+        straight away and the target is not scheduled (e.g. targets already
+        in their desired state).
+        """
+
+        source = iter(targets)
+        exhausted = False
+        seq = count()
+        queues: dict[str, list[tuple[tuple[int, int], int, Target]]] = {}
+        queued = 0
+        running: dict[str, int] = {}
+        served: dict[str, int] = {}
+        futures: dict[Future[R], str] = {}
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="hmc-apply") as pool:
+            while True:
+                while not exhausted and queued < self.window:
+                    target = next(source, None)
+                    if target is None:
+                        exhausted = True
+                        break
+                    if screen is not None:
+                        result = screen(target)
+                        if result is not None:
+                            yield result
+                            continue
+                    frame = target.frame or ANY_FRAME
+                    entry = (self.rank(target), next(seq), target)
+                    heapq.heappush(queues.setdefault(frame, []), entry)
+                    queued += 1
+                while len(futures) < self.workers:
+                    chosen = self._next_frame(queues, running, served)
+                    if chosen is None:
+                        break
+                    queue = queues[chosen]
+                    target = heapq.heappop(queue)[2]
+                    if not queue:
+                        del queues[chosen]
+                    queued -= 1
+                    running[chosen] = running.get(chosen, 0) + 1
+                    served[chosen] = next(seq)
+                    futures[pool.submit(run, target)] = chosen
+                if not futures:
+                    if exhausted and not queued:
+                        return
+                    continue
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running[futures.pop(future)] -= 1
+                    yield future.result()
+
+    def _next_frame(
+        self,
+        queues: dict[str, list[tuple[tuple[int, int], int, Target]]],
+        running: dict[str, int],
+        served: dict[str, int],
+    ) -> Optional[str]:
+        best: Optional[tuple[tuple[int, int], int, str]] = None
+        for frame, queue in queues.items():
+            limit = self.workers if frame == ANY_FRAME else self.frame_concurrency
+            if running.get(frame, 0) >= limit:
+                continue
+            key = (queue[0][0], served.get(frame, -1), frame)
+            if best is None or key < best:
+                best = key
+        return None if best is None else best[2]
+
+
+__all__ = ["Scheduler"]
@@ -4,10 +4,6 @@ from __future__ import annotations
 import logging
 from typing import Any, Optional
 
-import yaml
-from rich.console import Console
-from rich.table import Table
-
 log = logging.getLogger("hmc")
 
 
@@ -30,18 +26,17 @@ def parse_bool(value: Optional[str], *, default: bool = False) -> bool:
     }
 
 
-def print_table(rows: list[dict[str, Any]]) -> None:
-    table = Table(show_header=True)
-    if rows:
-        for key in rows[0]:
-            table.add_column(key)
-        for row in rows:
-            table.add_row(*[str(row[k]) for k in row])
-    Console().print(table)
+def print_table(rows: list[dict[str, Any]], *, pretty: bool | None = None) -> None:
+    """Print ``rows``; see :func:`hmc_power_orchestrator.table.print_table`."""
+    from .table import print_table as _print
+
+    _print(rows, pretty=pretty)
 
 
 def load_policy(text: str) -> dict[str, Any]:
     """Load a policy definition from YAML/JSON text."""
+    import yaml
+
     data = yaml.safe_load(text)
     if not isinstance(data, dict) or "targets" not in data:
         present_keys = list(data.keys()) if isinstance(data, dict) else None
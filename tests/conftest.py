@@ -1,5 +1,48 @@
+import json
 import sys
 from pathlib import Path
 
+import pytest
+
 # Ensure src/ is on path for imports without installation
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+
+@pytest.fixture
+def power_cli(monkeypatch, tmp_path: Path):
+    """Run ``hmc-power`` against a mock HMC served by ``handler``.
+
+    ``power_cli(handler, policy, command, *args)`` writes ``policy`` (a list
+    of targets, or raw policy text) to ``policy.json`` and invokes
+    ``command policy.json --output tmp_path *args``. With ``policy=None`` the
+    arguments are passed as given. Every client is single-attempt.
+    """
+
+    import httpx
+    from typer.testing import CliRunner
+
+    from hmc_power_orchestrator import cli, config
+    from hmc_power_orchestrator.hmc_client import HMCClient, RetryConfig
+
+    monkeypatch.setattr(config, "load", lambda: None)
+
+    def run(handler, policy, *args: str):
+        monkeypatch.setattr(
+            cli,
+            "_client",
+            lambda cfg, rid: HMCClient(
+                "https://hmc",
+                retry=RetryConfig(attempts=1),
+                transport=httpx.MockTransport(handler),
+            ),
+        )
+        argv = list(args)
+        if policy is not None:
+            path = tmp_path / "policy.json"
+            if not isinstance(policy, str):
+                policy = json.dumps({"policy_version": 1, "targets": policy})
+            path.write_text(policy)
+            argv[1:1] = [str(path), "--output", str(tmp_path)]
+        return CliRunner().invoke(cli.app, argv)
+
+    return run
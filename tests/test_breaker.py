@@ -0,0 +1,77 @@
+import httpx
+import pytest
+
+from hmc_power_orchestrator.breaker import BreakerRegistry, CircuitBreakerState
+from hmc_power_orchestrator.exceptions import TransientError
+from hmc_power_orchestrator.hmc_client import HMCClient, RetryConfig
+
+
+def test_failing_frame_does_not_block_healthy_frames():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if "bad" in request.url.path:
+            return httpx.Response(503)
+        return httpx.Response(202, json={"job": "1"})
+
+    breakers = BreakerRegistry(threshold=2, cooldown=60)
+    client = HMCClient(
+        "https://hmc",
+        retry=RetryConfig(attempts=1),
+        transport=httpx.MockTransport(handler),
+        breakers=breakers,
+    )
+    for _ in range(2):
+        with pytest.raises(TransientError):
+            client.post("/api/lpars/bad1/resize", frame="frame-a", json={})
+    sent = len(calls)
+    # Other LPARs on the failing frame are now refused without a request...
+    with pytest.raises(TransientError, match="circuit open"):
+        client.post("/api/lpars/bad2/resize", frame="frame-a", json={})
+    assert len(calls) == sent
+    # ...while the same endpoint on another frame is unaffected.
+    assert client.post("/api/lpars/ok/resize", frame="frame-b", json={}).is_success
+    assert breakers.open_keys() == [("frame-a", "/api/lpars/{lpar}/resize")]
+    client.close()
+
+
+def test_half_open_probe_is_per_breaker():
+    breakers = BreakerRegistry(threshold=1, cooldown=0)
+    a = breakers.get("frame-a", "/api/lpars/{lpar}/resize")
+    b = breakers.get("frame-b", "/api/lpars/{lpar}/resize")
+    a.record_failure()
+    b.record_failure()
+    a.before_request("POST", "/a")  # probe for frame-a
+    b.before_request("POST", "/b")  # frame-b may probe concurrently
+    with pytest.raises(TransientError):
+        a.before_request("POST", "/a")
+    a.record_success()
+    assert a.state is CircuitBreakerState.CLOSED
+    assert b.state is CircuitBreakerState.HALF_OPEN
+
+
+def test_registry_is_bounded_and_keeps_open_breakers():
+    breakers = BreakerRegistry(threshold=1, max_breakers=2)
+    breakers.get("frame-a", "/x").record_failure()
+    breakers.get("frame-b", "/x")
+    breakers.get("frame-c", "/x")
+    assert len(breakers) == 2
+    assert breakers.open_keys() == [("frame-a", "/x")]
+    assert breakers.get("frame-a", "/x").state is CircuitBreakerState.OPEN
+
+
+def test_http_client_breaker_introspection():
+    from hmc_power_orchestrator.http import HTTPClient
+
+    client = HTTPClient("https://hmc", cb_threshold=2)
+    assert client.cb_state is CircuitBreakerState.CLOSED
+    assert client.cb_failures == 0
+    client.breaker("/api/lpars/a/resize", frame="frame-a").record_failure()
+    assert client.cb_failures == 0
+    client.breaker("/api/lpars/a/resize").record_failure()
+    client.breaker("/api/jobs/1").record_failure()
+    client.breaker("/api/jobs/2").record_failure()
+    assert client.cb_failures == 2
+    assert client.cb_state is CircuitBreakerState.OPEN
+    assert client.breaker("/api/lpars/b/resize").failures == 1
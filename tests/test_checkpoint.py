@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import httpx
+
+from hmc_power_orchestrator.checkpoint import Checkpoint
+from hmc_power_orchestrator.policy import Target
+
+
+def test_checkpoint_round_trip_drops_torn_line(tmp_path: Path):
+    path = tmp_path / "run.checkpoint"
+    checkpoint = Checkpoint(path)
+    checkpoint.record(Target(lpar="L0", cpu=2, mem=2048))
+    checkpoint.record(Target(lpar="L1", cpu=2, mem=2048))
+    checkpoint.close()
+    with path.open("a") as fh:
+        fh.write("L2\t2")  # interrupted mid-write
+
+    resumed = Checkpoint(path)
+    assert len(resumed) == 2
+    assert Target(lpar="L1", cpu=2, mem=2048) in resumed
+    # A changed desired state is not considered done.
+    assert Target(lpar="L1", cpu=4, mem=2048) not in resumed
+    resumed.record(Target(lpar="L2", cpu=2, mem=2048))
+    resumed.close()
+    assert path.read_text().splitlines()[-1] == "L2\t2\t2048"
+
+
+def test_apply_resumes_with_same_run_id(power_cli):
+    resized = []
+    failing = {"L2"}
+
+    def handler(request):
+        lpar = request.url.path.split("/")[3]
+        if lpar in failing:
+            return httpx.Response(503)
+        resized.append(lpar)
+        return httpx.Response(202, json={})
+
+    targets = [{"lpar": f"L{i}", "cpu": 2, "mem": 2048} for i in range(4)]
+    args = ["apply", "--run-id", "r1", "--apply", "--confirm"]
+
+    result = power_cli(handler, targets, *args)
+    assert result.exit_code == 1
+    assert resized == ["L0", "L1", "L3"]
+
+    failing.clear()
+    result = power_cli(handler, targets, *args)
+    assert result.exit_code == 0, result.output
+    assert "resuming run r1: 3 targets done" in result.output
+    assert "1 succeeded, 0 failed, 3 resumed" in result.output
+    assert resized == ["L0", "L1", "L3", "L2"]
+
+
+def test_concurrent_records_are_not_lost(tmp_path: Path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = tmp_path / "run.checkpoint"
+    checkpoint = Checkpoint(path)
+    targets = [Target(lpar=f"L{i}", cpu=1, mem=1024) for i in range(2000)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(checkpoint.record, targets))
+    checkpoint.close()
+    lines = path.read_text().splitlines()
+    assert sorted(lines) == sorted(f"L{i}\t1\t1024" for i in range(2000))
@@ -7,11 +7,13 @@ import pytest
 from httpx import MockTransport, Response
 from typer.testing import CliRunner
 
-from hmc_orchestrator.cli import HmcSession, app
+from hmc_orchestrator.cli import app
+from hmc_orchestrator.session import HmcSession
 
 
 @pytest.fixture(autouse=True)
-def _env(monkeypatch):
+def _env(monkeypatch, tmp_path):
+    monkeypatch.setenv("HMC_POLICY_CACHE_DIR", str(tmp_path / "policy-cache"))
     monkeypatch.setenv("HMC_HOST", "hmc")
     monkeypatch.setenv("HMC_USERNAME", "user")
     monkeypatch.setenv("HMC_PASSWORD", os.getenv("TEST_PASSWORD", "dummy"))
@@ -49,7 +51,7 @@ def _patch_session(monkeypatch, transport):
         def __init__(self, cfg):
             super().__init__(cfg, transport=transport)
 
-    monkeypatch.setattr("hmc_orchestrator.cli.HmcSession", TSession)
+    monkeypatch.setattr("hmc_orchestrator.commands.HmcSession", TSession)
 
 
 def test_list_json(monkeypatch):
@@ -83,3 +85,114 @@ def test_policy_commands(monkeypatch, tmp_path: Path):
     )
     tc.assertEqual(result.exit_code, 0)
     tc.assertTrue(report.is_file())
+
+
+def test_metrics_textfile(monkeypatch, tmp_path: Path):
+    _patch_session(monkeypatch, _transport())
+    out = tmp_path / "hmc.prom"
+    result = CliRunner().invoke(app, ["--metrics-textfile", str(out), "list"])
+    tc = TestCase()
+    tc.assertEqual(result.exit_code, 0)
+    tc.assertIn("hmc_orchestrator_frame_collection_seconds", out.read_text())
+
+
+def test_profile_summary(monkeypatch):
+    _patch_session(monkeypatch, _transport())
+    result = CliRunner().invoke(app, ["--profile", "list", "--json"])
+    tc = TestCase()
+    tc.assertEqual(result.exit_code, 0)
+    json.loads(result.stdout)
+    tc.assertIn("inventory", result.stderr)
+    tc.assertIn("GET /rest/api/uom/LogicalPartition", result.stderr)
+
+
+def test_list_snapshot_roundtrip(monkeypatch, tmp_path: Path):
+    _patch_session(monkeypatch, _transport())
+    runner = CliRunner()
+    snap = tmp_path / "inventory.snap"
+    listed = runner.invoke(app, ["list", "--json", "--snapshot", str(snap)])
+    tc = TestCase()
+    tc.assertEqual(listed.exit_code, 0)
+    restored = runner.invoke(app, ["snapshot", "to-json", str(snap)])
+    tc.assertEqual(restored.exit_code, 0)
+    tc.assertEqual(json.loads(restored.stdout), json.loads(listed.stdout))
+    shown = runner.invoke(app, ["snapshot", "show", str(snap), "--lpar", "l1"])
+    tc.assertEqual(json.loads(shown.stdout)["frame_uuid"], "ms1")
+
+
+def test_list_snapshot_refuses_incomplete_inventory(monkeypatch, tmp_path: Path):
+    monkeypatch.setenv("HMC_RETRIES_TOTAL", "1")
+    inner = _transport()
+
+    async def handler(request):
+        if request.url.path == "/rest/api/uom/ManagedSystem":
+            items = [{"uuid": "ms1", "name": "Frame1"}, {"uuid": "ms2", "name": "F2"}]
+            return Response(200, json={"Items": items})
+        if request.url.params.get("managedSystemUuid") == "ms2":
+            return Response(500)
+        return await inner.handle_async_request(request)
+
+    _patch_session(monkeypatch, MockTransport(handler))
+    snap = tmp_path / "inventory.snap"
+    result = CliRunner().invoke(app, ["list", "--json", "--snapshot", str(snap)])
+    tc = TestCase()
+    tc.assertEqual(result.exit_code, 1)
+    tc.assertEqual([ms["uuid"] for ms in json.loads(result.stdout)], ["ms1"])
+    tc.assertIn("not writing snapshot", result.stderr)
+    tc.assertFalse(snap.exists())
+
+
+def test_bandwidth_summary(monkeypatch):
+    _patch_session(monkeypatch, _transport())
+    result = CliRunner().invoke(app, ["--bandwidth", "list"])
+    tc = TestCase()
+    tc.assertEqual(result.exit_code, 0)
+    tc.assertIn("wire KiB", result.stderr)
+    tc.assertIn("/rest/api/uom/ManagedSystem", result.stderr)
+
+
+def test_deadline_reports_incomplete_frames(monkeypatch):
+    import asyncio
+    import time
+
+    calls = []
+
+    async def handler(request):
+        path = request.url.path
+        calls.append(path)
+        if path == "/rest/api/uom/ManagedSystem":
+            frames = [
+                {"uuid": "ms1", "name": "Frame1"},
+                {"uuid": "ms2", "name": "Hung"},
+            ]
+            return Response(200, json={"Items": frames})
+        if path.endswith("/quick/All"):
+            if "ms2" in path:
+                await asyncio.sleep(30)
+            return Response(200, json=[{"PartitionUUID": "l1", "PartitionName": "a"}])
+        return Response(200)
+
+    _patch_session(monkeypatch, MockTransport(handler))
+    started = time.monotonic()
+    result = CliRunner().invoke(app, ["--deadline", "0.5", "list", "--json"])
+    tc = TestCase()
+    tc.assertLess(time.monotonic() - started, 5)
+    tc.assertEqual(result.exit_code, 0)
+    frames = {ms["uuid"]: ms for ms in json.loads(result.stdout)}
+    tc.assertNotIn("incomplete", frames["ms1"])
+    tc.assertEqual(frames["ms1"]["lpars"][0]["uuid"], "l1")
+    tc.assertTrue(frames["ms2"]["incomplete"])
+    tc.assertIn("frame Hung (ms2) is incomplete", result.stderr)
+    tc.assertIn("/rest/api/web/Logoff", calls)
+
+
+def test_list_ndjson(monkeypatch):
+    _patch_session(monkeypatch, _transport())
+    result = CliRunner().invoke(app, ["list", "--ndjson"])
+    tc = TestCase()
+    tc.assertEqual(result.exit_code, 0)
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    tc.assertEqual([r["kind"] for r in records], ["frame", "lpar"])
+    tc.assertEqual(records[0]["lpars"], 1)
+    tc.assertEqual(records[1]["frame_uuid"], "ms1")
+    tc.assertEqual(records[1]["name"], "LPAR1")
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from unittest import TestCase
+
+import pytest
+
+from hmc_orchestrator import codec
+from hmc_orchestrator.policy_engine import Decision
+
+DECISION = Decision(
+    frame_uuid="f1",
+    lpar_uuid="l1",
+    lpar_name="LPÄR1",
+    current={"cpu_ent": 1.0},
+    target={"cpu_ent": 2.0},
+    delta={"cpu_ent": 1.0},
+    reasons=["CPU above high threshold"],
+    window="00:00-23:59,Mon-Sun",
+    cooldown_remaining=0,
+)
+
+
+def test_stdlib_round_trip_from_bytes() -> None:
+    std = codec.select("stdlib")
+    payload = std.dumps({"Items": [{"uuid": "u1", "at": datetime(2024, 1, 1)}]})
+    tc = TestCase()
+    tc.assertIsInstance(payload, bytes)
+    tc.assertEqual(
+        std.loads(memoryview(payload)),
+        {"Items": [{"uuid": "u1", "at": "2024-01-01T00:00:00"}]},
+    )
+
+
+def test_codecs_produce_identical_reports() -> None:
+    pytest.importorskip("orjson")
+    record = {
+        "decisions": [DECISION],
+        "created": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    }
+    tc = TestCase()
+    for pretty in (False, True):
+        tc.assertEqual(
+            codec.select("stdlib").dumps(record, pretty=pretty),
+            codec.select("orjson").dumps(record, pretty=pretty),
+        )
+
+
+def test_unknown_codec() -> None:
+    with pytest.raises(ValueError):
+        codec.select("simplejson")
+
+
+def test_partial_codec_cannot_be_instantiated() -> None:
+    class DecodeOnly(codec.Codec):
+        name = "decode-only"
+
+        def loads(self, data: codec.JsonInput) -> object:
+            return None
+
+    with pytest.raises(TypeError, match="dumps"):
+        DecodeOnly()  # type: ignore[abstract]
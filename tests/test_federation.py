@@ -0,0 +1,215 @@
+import asyncio
+import os
+
+import httpx
+
+from hmc_orchestrator.config import Config, load_config
+from hmc_orchestrator.federation import Federation
+from hmc_orchestrator.session import HmcSession
+from hmc_orchestrator.simulator import (
+    AsyncSimulatorTransport,
+    HmcSimulator,
+    SimulatorConfig,
+)
+
+
+class _Router(httpx.AsyncBaseTransport):
+    def __init__(self, routes):
+        self.routes = routes
+
+    async def handle_async_request(self, request):
+        route = self.routes.get(request.url.host)
+        if route is None:
+            return httpx.Response(503)
+        return await route.handle_async_request(request)
+
+
+def _cfg(*hosts: str) -> Config:
+    return Config(
+        username="user",
+        password=os.getenv("TEST_PASSWORD", "dummy"),
+        retries={"total": 1},
+        hmcs=[{"host": h} for h in hosts],
+    )
+
+
+def _federation(cfg: Config, routes) -> Federation:
+    transport = _Router(routes)
+    return Federation(cfg, lambda ep: HmcSession(ep, transport=transport))
+
+
+def test_redundant_pair_is_deduplicated_and_failures_isolated() -> None:
+    # Same seed: both HMCs of the pair report the same two frames.
+    pair = SimulatorConfig(frames=2, lpars_per_frame=3, seed=1)
+    other = SimulatorConfig(frames=1, lpars_per_frame=4, seed=2)
+    routes = {
+        "hmc-a": AsyncSimulatorTransport(HmcSimulator(pair)),
+        "hmc-b": AsyncSimulatorTransport(HmcSimulator(pair)),
+        "hmc-c": AsyncSimulatorTransport(HmcSimulator(other)),
+    }
+    fed = _federation(_cfg("hmc-a", "hmc-b", "hmc-c", "hmc-down"), routes)
+
+    async def run():
+        try:
+            return await fed.collect()
+        finally:
+            await fed.close()
+
+    inventory = asyncio.run(run())
+    assert [f.hmc for f in inventory.frames] == ["hmc-a", "hmc-a", "hmc-c"]
+    assert inventory.frames[0].managed_by == ["hmc-a", "hmc-b"]
+    assert len(inventory.lpars) == 10
+    assert [e.hmc for e in inventory.errors] == ["hmc-down"]
+
+
+def test_frame_falls_back_to_partner_hmc() -> None:
+    pair = SimulatorConfig(frames=1, lpars_per_frame=2, seed=1)
+    good = AsyncSimulatorTransport(HmcSimulator(pair))
+    broken = HmcSimulator(pair)
+    calls = {"n": 0}
+
+    class Flaky(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            if "/LogicalPartition" in request.url.path:
+                calls["n"] += 1
+                return httpx.Response(500)
+            return await AsyncSimulatorTransport(broken).handle_async_request(
+                request
+            )
+
+    fed = _federation(_cfg("hmc-a", "hmc-b"), {"hmc-a": Flaky(), "hmc-b": good})
+
+    async def run():
+        try:
+            return await fed.collect()
+        finally:
+            await fed.close()
+
+    inventory = asyncio.run(run())
+    assert calls["n"] == 1
+    assert [f.hmc for f in inventory.frames] == ["hmc-b"]
+    assert inventory.errors[0].frame == inventory.frames[0].system.uuid
+
+
+def test_hmc_hosts_env(tmp_path) -> None:
+    env = {
+        "HMC_HOSTS": "a.example,b.example:443",
+        "HMC_USERNAME": "user",
+        "HMC_PASSWORD": os.getenv("TEST_PASSWORD", "dummy"),
+    }
+    cfg = load_config(env=env, config_path=tmp_path / "missing.yaml")
+    endpoints = cfg.endpoints()
+    assert [(e.host, e.port) for e in endpoints] == [
+        ("a.example", 12443),
+        ("b.example", 443),
+    ]
+    assert all(e.username == "user" and not e.hmcs for e in endpoints)
+
+
+def test_stream_yields_frames_as_they_complete() -> None:
+    from time import monotonic
+
+    class SlowHmc(httpx.AsyncBaseTransport):
+        def __init__(self, sim):
+            self.inner = AsyncSimulatorTransport(sim)
+
+        async def handle_async_request(self, request):
+            if "/LogicalPartition" in request.url.path:
+                await asyncio.sleep(0.5)
+            return await self.inner.handle_async_request(request)
+
+    fast = AsyncSimulatorTransport(HmcSimulator(SimulatorConfig(frames=1, seed=1)))
+    slow = SlowHmc(HmcSimulator(SimulatorConfig(frames=1, seed=2)))
+    routes = {"hmc-slow": slow, "hmc-fast": fast}
+    fed = _federation(_cfg("hmc-slow", "hmc-fast"), routes)
+
+    async def run():
+        started = monotonic()
+        seen = []
+        try:
+            async for frame in fed.stream([]):
+                seen.append((frame.hmc, monotonic() - started))
+        finally:
+            await fed.close()
+        return seen
+
+    (first, first_at), (second, second_at) = asyncio.run(run())
+    assert (first, second) == ("hmc-fast", "hmc-slow")
+    assert first_at < 0.4 <= second_at
+
+
+def test_primary_timeout_falls_back_to_partner() -> None:
+    pair = SimulatorConfig(frames=1, lpars_per_frame=2, seed=1)
+
+    class Stalled(httpx.AsyncBaseTransport):
+        def __init__(self):
+            self.inner = AsyncSimulatorTransport(HmcSimulator(pair))
+
+        async def handle_async_request(self, request):
+            if "/LogicalPartition" in request.url.path:
+                # Honour the read timeout the way a real connection would.
+                await asyncio.sleep(request.extensions["timeout"]["read"])
+                raise httpx.ReadTimeout("stalled", request=request)
+            return await self.inner.handle_async_request(request)
+
+    cfg = _cfg("hmc-a", "hmc-b")
+    cfg.retries.deadline = 0.3  # per call; no run-wide --deadline is set
+    good = AsyncSimulatorTransport(HmcSimulator(pair))
+    fed = _federation(cfg, {"hmc-a": Stalled(), "hmc-b": good})
+
+    async def run():
+        try:
+            return await fed.collect()
+        finally:
+            await fed.close()
+
+    inventory = asyncio.run(run())
+    frame = inventory.frames[0]
+    assert (frame.hmc, frame.complete) == ("hmc-b", True)
+    assert len(frame.lpars) == 2
+    assert [e.hmc for e in inventory.errors] == ["hmc-a"]
+    assert "DeadlineExceeded" in inventory.errors[0].error
+
+
+def test_deadline_bounds_login_and_discovery() -> None:
+    from time import monotonic
+
+    from hmc_orchestrator import resilience
+
+    seen = {}
+
+    class StalledLogon(httpx.AsyncBaseTransport):
+        def __init__(self, honour_timeout: bool):
+            self.honour_timeout = honour_timeout
+
+        async def handle_async_request(self, request):
+            if request.url.path == "/rest/api/web/Logon":
+                timeout = request.extensions["timeout"]["read"]
+                seen[request.url.host] = timeout
+                if self.honour_timeout:
+                    await asyncio.sleep(timeout)
+                    raise httpx.ReadTimeout("stalled", request=request)
+                await asyncio.sleep(30)  # ignores timeouts entirely
+            return httpx.Response(200)
+
+    sim = AsyncSimulatorTransport(HmcSimulator(SimulatorConfig(frames=1, seed=1)))
+    routes = {
+        "hmc-slow": StalledLogon(honour_timeout=True),
+        "hmc-hung": StalledLogon(honour_timeout=False),
+        "hmc-ok": sim,
+    }
+    fed = _federation(_cfg("hmc-slow", "hmc-hung", "hmc-ok"), routes)
+
+    async def run():
+        try:
+            with resilience.deadline(0.5):
+                return await fed.collect()
+        finally:
+            await fed.close(logout_timeout=0.1)
+
+    started = monotonic()
+    inventory = asyncio.run(run())
+    assert monotonic() - started < 2
+    assert seen["hmc-slow"] <= 0.5
+    assert [f.hmc for f in inventory.frames] == ["hmc-ok"]
+    assert sorted(e.hmc for e in inventory.errors) == ["hmc-hung", "hmc-slow"]
@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+HEAVY = {"httpx", "yaml", "pydantic", "structlog", "prometheus_client", "asyncio"}
+# Generous wall-clock ceiling for importing a CLI module in a fresh
+# interpreter; the module checks below are the precise guard.
+BUDGET_MS = float(os.getenv("HMC_IMPORT_BUDGET_MS", "500"))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+{extra}
+print(json.dumps({{"ms": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _probe(module: str, extra: str = "") -> dict:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, extra=extra)],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "module", ["hmc_orchestrator.cli", "hmc_power_orchestrator.cli"]
+)
+def test_cli_import_is_lazy(module: str) -> None:
+    result = _probe(module)
+    assert HEAVY.isdisjoint(result["modules"])
+    assert result["ms"] < BUDGET_MS
+
+
+def test_help_does_not_import_http_stack() -> None:
+    extra = (
+        "from hmc_orchestrator.cli import app\n"
+        "try:\n"
+        "    app(['policy', '--help'])\n"
+        "except SystemExit:\n"
+        "    pass"
+    )
+    result = _probe("hmc_orchestrator.cli", extra)
+    assert {"httpx", "pydantic", "prometheus_client"}.isdisjoint(result["modules"])
+
+
+def test_policy_validate_imports_only_yaml(tmp_path: Path) -> None:
+    policy = Path(__file__).resolve().parents[1] / "examples" / "example-policy.yaml"
+    extra = (
+        "import os\n"
+        f"os.environ['HMC_POLICY_CACHE_DIR'] = {str(tmp_path)!r}\n"
+        "from hmc_orchestrator.cli import app\n"
+        "try:\n"
+        f"    app(['policy', 'validate', {str(policy)!r}])\n"
+        "except SystemExit as exc:\n"
+        "    assert not exc.code, exc.code"
+    )
+    result = _probe("hmc_orchestrator.cli", extra)
+    assert "yaml" in result["modules"]
+    assert {"httpx", "prometheus_client"}.isdisjoint(result["modules"])
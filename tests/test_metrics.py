@@ -0,0 +1,83 @@
+import asyncio
+import os
+from pathlib import Path
+
+from httpx import MockTransport, Response
+from prometheus_client import REGISTRY
+
+from hmc_orchestrator.config import Config
+from hmc_orchestrator.metrics import endpoint_template, wire_size, write_textfile
+from hmc_orchestrator.session import HmcSession
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_endpoint_template() -> None:
+    url = "/rest/api/pcm/ManagedSystem/ms1/LogicalPartition/lp1/Metrics"
+    assert endpoint_template(url) == (
+        "/rest/api/pcm/ManagedSystem/{id}/LogicalPartition/{id}/Metrics"
+    )
+    assert (
+        endpoint_template("/rest/api/uom/LogicalPartition?managedSystemUuid=ms1")
+        == "/rest/api/uom/LogicalPartition"
+    )
+
+
+def test_session_metrics(tmp_path: Path) -> None:
+    calls = {"ms": 0}
+
+    async def handler(request):
+        if request.url.path != "/rest/api/uom/ManagedSystem":
+            return Response(200)
+        calls["ms"] += 1
+        if calls["ms"] == 1:
+            return Response(429)
+        return Response(200, json={"Items": []})
+
+    cfg = Config(
+        host="hmc",
+        username="user",
+        password=os.getenv("TEST_PASSWORD", "dummy"),
+        retries={"total": 2, "backoff_base": 0},
+    )
+    logins = _sample("hmc_orchestrator_logins_total")
+    retries = _sample(
+        "hmc_orchestrator_request_retries_total",
+        endpoint="/rest/api/uom/ManagedSystem",
+        reason="HmcRateLimited",
+    )
+
+    async def run() -> None:
+        session = HmcSession(cfg, transport=MockTransport(handler))
+        await session.request("GET", "/rest/api/uom/ManagedSystem")
+        await session.close()
+
+    asyncio.run(run())
+    assert _sample("hmc_orchestrator_logins_total") == logins + 1
+    assert (
+        _sample(
+            "hmc_orchestrator_request_retries_total",
+            endpoint="/rest/api/uom/ManagedSystem",
+            reason="HmcRateLimited",
+        )
+        == retries + 1
+    )
+    assert _sample("hmc_orchestrator_requests_in_flight") == 0
+
+    out = tmp_path / "metrics" / "hmc.prom"
+    write_textfile(out)
+    assert "hmc_orchestrator_request_seconds_bucket" in out.read_text()
+
+
+def test_wire_size_of_requests_response() -> None:
+    import io
+
+    import requests
+
+    resp = requests.Response()
+    resp.raw = io.BytesIO(b"x" * 40)
+    resp.raw.read()  # urllib3 tell(): compressed bytes consumed
+    resp._content = b"y" * 100
+    assert wire_size(resp) == 40
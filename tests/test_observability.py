@@ -0,0 +1,32 @@
+from hmc_orchestrator.metrics import endpoint_template, parse_buckets
+from hmc_power_orchestrator.observability import ENDPOINT_OVERFLOW, EndpointLabels
+
+
+def test_endpoint_template_known_routes() -> None:
+    assert endpoint_template("/api/lpars/LPAR1/resize") == "/api/lpars/{lpar}/resize"
+    assert endpoint_template("api/lpars/db01") == "/api/lpars/{lpar}"
+    assert endpoint_template("/api/lpars?page=3") == "/api/lpars"
+
+
+def test_endpoint_template_replaces_ids() -> None:
+    path = (
+        "/rest/api/pcm/ManagedSystem/2f5d2a5e-7c4b-4f3e-9a33-0c1d2e3f4a5b"
+        "/LogicalPartition/42/Metrics"
+    )
+    assert endpoint_template(path) == (
+        "/rest/api/pcm/ManagedSystem/{id}/LogicalPartition/{id}/Metrics"
+    )
+
+
+def test_endpoint_labels_are_bounded() -> None:
+    labels = EndpointLabels(limit=2)
+    assert labels("/api/lpars/a/resize") == "/api/lpars/{lpar}/resize"
+    assert labels("/api/lpars/b/resize") == "/api/lpars/{lpar}/resize"
+    assert labels("/api/lpars") == "/api/lpars"
+    assert labels("/api/frames") == ENDPOINT_OVERFLOW
+    assert labels("/api/lpars/c/resize") == "/api/lpars/{lpar}/resize"
+
+
+def testparse_buckets() -> None:
+    assert parse_buckets("5, 0.5,1") == (0.5, 1.0, 5.0)
+    assert parse_buckets(None)[0] == 0.05
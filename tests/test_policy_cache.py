@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+
+from hmc_orchestrator import policy_cache, policy_engine
+from hmc_orchestrator.exceptions import SchemaError
+from hmc_orchestrator.policy_engine import compile_policy, load_policy
+
+POLICY = """
+defaults:
+  min_cpu: 1.0
+  window: "09:00-17:00,Mon-Fri"
+rules:
+  - match:
+      lpar_names: ["LP1"]
+    targets:
+      cpu_util_high_pct: 80
+"""
+
+
+@pytest.fixture
+def policy_file(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "policy.yaml"
+    path.write_text(POLICY)
+    return path
+
+
+def _no_parse(source: bytes) -> dict:
+    raise AssertionError("policy source parsed despite a valid artifact")
+
+
+def test_cached_artifact_is_reused(policy_file: Path, tmp_path: Path, monkeypatch):
+    cache = tmp_path / "cache"
+    policy = load_policy(str(policy_file), cache_dir=cache)
+    assert len(list(cache.glob("*.pol"))) == 1
+    monkeypatch.setattr(policy_engine, "_compile", _no_parse)
+    assert load_policy(str(policy_file), cache_dir=cache) == policy
+
+
+def test_content_change_recompiles(policy_file: Path, tmp_path: Path):
+    cache = tmp_path / "cache"
+    load_policy(str(policy_file), cache_dir=cache)
+    policy_file.write_text(POLICY.replace("80", "90"))
+    policy = load_policy(str(policy_file), cache_dir=cache)
+    assert policy["rules"][0]["targets"]["cpu_util_high_pct"] == 90
+    assert len(list(cache.glob("*.pol"))) == 2
+
+
+def test_tampered_artifact_is_rejected(policy_file: Path, tmp_path: Path):
+    cache = tmp_path / "cache"
+    artifact = compile_policy(str(policy_file), cache_dir=cache)
+    artifact.write_bytes(artifact.read_bytes().replace(b"80", b"99"))
+    policy = load_policy(str(policy_file), cache_dir=cache)
+    assert policy["rules"][0]["targets"]["cpu_util_high_pct"] == 80
+
+
+def test_stale_schema_is_rejected(policy_file: Path, tmp_path: Path, monkeypatch):
+    cache = tmp_path / "cache"
+    load_policy(str(policy_file), cache_dir=cache)
+    monkeypatch.setattr(policy_cache, "schema_digest", lambda: "0" * 64)
+    compiled = []
+    original = policy_engine._compile
+    monkeypatch.setattr(
+        policy_engine, "_compile", lambda src: compiled.append(1) or original(src)
+    )
+    load_policy(str(policy_file), cache_dir=cache)
+    assert compiled == [1]
+
+
+def test_schema_violation(policy_file: Path, tmp_path: Path):
+    policy_file.write_text(POLICY.replace("min_cpu:", "min_cpus:"))
+    with pytest.raises(SchemaError, match="defaults"):
+        load_policy(str(policy_file), cache_dir=tmp_path / "cache")
+
+
+def test_policy_without_json_form_is_not_cached(policy_file: Path, tmp_path: Path):
+    # An unquoted YAML date key loads as datetime.date, which JSON cannot encode.
+    labels = '      labels: {2024-01-01: release}\n'
+    policy_file.write_text(POLICY.replace('["LP1"]\n', '["LP1"]\n' + labels))
+    cache = tmp_path / "cache"
+    policy = load_policy(str(policy_file), cache_dir=cache)
+    assert list(policy["rules"][0]["match"]["labels"].values()) == ["release"]
+    assert not list(cache.glob("*.pol"))
+    with pytest.raises(ValueError, match="cannot be cached"):
+        compile_policy(str(policy_file), cache_dir=cache)
@@ -3,7 +3,7 @@ from typing import Any, Dict
 from unittest import TestCase
 
 from hmc_orchestrator.hmc_api import LogicalPartition
-from hmc_orchestrator.policy_engine import evaluate
+from hmc_orchestrator.policy_engine import evaluate, evaluate_sharded
 
 POLICY: Dict[str, Any] = {
     "defaults": {
@@ -145,3 +145,42 @@ def test_multiple_gating_reasons() -> None:
     tc.assertIn("Cooldown active", dec.reasons)
     tc.assertIn("Window closed", dec.reasons)
     tc.assertEqual(dec.delta["cpu_ent"], 0)
+
+
+def test_rule_index_keeps_first_match() -> None:
+    policy: Dict[str, Any] = {
+        "defaults": POLICY["defaults"],
+        "rules": [
+            {"match": {"lpar_uuids": ["u2"]}, "targets": {"cpu_util_high_pct": 50}},
+            {"match": {"lpar_names": ["LP2"]}, "targets": {"cpu_util_high_pct": 95}},
+        ],
+    }
+    lp = LogicalPartition("u2", "LP2", "Running", 1.0, 1024)
+    dec = evaluate(policy, [lp], {"u2": {"cpu_util_pct": 60.0}})[0]
+    TestCase().assertEqual(dec.delta["cpu_ent"], 1.0)
+
+
+def test_sharded_matches_serial() -> None:
+    lpars = [
+        LogicalPartition(
+            f"u{i}", f"LP{i}", "Running", 1.0 + i % 3, 1024, frame_uuid=f"f{i % 3}"
+        )
+        for i in range(60)
+    ]
+    policy: Dict[str, Any] = {
+        "defaults": POLICY["defaults"],
+        "rules": [
+            {
+                "match": {"lpar_names": [f"LP{i}" for i in range(0, 60, 2)]},
+                "targets": {"cpu_util_high_pct": 80, "cpu_util_low_pct": 20},
+            }
+        ],
+    }
+    metrics = {
+        lp.uuid: {"cpu_util_pct": float(i * 7 % 100)} for i, lp in enumerate(lpars)
+    }
+    now = datetime(2024, 1, 1, 12, 0)
+    serial = evaluate(policy, lpars, metrics, now=now)
+    sharded = evaluate_sharded(policy, lpars, metrics, now=now, workers=2, min_lpars=0)
+    TestCase().assertEqual(sharded, serial)
+    TestCase().assertEqual(len(serial), 30)
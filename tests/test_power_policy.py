@@ -0,0 +1,85 @@
+import io
+import json
+from pathlib import Path
+from unittest import TestCase
+
+import httpx
+import pytest
+from typer.testing import CliRunner
+
+from hmc_power_orchestrator import cli
+from hmc_power_orchestrator.policy import PolicyError, load_policy, stream_targets
+
+
+def _policy(n: int) -> str:
+    targets = [{"lpar": f"L{i}", "cpu": i, "mem": 1024 * i} for i in range(n)]
+    return json.dumps({"policy_version": 1, "targets": targets}, indent=2)
+
+
+def test_stream_matches_whole_document_parse():
+    tc = TestCase()
+    text = Path("examples/example-policy.json").read_text()
+    trailing = '{"targets": [ {"cpu": 12345, "mem": 7, "lpar": "x"} ] ,\n'
+    trailing += ' "comment": {"nested": [1, 2]}, "policy_version": 1 }\n'
+    for doc in (text, _policy(50), trailing):
+        for chunk_size in (1, 7, 4096):
+            streamed = list(stream_targets(io.StringIO(doc), chunk_size))
+            tc.assertEqual(streamed, load_policy(doc).targets)
+
+
+def test_stream_is_lazy_and_reports_errors():
+    # Targets are yielded before a later malformed entry has been read.
+    stream = stream_targets(io.StringIO(_policy(3)[:-30]), chunk_size=16)
+    assert next(stream).lpar == "L0"
+    with pytest.raises(PolicyError, match="invalid JSON"):
+        list(stream)
+    bad = _policy(3).replace('"cpu": 1,', '"cpu": "one",')
+    with pytest.raises(PolicyError, match=r"targets\[1\]"):
+        list(stream_targets(io.StringIO(bad)))
+    with pytest.raises(PolicyError, match="policy_version"):
+        next(stream_targets(io.StringIO(_policy(1).replace(": 1,", ": 2,", 1))))
+    with pytest.raises(PolicyError, match="no targets"):
+        list(stream_targets(io.StringIO('{"policy_version": 1}')))
+
+
+def test_plan_writes_preview_incrementally(tmp_path: Path):
+    policy = tmp_path / "policy.json"
+    policy.write_text(_policy(4))
+    out = tmp_path / "run"
+    args = ["plan", str(policy), "--run-id", "r1", "--output", str(out)]
+    result = CliRunner().invoke(cli.app, args)
+    assert result.exit_code == 0, result.output
+    preview = [t.model_dump() for t in load_policy(_policy(4)).targets]
+    assert (out / "plan-r1.json").read_text() == json.dumps(preview, indent=2)
+
+    policy.write_text(_policy(4).replace('"mem": 3072', '"mem": null'))
+    result = CliRunner().invoke(cli.app, args[:2] + ["--run-id", "r2"] + args[4:])
+    assert result.exit_code == 1
+    assert "targets[3]" in result.output
+    assert sorted(p.name for p in out.iterdir()) == ["plan-r1.json"]
+
+
+def test_apply_actuates_while_reading(power_cli):
+    resized = []
+
+    def handler(request):
+        resized.append(request.url.path.split("/")[3])
+        return httpx.Response(202, json={})
+
+    # The third target is invalid: the first two are applied regardless.
+    policy = _policy(3).replace('"lpar": "L2"', '"lpar": 2')
+    result = power_cli(handler, policy, "apply", "--apply", "--confirm")
+    assert result.exit_code == 1
+    assert resized == ["L0", "L1"]
+    assert "<policy>: targets[2]" in result.output
+    assert "2 succeeded, 1 failed" in result.output
+
+
+def test_inventory_bandwidth_summary(power_cli):
+    def handler(request):
+        return httpx.Response(200, json={"items": [{"lpar": "L0", "cpu": 1}]})
+
+    result = power_cli(handler, None, "--bandwidth", "inventory")
+    assert result.exit_code == 0, result.output
+    assert "wire KiB" in result.stderr
+    assert "/api/lpars" in result.stderr
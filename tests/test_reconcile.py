@@ -0,0 +1,57 @@
+import httpx
+
+from hmc_power_orchestrator.policy import Target
+from hmc_power_orchestrator.reconcile import RESIZE, SKIP, UNKNOWN, Reconciler
+
+INVENTORY = [
+    {"uuid": "u0", "name": "L0", "cpu": 2, "mem": 2048},
+    {"uuid": "u1", "name": "L1", "cpu": 2.0, "mem": 4096},
+    {"uuid": "u2", "name": "L2", "cpu": 4, "mem": 8192},
+]
+
+
+def test_reconciler_classifies_targets():
+    reconciler = Reconciler(INVENTORY)
+    targets = [
+        Target(lpar="L0", cpu=2, mem=2048),
+        Target(lpar="u1", cpu=2, mem=4096),
+        Target(lpar="L2", cpu=4, mem=4096),
+        Target(lpar="L9", cpu=1, mem=1024),
+    ]
+    assert [reconciler.action(t) for t in targets] == [SKIP, SKIP, RESIZE, UNKNOWN]
+    assert reconciler.counts == {RESIZE: 1, SKIP: 2, UNKNOWN: 1}
+
+
+def test_apply_reconcile_submits_only_changes(power_cli):
+    calls = []
+
+    def handler(request):
+        calls.append(f"{request.method} {request.url.path}")
+        if request.url.path == "/api/lpars":
+            page = request.url.params.get("page", "1")
+            if page == "1":
+                return httpx.Response(
+                    200, json={"items": INVENTORY[:2], "next": "/api/lpars?page=2"}
+                )
+            return httpx.Response(200, json={"items": INVENTORY[2:]})
+        return httpx.Response(202, json={})
+
+    targets = [{"lpar": i["name"], "cpu": 2, "mem": i["mem"]} for i in INVENTORY]
+
+    result = power_cli(handler, targets, "plan", "--reconcile")
+    assert result.exit_code == 0, result.output
+    assert [line.split()[-1] for line in result.output.splitlines()[2:]] == [
+        "skip",
+        "skip",
+        "resize",
+    ]
+    assert all(c.startswith("GET") for c in calls)
+
+    calls.clear()
+    result = power_cli(
+        handler, targets, "apply", "--reconcile", "--apply", "--confirm"
+    )
+    assert result.exit_code == 0, result.output
+    assert "1 succeeded, 0 failed, 2 unchanged" in result.output
+    assert calls[-1] == "POST /api/lpars/L2/resize"
+    assert sum(c.startswith("POST") for c in calls) == 1
@@ -0,0 +1,233 @@
+import asyncio
+import os
+import time
+from unittest import TestCase
+
+import httpx
+import pytest
+
+from hmc_orchestrator import resilience
+from hmc_orchestrator.config import Config
+from hmc_orchestrator.exceptions import DeadlineExceeded
+from hmc_orchestrator.resilience import Deadline, RetryBudget
+from hmc_orchestrator.session import HmcSession
+from hmc_power_orchestrator import exceptions as power_exc
+from hmc_power_orchestrator.hmc_client import HMCClient, RetryConfig
+
+
+def _cfg(**retries) -> Config:
+    return Config(
+        host="hmc",
+        username="user",
+        password=os.getenv("TEST_PASSWORD", "dummy"),
+        retries={"total": 4, "backoff_base": 0, "max_backoff": 0, **retries},
+    )
+
+
+def _unavailable(calls):
+    async def handler(request):
+        if not request.url.path.startswith("/rest/api/uom"):
+            return httpx.Response(200)  # logon and connection warm-up
+        calls.append(request.url.path)
+        return httpx.Response(503)
+
+    return httpx.MockTransport(handler)
+
+
+def test_deadline_and_budget_primitives():
+    tc = TestCase()
+    with resilience.deadline(10) as outer:
+        with resilience.deadline(60) as inner:
+            tc.assertIs(inner, outer)
+        with resilience.deadline(1) as shorter:
+            tc.assertLess(shorter.expires, outer.expires)
+        tc.assertIs(resilience.current_deadline(), outer)
+    tc.assertIsNone(resilience.current_deadline())
+    tc.assertIsNone(Deadline.after(None).timeout())
+    tc.assertEqual(Deadline.after(None).timeout(5.0), 5.0)
+    tc.assertFalse(Deadline.after(1).allows(2))
+
+    budget = RetryBudget(ratio=0.5, reserve=2)
+    for _ in range(4):
+        budget.request()
+    tc.assertEqual([budget.try_retry() for _ in range(3)], [True, True, False])
+    budget.request()
+    budget.request()
+    tc.assertTrue(budget.try_retry())
+    tc.assertEqual(budget.denied, 1)
+    tc.assertAlmostEqual(budget.amplification, 9 / 6)
+
+
+def test_session_retry_budget_caps_amplification():
+    calls = []
+    cfg = _cfg(budget_ratio=0.1, budget_reserve=3)
+
+    async def run() -> int:
+        session = HmcSession(cfg, transport=_unavailable(calls))
+        failures = 0
+        for _ in range(10):
+            try:
+                await session.request("GET", "/rest/api/uom/ManagedSystem")
+            except httpx.HTTPStatusError:
+                failures += 1
+        await session.close()
+        return failures
+
+    assert asyncio.run(run()) == 10
+    # Without a budget: 10 calls x 4 attempts. The first call spends the
+    # reserve of 3; 10% per request never refills a whole retry.
+    assert len(calls) == 10 + 3
+
+
+def test_session_budget_shared_through_context():
+    calls = []
+    shared = RetryBudget(ratio=0, reserve=1)
+
+    async def run() -> None:
+        sessions = [
+            HmcSession(_cfg(), transport=_unavailable(calls)) for _ in range(2)
+        ]
+        with resilience.retry_budget(shared):
+            for session in sessions:
+                with pytest.raises(httpx.HTTPStatusError):
+                    await session.request("GET", "/rest/api/uom/ManagedSystem")
+        for session in sessions:
+            await session.close()
+
+    asyncio.run(run())
+    assert len(calls) == 3
+    assert shared.retries == 1
+
+
+def test_session_fails_fast_when_backoff_exceeds_deadline():
+    calls = []
+    cfg = _cfg(backoff_base=30, max_backoff=30, deadline=5)
+
+    async def run() -> None:
+        session = HmcSession(cfg, transport=_unavailable(calls))
+        try:
+            await session.request("GET", "/rest/api/uom/ManagedSystem")
+        finally:
+            await session.close()
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run())
+    assert time.monotonic() - started < 1
+    assert len(calls) == 1
+
+
+def test_client_honours_ambient_deadline():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(429, headers={"Retry-After": "2"})
+
+    client = HMCClient(
+        "https://hmc",
+        retry=RetryConfig(attempts=5, deadline=None),
+        transport=httpx.MockTransport(handler),
+    )
+    client._sleep = lambda seconds: None  # type: ignore[method-assign]
+    with resilience.deadline(1):
+        with pytest.raises(power_exc.DeadlineExceeded):
+            client.get("/api/lpars")
+    assert len(calls) == 1
+    # Without a deadline the Retry-After delays are affordable.
+    with pytest.raises(power_exc.TransientError):
+        client.get("/api/lpars")
+    assert len(calls) == 6
+    client.close()
+
+
+def _stalls_first_get(state, stall: float):
+    async def handler(request):
+        if not request.url.path.startswith("/rest/api/uom"):
+            return httpx.Response(200)
+        state["gets"] += 1
+        if state["gets"] == 1:
+            try:
+                await asyncio.sleep(stall)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+        return httpx.Response(200, json={"Items": []})
+
+    return httpx.MockTransport(handler)
+
+
+def test_session_hedges_slow_get():
+    state = {"gets": 0, "cancelled": False}
+    cfg = _cfg()
+    cfg.hedging.enabled = True
+    cfg.hedging.initial_delay = 0.05
+
+    async def run() -> float:
+        session = HmcSession(cfg, transport=_stalls_first_get(state, 5))
+        started = time.monotonic()
+        resp = await session.request("GET", "/rest/api/uom/ManagedSystem")
+        elapsed = time.monotonic() - started
+        assert resp.status_code == 200
+        await session.close()
+        return elapsed
+
+    assert asyncio.run(run()) < 1
+    assert state == {"gets": 2, "cancelled": True}
+
+
+def test_session_hedging_respects_budget():
+    state = {"gets": 0, "cancelled": False}
+    cfg = _cfg()
+    cfg.hedging.enabled = True
+    cfg.hedging.initial_delay = 0.01
+    cfg.hedging.budget_reserve = 0
+
+    async def run() -> None:
+        session = HmcSession(cfg, transport=_stalls_first_get(state, 0.2))
+        await session.request("GET", "/rest/api/uom/ManagedSystem")
+        await session.close()
+
+    asyncio.run(run())
+    assert state == {"gets": 1, "cancelled": False}
+
+
+def test_client_hedges_slow_get():
+    import threading
+
+    from hmc_power_orchestrator.hmc_client import HedgeConfig
+
+    lock = threading.Lock()
+    calls = []
+
+    def handler(request):
+        with lock:
+            calls.append(request.url.path)
+            first = len(calls) == 1
+        if first:
+            time.sleep(1)
+        return httpx.Response(200, json={"items": []})
+
+    client = HMCClient(
+        "https://hmc",
+        hedge=HedgeConfig(initial_delay=0.05),
+        transport=httpx.MockTransport(handler),
+    )
+    started = time.monotonic()
+    client.get("/api/lpars")
+    assert len(calls) == 2
+    # Closing does not wait for the stalled losing request either.
+    client.close()
+    assert time.monotonic() - started < 0.5
+
+
+def test_sync_clients_cap_backoff_and_retry_after():
+    from hmc_power_orchestrator.http import HTTPClient
+
+    http = HTTPClient("https://hmc", backoff_factor=1, max_backoff=5)
+    assert http._backoff(10, None) == 5
+    assert http._backoff(0, "3600") == 5
+    assert http._backoff(0, "-1") == 0
+    client = HMCClient("https://hmc", retry=RetryConfig(max_backoff=5))
+    assert client._backoff(0, "3600") == 5
+    client.close()
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import httpx
+
+from hmc_power_orchestrator.policy import Target
+from hmc_power_orchestrator.reconcile import SCALE_DOWN, SCALE_UP
+from hmc_power_orchestrator.scheduler import Scheduler
+
+
+def _t(lpar: str, frame: str, priority: int = 0) -> Target:
+    return Target(lpar=lpar, frame=frame, cpu=1, mem=1024, priority=priority)
+
+
+def test_dispatch_order_priority_direction_and_frame_fairness():
+    targets = [
+        _t("a-down1", "A"),
+        _t("a-down2", "A"),
+        _t("a-up", "A"),
+        _t("b-down", "B"),
+        _t("c-down", "C"),
+        _t("b-urgent", "B", priority=5),
+    ]
+    direction = {"a-up": SCALE_UP}
+    scheduler = Scheduler(
+        workers=1, direction=lambda t: direction.get(t.lpar, SCALE_DOWN)
+    )
+    order = list(scheduler.execute(targets, lambda t: t.lpar))
+    # Explicit priority, then scale-ups, then frames in turn for equal rank.
+    assert order == ["b-urgent", "a-up", "c-down", "b-down", "a-down1", "a-down2"]
+
+
+def test_screen_and_frame_concurrency_limit():
+    lock = threading.Lock()
+    running: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    def run(target: Target) -> str:
+        with lock:
+            running[target.frame] = running.get(target.frame, 0) + 1
+            peak[target.frame] = max(peak.get(target.frame, 0), running[target.frame])
+        time.sleep(0.01)
+        with lock:
+            running[target.frame] -= 1
+        return target.lpar
+
+    targets = [_t(f"{f}{i}", f) for i in range(6) for f in "AB"]
+    scheduler = Scheduler(workers=4, frame_concurrency=2, window=3)
+    done = list(
+        scheduler.execute(targets, run, lambda t: "skip" if t.lpar == "A0" else None)
+    )
+    assert done[0] == "skip"
+    assert sorted(done[1:]) == sorted(t.lpar for t in targets[1:])
+    assert peak == {"A": 2, "B": 2}
+
+
+def test_frameless_targets_use_all_workers():
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0}
+
+    def run(target: Target) -> str:
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return target.lpar
+
+    targets = [Target(lpar=f"L{i}", cpu=1, mem=1024) for i in range(12)]
+    done = list(Scheduler(workers=4).execute(targets, run))
+    assert sorted(done) == sorted(t.lpar for t in targets)
+    assert state["peak"] == 4
+
+
+def test_apply_schedule_relieves_scale_ups_first(power_cli):
+    resized = []
+    inventory = [
+        {"name": f"L{i}", "cpu": 4, "mem": 4096, "frame": f"F{i % 2}"}
+        for i in range(8)
+    ]
+
+    def handler(request):
+        if request.url.path == "/api/lpars":
+            return httpx.Response(200, json={"items": inventory})
+        resized.append(request.url.path.split("/")[3])
+        return httpx.Response(202, json={})
+
+    targets = [
+        {"lpar": f"L{i}", "frame": f"F{i % 2}", "cpu": 2, "mem": 4096}
+        for i in range(6)
+    ]
+    targets.append({"lpar": "L6", "frame": "F0", "cpu": 8, "mem": 4096})
+    targets.append({"lpar": "L7", "frame": "F1", "cpu": 4, "mem": 8192})
+    args = ["--apply", "--confirm", "--schedule", "--workers", "1"]
+    result = power_cli(handler, targets, "apply", *args)
+    assert result.exit_code == 0, result.output
+    assert resized[:2] == ["L6", "L7"]
+    assert sorted(resized) == [f"L{i}" for i in range(8)]
@@ -40,3 +40,94 @@ def test_session_relogin():
         await session.close()
 
     asyncio.run(run())
+
+
+def test_pool_is_prewarmed_and_reused():
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from hmc_orchestrator.metrics import CONNECTIONS_OPENED
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, body: bytes = b"") -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            self._reply()
+
+        def do_POST(self):
+            self._reply()
+
+        def do_GET(self):
+            self._reply(b'{"Items": []}')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cfg = Config(
+        host="pool-test",
+        username="user",
+        password=os.getenv("TEST_PASSWORD", "dummy"),
+        concurrency={"per_frame": 3},
+    )
+
+    def opened() -> float:
+        return CONNECTIONS_OPENED.labels(hmc="pool-test")._value.get()
+
+    async def run():
+        session = HmcSession(cfg)
+        session.client.base_url = f"http://127.0.0.1:{server.server_port}"
+        before = opened()
+        await session.login()
+        warmed = opened() - before
+        stats = session.pool_stats()
+        await asyncio.gather(
+            *(session.request("GET", "/rest/api/uom/ManagedSystem") for _ in range(9))
+        )
+        reused = opened() - before == warmed
+        await session.close()
+        return warmed, stats, reused
+
+    try:
+        warmed, stats, reused = asyncio.run(run())
+    finally:
+        server.shutdown()
+    tc = TestCase()
+    tc.assertEqual(warmed, 3)
+    tc.assertEqual(stats, {"connections": 3, "idle": 3, "active": 0})
+    tc.assertTrue(reused)
+
+
+def test_injected_transport_is_not_prewarmed():
+    methods = []
+
+    async def handler(request):
+        methods.append(request.method)
+        return Response(200, json={"Items": []})
+
+    cfg = Config(
+        host="hmc",
+        username="user",
+        password=os.getenv("TEST_PASSWORD", "dummy"),
+        concurrency={"per_frame": 4},
+    )
+
+    async def run():
+        session = HmcSession(cfg, transport=MockTransport(handler))
+        await session.request("GET", "/rest/api/uom/ManagedSystem")
+        stats = session.pool_stats()
+        await session.close()
+        return stats
+
+    assert asyncio.run(run()) == {}
+    assert methods == ["POST", "GET"]
@@ -0,0 +1,189 @@
+import asyncio
+import os
+
+from hmc_orchestrator.config import Config, Http
+from hmc_orchestrator.hmc_api import HmcApi
+from hmc_orchestrator.session import HmcSession
+from hmc_orchestrator.simulator import (
+    AsyncSimulatorTransport,
+    HmcSimulator,
+    SimulatorConfig,
+    SimulatorTransport,
+)
+from hmc_power_orchestrator.hmc_client import HMCClient, RetryConfig
+
+
+def _cfg() -> Config:
+    return Config(
+        host="hmc",
+        username="user",
+        password=os.getenv("TEST_PASSWORD", "dummy"),
+        retries={"total": 5, "backoff_base": 0, "max_backoff": 0},
+    )
+
+
+def test_session_against_simulator_relogs_on_expiry() -> None:
+    sim = HmcSimulator(
+        SimulatorConfig(frames=3, lpars_per_frame=4, session_max_requests=2)
+    )
+
+    async def run() -> int:
+        sess = HmcSession(_cfg(), transport=AsyncSimulatorTransport(sim))
+        api = HmcApi(sess)
+        count = 0
+        for ms in await api.list_managed_systems():
+            count += len(await api.list_lpars(ms.uuid))
+        await sess.logout()
+        await sess.close()
+        return count
+
+    assert asyncio.run(run()) == 12
+    assert sim.counters["logons"] >= 2
+    assert sim.counters["sessions_expired"] >= 1
+
+
+def test_session_retries_injected_errors() -> None:
+    sim = HmcSimulator(SimulatorConfig(error_rate=0.3, rate_limit_rate=0.2, seed=3))
+
+    async def run() -> int:
+        sess = HmcSession(_cfg(), transport=AsyncSimulatorTransport(sim))
+        systems = await HmcApi(sess).list_managed_systems()
+        await sess.close()
+        return len(systems)
+
+    assert asyncio.run(run()) == 2
+
+
+def test_client_pagination_and_resize() -> None:
+    sim = HmcSimulator(SimulatorConfig(frames=2, lpars_per_frame=5, page_size=3))
+    client = HMCClient(
+        "https://hmc",
+        retry=RetryConfig(backoff_factor=0),
+        transport=SimulatorTransport(sim),
+    )
+    items = list(client.iter_collection("/api/lpars"))
+    assert len(items) == 10
+    name = items[0]["name"]
+    resp = client.post(f"/api/lpars/{name}/resize", json={"cpu": 7, "mem": 2048})
+    assert resp.status_code == 202
+    job = client.get(f"/api/jobs/{resp.json()['job']}").json()
+    assert job["status"] == "COMPLETED"
+    assert next(client.iter_collection("/api/lpars"))["cpu"] == 7
+    client.close()
+
+
+def test_selective_lpar_queries() -> None:
+    paths = []
+    sizes = {}
+
+    class Recording(AsyncSimulatorTransport):
+        async def handle_async_request(self, request):
+            response = await super().handle_async_request(request)
+            paths.append(request.url.path)
+            sizes[request.url.path] = sizes.get(request.url.path, 0) + len(
+                response.content
+            )
+            return response
+
+    async def run(quick: bool):
+        paths.clear()
+        sizes.clear()
+        sim = HmcSimulator(SimulatorConfig(frames=2, quick_properties=quick))
+        sess = HmcSession(_cfg(), transport=Recording(sim))
+        api = HmcApi(sess)
+        systems = await api.list_managed_systems()
+        full = await api.list_lpars(systems[0].uuid)
+        selective = [
+            await api.list_lpars(ms.uuid, fields=("name", "memory_mb"))
+            for ms in systems
+        ]
+        await sess.close()
+        return api, full, selective
+
+    api, full, selective = asyncio.run(run(quick=True))
+    assert api.quick_supported is True
+    assert selective[0] == full
+    full_bytes = sizes["/rest/api/uom/LogicalPartition"]
+    quick_bytes = sum(size for path, size in sizes.items() if "quick" in path)
+    assert quick_bytes * 10 < full_bytes * 2
+
+    api, full, selective = asyncio.run(run(quick=False))
+    assert api.quick_supported is False
+    assert selective[0] == full
+    # Only the first frame probes the quick feed before falling back.
+    assert sum("quick" in path for path in paths) == 1
+
+
+def test_quick_feed_rejected_with_501_falls_back() -> None:
+    async def run():
+        sim = HmcSimulator(
+            SimulatorConfig(
+                frames=2, quick_properties=False, quick_unsupported_status=501
+            )
+        )
+        sess = HmcSession(_cfg(), transport=AsyncSimulatorTransport(sim))
+        api = HmcApi(sess)
+        systems = await api.list_managed_systems()
+        lpars = [
+            await api.list_lpars(ms.uuid, fields=("name", "memory_mb"))
+            for ms in systems
+        ]
+        await sess.close()
+        return api, lpars
+
+    api, lpars = asyncio.run(run())
+    assert api.quick_supported is False
+    assert [len(frame) for frame in lpars] == [10, 10]
+
+
+def test_quick_feed_probe_is_single_and_not_retried() -> None:
+    paths = []
+
+    class Recording(AsyncSimulatorTransport):
+        async def handle_async_request(self, request):
+            paths.append(request.url.path)
+            return await super().handle_async_request(request)
+
+    async def run():
+        sim = HmcSimulator(
+            SimulatorConfig(
+                frames=4, quick_properties=False, quick_unsupported_status=501
+            )
+        )
+        sess = HmcSession(_cfg(), transport=Recording(sim))
+        api = HmcApi(sess)
+        systems = await api.list_managed_systems()
+        lpars = await asyncio.gather(
+            *(api.list_lpars(ms.uuid, fields=("name",)) for ms in systems)
+        )
+        await sess.close()
+        return sess, lpars
+
+    sess, lpars = asyncio.run(run())
+    assert [len(frame) for frame in lpars] == [10] * 4
+    # Concurrent frames share one probe, and its 501 is not retried.
+    assert sum("quick" in path for path in paths) == 1
+    assert sess.budget.retries == 0
+
+
+def test_compression_negotiated_end_to_end() -> None:
+    from hmc_orchestrator.metrics import TRAFFIC
+
+    async def run(compression: bool):
+        TRAFFIC.reset()
+        sim = HmcSimulator(SimulatorConfig(frames=1, lpars_per_frame=50))
+        cfg = _cfg().model_copy(update={"http": Http(compression=compression)})
+        sess = HmcSession(cfg, transport=AsyncSimulatorTransport(sim))
+        api = HmcApi(sess)
+        systems = await api.list_managed_systems()
+        lpars = await api.list_lpars(systems[0].uuid)
+        await sess.close()
+        return len(lpars), TRAFFIC.endpoints["/rest/api/uom/LogicalPartition"]
+
+    count, traffic = asyncio.run(run(compression=True))
+    assert count == 50
+    assert traffic.wire * 5 < traffic.decoded
+    assert traffic.decode_seconds > 0
+    count, traffic = asyncio.run(run(compression=False))
+    assert count == 50
+    assert traffic.wire == traffic.decoded
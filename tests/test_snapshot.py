@@ -0,0 +1,133 @@
+import json
+from pathlib import Path
+from unittest import TestCase
+
+import pytest
+
+from hmc_orchestrator.exceptions import SnapshotError
+from hmc_orchestrator.snapshot import Snapshot, diff_snapshots, write_snapshot
+
+
+def _inventory():
+    return [
+        {
+            "uuid": "f1",
+            "name": "Frame1",
+            "hmc": "hmc1",
+            "lpars": [
+                {
+                    "uuid": f"u{i:03d}",
+                    "name": f"LP{i}",
+                    "state": "running",
+                    "cpu_entitlement": 0.5 * i,
+                    "memory_mb": 1024 * i,
+                }
+                for i in (7, 3, 5)
+            ],
+        },
+        {
+            "uuid": "f2",
+            "name": "Frame2",
+            "hmc": "hmc2",
+            "lpars": [
+                {
+                    "uuid": "u001",
+                    "name": "LPÄ",
+                    "state": "not activated",
+                    "cpu_entitlement": 1.0,
+                    "memory_mb": 2048,
+                }
+            ],
+        },
+    ]
+
+
+def test_roundtrip_sorted_by_uuid(tmp_path: Path) -> None:
+    path = write_snapshot(tmp_path / "inv.snap", _inventory(), created=1.5)
+    tc = TestCase()
+    with Snapshot(path) as snap:
+        tc.assertEqual(len(snap), 4)
+        tc.assertEqual(snap.created, 1.5)
+        tc.assertEqual([r["uuid"] for r in snap], ["u001", "u003", "u005", "u007"])
+        tc.assertEqual(list(snap.column("memory_mb")), [2048, 3072, 5120, 7168])
+        restored = snap.to_json()
+    expected = _inventory()
+    expected[0]["lpars"].sort(key=lambda lp: lp["uuid"])
+    tc.assertEqual(restored, json.loads(json.dumps(expected)))
+
+
+def test_find(tmp_path: Path) -> None:
+    path = write_snapshot(tmp_path / "inv.snap", _inventory())
+    tc = TestCase()
+    with Snapshot(path) as snap:
+        row = snap.find("u005")
+        tc.assertEqual(row, 2)
+        tc.assertEqual(snap.lpar(row)["frame_uuid"], "f1")
+        tc.assertIsNone(snap.find("u004"))
+        tc.assertIsNone(snap.find("zzz"))
+
+
+def test_rejects_foreign_and_truncated_files(tmp_path: Path) -> None:
+    bogus = tmp_path / "bogus.snap"
+    bogus.write_bytes(b"")
+    with pytest.raises(SnapshotError):
+        Snapshot(bogus)
+    path = write_snapshot(tmp_path / "inv.snap", _inventory())
+    bogus.write_bytes(path.read_bytes()[:-16])
+    with pytest.raises(SnapshotError):
+        Snapshot(bogus)
+
+
+def test_incomplete_frames_are_not_archived(tmp_path: Path) -> None:
+    inventory = _inventory()
+    inventory[1].update(incomplete=True, lpars=[])
+    with pytest.raises(SnapshotError, match="Frame2"):
+        write_snapshot(tmp_path / "inv.snap", inventory)
+    assert not list(tmp_path.iterdir())
+
+
+def test_diff(tmp_path: Path) -> None:
+    before = write_snapshot(tmp_path / "a.snap", _inventory())
+    inventory = _inventory()
+    lpars = inventory[0]["lpars"]
+    lpars[0]["state"] = "not activated"  # u007
+    lpars[1]["memory_mb"] = 4096  # u003
+    del lpars[2]  # u005
+    lpars.append(dict(lpars[0], uuid="u009", name="LP9"))
+    inventory[1]["lpars"][0]["cpu_entitlement"] = 1.0  # u001 unchanged
+    after = write_snapshot(tmp_path / "b.snap", inventory)
+    with Snapshot(before) as old, Snapshot(after) as new:
+        changes = list(diff_snapshots(old, new))
+    tc = TestCase()
+    tc.assertEqual(
+        [(c["op"], c["uuid"]) for c in changes],
+        [
+            ("changed", "u003"),
+            ("removed", "u005"),
+            ("changed", "u007"),
+            ("added", "u009"),
+        ],
+    )
+    tc.assertEqual(changes[0]["changes"], {"memory_mb": [3072, 4096]})
+    tc.assertEqual(changes[2]["changes"], {"state": ["running", "not activated"]})
+    tc.assertEqual(changes[3]["lpar"]["frame_uuid"], "f1")
+
+
+def test_diff_cli_writes_ndjson(tmp_path: Path) -> None:
+    from typer.testing import CliRunner
+
+    from hmc_orchestrator.cli import app
+
+    before = write_snapshot(tmp_path / "a.snap", _inventory())
+    inventory = _inventory()
+    inventory[1]["lpars"].clear()
+    after = write_snapshot(tmp_path / "b.snap", inventory)
+    out = tmp_path / "changes.ndjson"
+    result = CliRunner().invoke(
+        app, ["snapshot", "diff", str(before), str(after), "-o", str(out)]
+    )
+    tc = TestCase()
+    tc.assertEqual(result.exit_code, 0)
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    tc.assertEqual(lines, [{"op": "removed", "uuid": "u001", "lpar": lines[0]["lpar"]}])
+    tc.assertIn("removed=1", result.stderr)
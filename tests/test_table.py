@@ -0,0 +1,59 @@
+import io
+
+from hmc_power_orchestrator import table
+
+
+def test_plain_table_is_aligned_and_streams_iterators():
+    rows = ({"name": f"lpar{i}", "cpu": i / 2, "mem": None} for i in range(3))
+    out = io.StringIO()
+    assert table.render_plain(rows, out=out) == 3
+    assert out.getvalue().splitlines() == [
+        "name   cpu  mem",
+        "-----  ---  ----",
+        "lpar0  0.0  None",
+        "lpar1  0.5  None",
+        "lpar2  1.0  None",
+    ]
+
+
+def test_plain_table_tolerates_missing_keys_and_wide_tail(monkeypatch):
+    monkeypatch.setattr(table, "WIDTH_SAMPLE", 1)
+    rows = [{"a": "x", "b": "y"}, {"a": "much-wider"}]
+    out = io.StringIO()
+    table.render_plain(rows, out=out)
+    assert out.getvalue().splitlines()[2:] == ["x  y", "much-wider  "]
+
+
+def test_print_table_switches_renderer(monkeypatch):
+    used = []
+    monkeypatch.setattr(
+        table, "render_rich", lambda rows: used.append(("rich", len(rows)))
+    )
+    monkeypatch.setattr(
+        table, "render_plain", lambda rows: used.append(("plain", len(list(rows))))
+    )
+    monkeypatch.setattr(table, "_interactive", lambda: True)
+    big = table.RICH_MAX_ROWS + 1
+    table.print_table([{"a": 1}])
+    table.print_table(iter([{"a": 1}] * 3))
+    table.print_table(iter([{"a": 1}] * big))
+    table.print_table([{"a": 1}] * 2, pretty=False)
+    assert used == [("rich", 1), ("rich", 3), ("plain", big), ("plain", 2)]
+
+
+def test_cli_uses_rich_for_small_interactive_tables(monkeypatch, tmp_path):
+    from typer.testing import CliRunner
+
+    from hmc_power_orchestrator.cli import app
+
+    policy = tmp_path / "policy.json"
+    policy.write_text(
+        '{"policy_version": 1, "targets": [{"lpar": "L1", "cpu": 2, "mem": 1024}]}'
+    )
+    args = ["plan", str(policy), "--output", str(tmp_path)]
+    monkeypatch.setattr(table, "_interactive", lambda: True)
+    assert "┃" in CliRunner().invoke(app, args).output
+    monkeypatch.setattr(table, "_interactive", lambda: False)
+    output = CliRunner().invoke(app, args).output
+    assert "┃" not in output
+    assert output.splitlines()[0].split()[:2] == ["lpar", "frame"]